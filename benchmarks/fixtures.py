@@ -0,0 +1,240 @@
+import collections
+import contextlib
+import socket
+from unittest import mock
+import psutil
+
+# Host sizes used by the benchmark suite, scaled down with the --scale option
+LARGE_HOST = {
+    "processes": 5000,
+    "connections": 100000,
+    "containers": 500,
+    "interfaces": 2000,
+    "partitions": 50,
+}
+
+Address = collections.namedtuple("Address", ["ip", "port"])
+Connection = collections.namedtuple("Connection", ["fd", "family", "type", "laddr", "raddr", "status", "pid"])
+InterfaceAddress = collections.namedtuple("InterfaceAddress", ["family", "address", "netmask", "broadcast", "ptp"])
+InterfaceStats = collections.namedtuple("InterfaceStats", ["isup", "duplex", "speed", "mtu", "flags"])
+InterfaceCounters = collections.namedtuple(
+    "InterfaceCounters",
+    ["bytes_sent", "bytes_recv", "packets_sent", "packets_recv", "errin", "errout", "dropin", "dropout"],
+)
+MemoryInfo = collections.namedtuple("MemoryInfo", ["rss", "vms"])
+Partition = collections.namedtuple("Partition", ["device", "mountpoint", "fstype", "opts"])
+DiskUsage = collections.namedtuple("DiskUsage", ["total", "used", "free", "percent"])
+
+PROCESS_NAMES = ("nginx", "postgres", "python3", "java", "node", "redis-server", "sshd", "containerd-shim")
+TCP_STATUSES = ("ESTABLISHED", "ESTABLISHED", "ESTABLISHED", "TIME_WAIT", "LISTEN", "CLOSE_WAIT")
+TCP_STATE_CODES = {"ESTABLISHED": "01", "TIME_WAIT": "06", "LISTEN": "0A", "CLOSE_WAIT": "08"}
+
+class FakeProcess:
+    """
+    Stands in for a psutil.Process yielded by psutil.process_iter(attrs).
+    """
+
+    def __init__(self, info):
+        self.info = info
+
+def make_processes(count):
+    """
+    Builds process_iter() results for a host with count processes.
+    """
+    return [
+        FakeProcess({
+            "pid": pid,
+            "name": f"{PROCESS_NAMES[pid % len(PROCESS_NAMES)]}",
+            "status": "running" if pid % 10 == 0 else "sleeping",
+            "create_time": 1700000000.0 + pid,
+            "memory_info": MemoryInfo(rss=(pid % 512 + 1) * 1024 * 1024, vms=0),
+        })
+        for pid in range(1, count + 1)
+    ]
+
+def make_cpu_times(count, offset=0):
+    """
+    Builds a read_cpu_times() result for count processes; pass a larger offset for the second reading.
+    """
+    return {pid: pid % 97 * 10 + offset * (pid % 5) for pid in range(1, count + 1)}, 100
+
+def make_connections(count, process_count):
+    """
+    Builds psutil.net_connections() results: mostly established client connections spread
+    over a few remote ports, plus listeners and sockets in other states.
+    """
+    connections = []
+    for i in range(count):
+        status = TCP_STATUSES[i % len(TCP_STATUSES)]
+        local = Address(f"10.0.{i // 250 % 256}.{i % 250 + 1}", 1024 + i % 60000)
+        remote = None if status == "LISTEN" else Address(f"172.16.{i % 256}.{i // 256 % 256}", (443, 5432, 6379, 8080)[i % 4])
+        pid = i % process_count + 1 if i % 7 else None
+        connections.append(Connection(-1, socket.AF_INET, socket.SOCK_STREAM, local, remote, status, pid))
+    return connections
+
+def write_proc_net_tcp(path, connections):
+    """
+    Writes the connections as a /proc/net/tcp table, for benchmarking the procfs parser.
+    """
+    def hex_address(address):
+        octets = [int(octet) for octet in address.ip.split(".")]
+        return "".join(f"{octet:02X}" for octet in reversed(octets)) + f":{address.port:04X}"
+
+    with open(path, "w") as f:
+        f.write("  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n")
+        for i, conn in enumerate(connections):
+            remote = hex_address(conn.raddr) if conn.raddr else "00000000:0000"
+            f.write(f"{i:4d}: {hex_address(conn.laddr)} {remote} {TCP_STATE_CODES[conn.status]} "
+                    f"00000000:00000000 00:00000000 00000000  1000        0 {100000 + i} 1 0 20 4 30 10 -1\n")
+
+def make_interfaces(count):
+    """
+    Builds net_if_addrs(), net_if_stats() and net_io_counters(pernic=True) results for a
+    host with count interfaces, most of them container veth pairs.
+    """
+    addresses, stats, counters = {}, {}, {}
+    for i in range(count):
+        name = "eth0" if i == 0 else (f"veth{i:05x}" if i % 4 else f"cali{i:05x}")
+        addresses[name] = [
+            InterfaceAddress(socket.AF_INET, f"10.{i // 65536}.{i // 256 % 256}.{i % 256}", "255.255.255.0", None, None),
+            InterfaceAddress(socket.AF_INET6, f"fe80::{i:x}", None, None, None),
+            InterfaceAddress(psutil.AF_LINK, f"02:42:ac:{i // 65536:02x}:{i // 256 % 256:02x}:{i % 256:02x}", None, None, None),
+        ]
+        stats[name] = InterfaceStats(i % 10 != 9, 2, 10000, 1500, "up,broadcast,running,multicast")
+        counters[name] = InterfaceCounters(i * 1000, i * 3000, i * 10, i * 30, 0, 0, i % 3, 0)
+    return addresses, stats, counters
+
+def make_routes(count):
+    """
+    Builds a structured routing table with one route per container interface.
+    """
+    routes = [{"destination": "default", "gateway": "10.0.0.1", "interface": "eth0",
+               "netmask": "0.0.0.0", "flags": "UG", "metric": 100}]
+    for i in range(1, count):
+        routes.append({"destination": f"10.{i // 65536}.{i // 256 % 256}.{i % 256}", "gateway": None,
+                       "interface": f"veth{i:05x}", "netmask": "255.255.255.255", "flags": "UH", "metric": 0})
+    return routes
+
+def make_partitions(count):
+    """
+    Builds disk_partitions() results.
+    """
+    return [Partition(f"/dev/sd{chr(97 + i % 26)}{i // 26 + 1}", "/" if i == 0 else f"/mnt/data{i}", "ext4", "rw")
+            for i in range(count)]
+
+class FakeDockerAPI:
+    """
+    A local stand-in for docker.APIClient serving a fixed inventory of containers,
+    without a Docker daemon.
+    """
+
+    def __init__(self, container_count, image_count=20, network_count=10, volume_count=100):
+        self._images = [{"Id": f"sha256:img{i}", "RepoTags": [f"service{i}:1.{i}"]} for i in range(image_count)]
+        self._networks = [
+            {"Name": f"net{i}", "Id": f"net-{i}", "Driver": "bridge",
+             "IPAM": {"Config": [{"Subnet": f"172.{20 + i}.0.0/16", "Gateway": f"172.{20 + i}.0.1"}]}}
+            for i in range(network_count)
+        ]
+        self._volumes = {"Volumes": [{"Name": f"vol{i}", "Mountpoint": f"/var/lib/docker/volumes/vol{i}/_data",
+                                      "Driver": "local"} for i in range(volume_count)]}
+        self._containers = [
+            {
+                "Id": f"{i:064x}",
+                "Names": [f"/app_{i % image_count}_{i}"],
+                "ImageID": f"sha256:img{i % image_count}",
+                "State": "running" if i % 25 else "exited",
+                "NetworkSettings": {"Networks": {f"net{i % network_count}": {"NetworkID": f"net-{i % network_count}"}}},
+            }
+            for i in range(container_count)
+        ]
+
+    def containers(self):
+        return self._containers
+
+    def images(self):
+        return self._images
+
+    def networks(self):
+        return self._networks
+
+    def volumes(self):
+        return self._volumes
+
+    def inspect_container(self, container_id):
+        i = int(container_id, 16)
+        return {
+            "State": {"Status": "running" if i % 25 else "exited", "Health": {"Status": "healthy"}},
+            "Config": {"Env": [f"SERVICE_ID={i}", "LOG_LEVEL=info", "PATH=/usr/local/bin:/usr/bin"]},
+            "HostConfig": {"RestartPolicy": {"Name": "unless-stopped"}},
+            "Mounts": [{"Type": "volume", "Name": f"vol{i % 100}", "Destination": "/data"}],
+            "NetworkSettings": {"Networks": {f"net{i % 10}": {"IPAddress": f"172.{20 + i % 10}.{i // 256}.{i % 256}"}},
+                                "Ports": {"8080/tcp": [{"HostIp": "0.0.0.0", "HostPort": str(20000 + i)}]}},
+        }
+
+    def stats(self, container_id, stream=False, one_shot=False):
+        i = int(container_id, 16)
+        precpu = {} if one_shot else {"cpu_usage": {"total_usage": i * 1000}, "system_cpu_usage": 10 ** 9}
+        return {
+            "cpu_stats": {"cpu_usage": {"total_usage": i * 1000 + 5 * 10 ** 6}, "system_cpu_usage": 10 ** 9 + 10 ** 8,
+                          "online_cpus": 16},
+            "precpu_stats": precpu,
+            "memory_stats": {"usage": (i % 64 + 1) * 16 * 1024 * 1024},
+        }
+
+class FakeDockerClient:
+    """
+    A stand-in for docker.DockerClient exposing only the low-level API used by the collector.
+    """
+
+    def __init__(self, api):
+        self.api = api
+
+class SyntheticHost:
+    """
+    Synthetic data for a large host, built once and patched over psutil and the platform
+    tools for the duration of a benchmark run.
+    """
+
+    def __init__(self, processes, connections, containers, interfaces, partitions):
+        self.sizes = {"processes": processes, "connections": connections, "containers": containers,
+                      "interfaces": interfaces, "partitions": partitions}
+        self.processes = make_processes(processes)
+        self.connections = make_connections(connections, processes)
+        self.addresses, self.interface_stats, self.interface_counters = make_interfaces(interfaces)
+        self.routes = make_routes(interfaces)
+        self.partitions = make_partitions(partitions)
+        self.docker_client = FakeDockerClient(FakeDockerAPI(containers))
+
+    @classmethod
+    def scaled(cls, scale=1.0):
+        """
+        Returns a host with the LARGE_HOST sizes multiplied by scale (at least one of each).
+        """
+        return cls(**{kind: max(int(count * scale), 1) for kind, count in LARGE_HOST.items()})
+
+    @contextlib.contextmanager
+    def patched(self):
+        """
+        Replaces psutil and the host-specific readers with the synthetic data.
+        """
+        cpu_readings = iter([make_cpu_times(self.sizes["processes"]), make_cpu_times(self.sizes["processes"], 1)])
+        patches = [
+            mock.patch("psutil.process_iter", side_effect=lambda attrs=None: iter(self.processes)),
+            mock.patch("host_insights_promptify.processes.read_cpu_times",
+                       side_effect=lambda: next(cpu_readings, make_cpu_times(self.sizes["processes"], 2))),
+            mock.patch("psutil.net_connections", side_effect=lambda kind="inet": list(self.connections)),
+            mock.patch("psutil.net_if_addrs", return_value=self.addresses),
+            mock.patch("psutil.net_if_stats", return_value=self.interface_stats),
+            mock.patch("psutil.net_io_counters", return_value=self.interface_counters),
+            mock.patch("psutil.disk_partitions", return_value=self.partitions),
+            mock.patch("psutil.disk_usage", return_value=DiskUsage(500 * 1024 ** 3, 200 * 1024 ** 3, 300 * 1024 ** 3, 40.0)),
+            mock.patch("host_insights_promptify.network._collect_routing_table", return_value=self.routes),
+            mock.patch("host_insights_promptify.network._collect_dns",
+                       return_value={"primary": "10.0.0.2", "search_domains": ["cluster.local"]}),
+            mock.patch("host_insights_promptify.network._collect_firewall_rules",
+                       return_value="\n".join(f"ACCEPT tcp -- 0.0.0.0/0 10.0.0.{i % 256} tcp dpt:{1000 + i}" for i in range(500))),
+        ]
+        with contextlib.ExitStack() as stack:
+            for patch in patches:
+                stack.enter_context(patch)
+            yield self
@@ -0,0 +1,234 @@
+"""
+Benchmarks the collectors and the prompt renderer against a synthetic large host.
+
+psutil, the platform tools and the Docker API are replaced with synthetic data (see
+fixtures.py), so results depend only on this package's code and are comparable across
+machines of similar speed. Run from the repository root:
+
+    python -m benchmarks.run                      # full size: 5k processes, 100k connections, ...
+    python -m benchmarks.run --scale 0.1          # a quicker, smaller host
+    python -m benchmarks.run --json results.json  # save the results
+    python -m benchmarks.run --compare results.json --tolerance 0.25
+
+With --compare, the exit status is 1 if any stage got slower than the saved results by more
+than the tolerance, so the suite can gate a release.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from host_insights_promptify.compact import CHARS_PER_TOKEN, compact_insights
+from host_insights_promptify.docker import collect_docker_info
+from host_insights_promptify.network import collect_network_info
+from host_insights_promptify.processes import take_process_snapshot
+from host_insights_promptify.procnet import iter_proc_connections
+from host_insights_promptify.promptify import PromptRenderer, format_prompt, write_prompt
+from host_insights_promptify.services import collect_services_info
+from host_insights_promptify.system import collect_system_info
+from benchmarks.fixtures import SyntheticHost, write_proc_net_tcp
+
+DEFAULT_TOKEN_BUDGET = 8000
+
+class NullStream:
+    """
+    A text stream that discards what is written, to time rendering without keeping the output.
+    """
+
+    def write(self, text):
+        return len(text)
+
+def peak_rss_mb():
+    """
+    Returns the peak resident set size of this process so far in MiB, or None if unknown.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def section_prompt(**sections):
+    """
+    Renders a prompt containing only the given sections.
+    """
+    empty = {"system": {}, "network": {}, "docker": {}, "services": []}
+    empty.update(sections)
+    return format_prompt(empty["system"], empty["network"], empty["docker"], empty["services"])
+
+def run_stages(host, cpu_interval, token_budget, work_dir):
+    """
+    Runs each benchmark stage in order and measures it.
+
+    Stages run in one process, so peak RSS is the process high-water mark after the stage,
+    and rss_growth is how much the stage raised it (0 if it stayed under an earlier peak).
+
+    Returns:
+        list: One result dictionary per stage.
+    """
+    state = {}
+    empty_prompt = len(section_prompt())
+
+    def section_chars(**sections):
+        # A collector's prompt size is what its section adds to an otherwise empty prompt
+        return len(section_prompt(**sections)) - empty_prompt
+
+    def snapshot():
+        state["snapshot"] = take_process_snapshot(cpu_interval=cpu_interval)
+        return len(state["snapshot"]), None
+
+    def services():
+        state["services"] = collect_services_info(snapshot=state["snapshot"])
+        return len(state["services"]), section_chars(services=state["services"])
+
+    def network():
+        state["network"] = collect_network_info(snapshot=state["snapshot"], connection_mode="psutil")
+        return len(state["network"]["active_connections"]), section_chars(network=state["network"])
+
+    def procnet():
+        connections = list(iter_proc_connections(attribute=False, proc_root=work_dir))
+        return len(connections), None
+
+    def docker():
+        state["docker"] = collect_docker_info(client=host.docker_client)
+        return len(state["docker"]["containers"]), section_chars(docker=state["docker"])
+
+    def system():
+        state["system"] = collect_system_info()
+        return len(state["system"].get("Disk Partitions", [])), section_chars(system=state["system"])
+
+    def sections():
+        return state["system"], state["network"], state["docker"], state["services"]
+
+    def render():
+        return None, len(format_prompt(*sections()))
+
+    def render_cold():
+        # A first render through the section cache: every section misses and is hashed
+        state["renderer"] = PromptRenderer()
+        return None, len(state["renderer"].render(*sections()))
+
+    def render_warm():
+        # A repeated render of unchanged data: every section is served from the cache
+        return None, len(state["renderer"].render(*sections()))
+
+    def stream():
+        return None, write_prompt(NullStream(), *sections())
+
+    def compact():
+        return None, len(format_prompt(*compact_insights(*sections(), token_budget=token_budget)))
+
+    stages = [
+        ("process_snapshot", snapshot),
+        ("services", services),
+        ("network", network),
+        ("procnet_parse", procnet),
+        ("docker", docker),
+        ("system", system),
+        ("format_prompt", render),
+        ("render_cache_miss", render_cold),
+        ("render_cache_hit", render_warm),
+        ("write_prompt", stream),
+        (f"compact_{token_budget}", compact),
+    ]
+
+    results = []
+    for name, stage in stages:
+        rss_before = peak_rss_mb()
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        items, prompt_chars = stage()
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        rss_after = peak_rss_mb()
+        results.append({
+            "stage": name,
+            "items": items,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "peak_rss_mb": round(rss_after, 1) if rss_after is not None else None,
+            "rss_growth_mb": round(rss_after - rss_before, 1) if rss_after is not None else None,
+            "prompt_chars": prompt_chars,
+            "prompt_tokens": -(-prompt_chars // CHARS_PER_TOKEN) if prompt_chars is not None else None,
+        })
+    return results
+
+def run_benchmark(scale=1.0, cpu_interval=0.1, token_budget=DEFAULT_TOKEN_BUDGET):
+    """
+    Builds a synthetic host at the given scale and benchmarks every stage against it.
+
+    Returns:
+        dict: The host "sizes" and the per-stage "results".
+    """
+    host = SyntheticHost.scaled(scale)
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.mkdir(os.path.join(work_dir, "net"))
+        write_proc_net_tcp(os.path.join(work_dir, "net", "tcp"), host.connections)
+        with host.patched():
+            results = run_stages(host, cpu_interval, token_budget, work_dir)
+    return {"sizes": host.sizes, "results": results}
+
+def print_results(report, stream=sys.stdout):
+    """
+    Prints the benchmark results as a table.
+    """
+    sizes = ", ".join(f"{count} {kind}" for kind, count in report["sizes"].items())
+    stream.write(f"Synthetic host: {sizes}\n\n")
+    columns = ("stage", "items", "wall_s", "cpu_s", "peak_rss_mb", "rss_growth_mb", "prompt_chars", "prompt_tokens")
+    widths = [max(len(column), 10) + 2 for column in columns]
+    widths[0] = max(len(row["stage"]) for row in report["results"]) + 2
+    stream.write("".join(column.ljust(width) for column, width in zip(columns, widths)).rstrip() + "\n")
+    for row in report["results"]:
+        cells = ["-" if row[column] is None else str(row[column]) for column in columns]
+        stream.write("".join(cell.ljust(width) for cell, width in zip(cells, widths)).rstrip() + "\n")
+
+def compare_results(report, previous, tolerance):
+    """
+    Compares stage wall times against previously saved results.
+
+    Returns:
+        list: A message for each stage that got slower by more than the tolerance.
+    """
+    previous_wall = {row["stage"]: row["wall_s"] for row in previous.get("results", [])}
+    regressions = []
+    for row in report["results"]:
+        before = previous_wall.get(row["stage"])
+        if before and row["wall_s"] > before * (1 + tolerance):
+            regressions.append(f"{row['stage']}: {before:.4f}s -> {row['wall_s']:.4f}s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark host-insights-promptify against a synthetic large host.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply the synthetic host sizes by this factor")
+    parser.add_argument("--cpu-interval", type=float, default=0.1, help="CPU sampling window of the process snapshot")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="Token budget of the compaction stage")
+    parser.add_argument("--json", type=str, metavar="FILE", help="Save the results to this file")
+    parser.add_argument("--compare", type=str, metavar="FILE", help="Fail if any stage is slower than in these saved results")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown with --compare")
+    args = parser.parse_args()
+
+    report = run_benchmark(scale=args.scale, cpu_interval=args.cpu_interval, token_budget=args.token_budget)
+    print_results(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare_results(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"- {regression}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
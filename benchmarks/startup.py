@@ -0,0 +1,119 @@
+"""
+Measures the cold-start latency of the package and the CLI, as paid by cron jobs and agents
+that run host-insights-promptify once per invocation. Run from the repository root:
+
+    python -m benchmarks.startup                       # median of 10 runs per scenario
+    python -m benchmarks.startup --json startup.json   # save the results
+    python -m benchmarks.startup --compare startup.json --tolerance 0.25
+
+Each scenario runs in a fresh interpreter. Besides the wall time, the report lists the
+heavy third-party modules (the Docker SDK and its HTTP stack, and NumPy) that the scenario
+imported, which should only happen for scenarios that talk to Docker or sample trends.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.run import compare_results
+
+HEAVY_MODULES = ("docker", "requests", "urllib3", "numpy")
+CLI = [sys.executable, "-m", "host_insights_promptify.cli"]
+
+def scenarios(work_dir):
+    """
+    Returns the benchmarked commands, keyed by scenario name.
+    """
+    return {
+        "import": [sys.executable, "-c", "import host_insights_promptify"],
+        "cli_help": CLI + ["--help"],
+        "cli_system": CLI + ["--system", "--format", "json"],
+        "cli_services": CLI + ["--services", "--cpu-interval", "0", "--format", "json"],
+        # The daemon client; the socket does not exist, so this measures startup and the failed connect
+        "cli_query": CLI + ["--query", os.path.join(work_dir, "missing.sock")],
+    }
+
+def loaded_modules(command):
+    """
+    Runs a command under "python -X importtime" and returns the names of the modules it imported.
+    """
+    command = [command[0], "-X", "importtime"] + command[1:]
+    result = subprocess.run(command, capture_output=True, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+def time_command(command, runs):
+    """
+    Runs a command repeatedly and returns its wall times in seconds.
+    """
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - started)
+    return times
+
+def run_startup_benchmark(runs=10):
+    """
+    Times every scenario in fresh interpreters.
+
+    Returns:
+        dict: The per-scenario "results": median and minimum wall time, and the heavy modules imported.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, command in scenarios(work_dir).items():
+            times = time_command(command, runs)
+            modules = loaded_modules(command)
+            results.append({
+                "stage": name,
+                "wall_s": round(statistics.median(times), 4),
+                "min_s": round(min(times), 4),
+                "heavy_modules": [module for module in HEAVY_MODULES if module in modules],
+            })
+    return {"runs": runs, "results": results}
+
+def print_results(report, stream=sys.stdout):
+    """
+    Prints the startup benchmark results as a table.
+    """
+    stream.write(f"Cold start, median of {report['runs']} runs\n\n")
+    width = max(len(row["stage"]) for row in report["results"]) + 2
+    stream.write(f"{'scenario':<{width}}{'median_ms':<12}{'min_ms':<12}heavy_modules\n")
+    for row in report["results"]:
+        heavy = ", ".join(row["heavy_modules"]) or "-"
+        stream.write(f"{row['stage']:<{width}}{row['wall_s'] * 1000:<12.1f}{row['min_s'] * 1000:<12.1f}{heavy}\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cold-start latency of host-insights-promptify.")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per scenario")
+    parser.add_argument("--json", type=str, metavar="FILE", help="Save the results to this file")
+    parser.add_argument("--compare", type=str, metavar="FILE", help="Fail if any scenario is slower than in these saved results")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown with --compare")
+    args = parser.parse_args()
+
+    report = run_startup_benchmark(runs=args.runs)
+    print_results(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare_results(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"- {regression}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
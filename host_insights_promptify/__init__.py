@@ -15,42 +15,348 @@ Modules:
 - docker: Collects data on Docker containers, networks, and volumes.
 - services: Retrieves information about running services on the host.
 - promptify: Processes and formats the gathered data into an AI-ready prompt.
+- concurrency: Runs collectors concurrently with per-task timeouts.
+- cache: Caches slow-changing collector data with per-field TTLs.
+- baseline: Persists collector results and computes deltas against a stored baseline.
+- compact: Ranks and summarizes the collected data to fit a prompt token budget.
+- processes: Takes a single process table snapshot shared by the network and services collectors.
+- instrumentation: Measures the time and work of each collector and sub-step.
+- serialize: Encodes collector results as JSON, NDJSON, MessagePack, or columnar JSON.
+- sampling: Samples host and per-process metrics over a window and summarizes their trends.
+- systemd: Collects the state and resource usage of systemd units in one batched query.
 
-Core Function:
---------------
+Core Functions:
+---------------
+- collect_all_insights: Runs every collector, optionally concurrently, and returns the raw results.
 - gather_all_insights: Collects all insights and formats them into a single AI-ready prompt.
+- stream_all_insights: Collects all insights and writes the prompt to a stream incrementally.
+- export_all_insights: Collects all insights and writes them in a machine-readable format.
+- gather_delta_insights: Reports only what changed since a stored baseline.
 """
 
-from .system import collect_system_info
-from .network import collect_network_info
-from .docker import collect_docker_info
-from .services import collect_services_info
-from .promptify import format_prompt
+import importlib
+from .concurrency import run_concurrently
+from .processes import DEFAULT_CPU_INTERVAL, take_process_snapshot
+from .promptify import PromptRenderer, format_prompt, format_delta_prompt, iter_prompt, write_prompt, save_prompt_to_file
+from .baseline import DEFAULT_CPU_THRESHOLD, DEFAULT_THRESHOLD, diff_insights, load_baseline, save_baseline
+from .compact import compact_insights, estimate_tokens
+from .cache import FileBackend, MemoryBackend, TTLCache
+from .instrumentation import Instrumentation, format_prometheus, step
+from .serialize import iter_records, write_insights
+from .sampling import DEFAULT_SAMPLE_INTERVAL, MetricsSampler, collect_trends
 
 __all__ = [
     "collect_system_info",
     "collect_network_info",
     "collect_docker_info",
     "collect_services_info",
+    "collect_units_info",
     "format_prompt",
+    "iter_prompt",
+    "write_prompt",
+    "PromptRenderer",
+    "save_prompt_to_file",
+    "format_delta_prompt",
+    "save_baseline",
+    "load_baseline",
+    "diff_insights",
+    "compact_insights",
+    "TTLCache",
+    "MemoryBackend",
+    "FileBackend",
+    "Instrumentation",
+    "format_prometheus",
+    "iter_records",
+    "write_insights",
+    "MetricsSampler",
+    "collect_trends",
+    "estimate_tokens",
+    "collect_all_insights",
     "gather_all_insights",
+    "stream_all_insights",
+    "export_all_insights",
+    "gather_delta_insights",
 ]
 
 __version__ = "0.1.0"
 __author__ = "Your Name"
 __license__ = "GPLv3"
 
-def gather_all_insights():
+# Collector registry: each entry is a collector function, or a "module:function" reference
+# that is imported the first time the collector is used, so importing the package (or running
+# a single collector) does not load every collector's dependencies, such as the Docker SDK
+COLLECTORS = {
+    "system": "system:collect_system_info",
+    "network": "network:collect_network_info",
+    "docker": "docker:collect_docker_info",
+    "services": "services:collect_services_info",
+    "units": "systemd:collect_units_info",
+}
+
+def get_collector(name):
+    """
+    Returns the collector function registered under a name, importing its module if needed.
+
+    Raises:
+        KeyError: If no collector is registered under the name.
+    """
+    collector = COLLECTORS[name]
+    if isinstance(collector, str):
+        module_name, _, function_name = collector.partition(":")
+        collector = getattr(importlib.import_module(f".{module_name}", __name__), function_name)
+    return collector
+
+def __getattr__(name):
+    """
+    Resolves the collect_*_info functions on first access (PEP 562), so that
+    "from host_insights_promptify import collect_system_info" imports only that collector.
+    """
+    for reference in COLLECTORS.values():
+        if isinstance(reference, str) and reference.partition(":")[2] == name:
+            module_name = reference.partition(":")[0]
+            value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+            globals()[name] = value
+            return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+def _fallback_result(name, error):
+    """
+    Builds the placeholder used when a collector fails or times out, shaped like the
+    collector's normal output so the prompt can still be rendered from partial results.
+    """
+    if name == "network":
+        return {"interfaces": [], "routing_table": [], "active_connections": [],
+                "dns": {}, "firewall_rules": None, "error": error}
+    if name == "docker":
+        return {"containers": [], "networks": [], "volumes": [], "error": error}
+    if name == "services":
+        # Services are a plain list, so the error travels as a marker entry in it
+        return [{"error": error}]
+    if name == "units":
+        return {"units": [], "error": error}
+    return {"error": error}
+
+def collect_all_insights(concurrent=True, timeout=None, partial=True, collector_options=None,
+                         cpu_interval=DEFAULT_CPU_INTERVAL, cache=None, instrumentation=None,
+                         trend_window=None, trend_interval=DEFAULT_SAMPLE_INTERVAL, sampler=None):
+    """
+    Runs all collectors and returns their raw results.
+
+    Args:
+        concurrent (bool): Run the collectors on a thread pool instead of one after another.
+        timeout (float): Per-collector timeout in seconds (concurrent mode only). None waits indefinitely.
+        partial (bool): If True, a collector that fails or times out is replaced by an empty
+            placeholder carrying an "error" message. If False, the first failure is raised.
+        collector_options (dict): Optional keyword arguments per collector, keyed by collector
+            name, e.g. {"docker": {"fast_stats": True}}.
+        cpu_interval (float): Length of the single, bulk CPU sampling window used for per-process
+            CPU percentages. None or 0 skips CPU sampling.
+        cache (TTLCache): Optional cache for slow-changing data, shared by the system, network,
+            and Docker collectors.
+        instrumentation (Instrumentation): If given, the wall time, CPU time and work of each
+            collector and sub-step are recorded, and returned in a "timings" entry.
+        trend_window (float): If given, host and per-process metrics are sampled for this many
+            seconds, while the collectors run, and summarized in a "trends" entry. The
+            per-collector timeout does not apply to the sampling window.
+        trend_interval (float): Seconds between trend samples.
+        sampler (MetricsSampler): An already running sampler (for example, the daemon's) whose
+            current window is summarized in "trends" instead of sampling a new window.
+
+    Returns:
+        dict: A dictionary mapping collector name ("system", "network", "docker", "services", "units") to its
+        result, plus "trends" when trends are sampled and "timings" (step name to measurements)
+        when instrumentation is given.
+
+    Raises:
+        RuntimeError: If partial is False and any collector failed or timed out.
+    """
+    collector_options = {name: dict(options) for name, options in (collector_options or {}).items()}
+
+    # Sample trends in the background so the window overlaps collection
+    trend_sampler = sampler
+    if trend_sampler is None and trend_window:
+        trend_sampler = MetricsSampler(trend_window, interval=trend_interval)
+        trend_sampler.start(duration=trend_window)
+
+    # Read the process table once and share it, so connections, services and units agree on process state
+    if any("snapshot" not in collector_options.get(name, {}) for name in ("network", "services", "units")):
+        with step(instrumentation, "processes.snapshot") as record:
+            try:
+                snapshot = take_process_snapshot(cpu_interval=cpu_interval)
+                record.items = len(snapshot)
+            except Exception:
+                snapshot = None
+        for name in ("network", "services", "units"):
+            collector_options.setdefault(name, {}).setdefault("snapshot", snapshot)
+
+    if cache is not None:
+        for name in ("system", "network", "docker"):
+            collector_options.setdefault(name, {}).setdefault("cache", cache)
+
+    if instrumentation is not None:
+        for name in ("system", "network", "docker", "units"):
+            collector_options.setdefault(name, {}).setdefault("instrumentation", instrumentation)
+
+    def run_collector(name, collector, options):
+        with step(instrumentation, name) as record:
+            result = collector(**options)
+            if isinstance(result, list):
+                record.items = len(result)
+            return result
+
+    # Resolved up front, so collector modules are not imported concurrently from worker threads
+    tasks = {
+        name: (lambda name=name, collector=get_collector(name), options=collector_options.get(name, {}):
+               run_collector(name, collector, options))
+        for name in COLLECTORS
+    }
+
+    if concurrent:
+        results, errors = run_concurrently(tasks, timeout=timeout)
+    else:
+        results, errors = {}, {}
+        for name, task in tasks.items():
+            try:
+                results[name] = task()
+            except Exception as e:
+                errors[name] = str(e)
+
+    if errors and not partial:
+        if trend_sampler is not None and sampler is None:
+            trend_sampler.stop()
+        name = next(iter(errors))
+        raise RuntimeError(f"Collector '{name}' failed: {errors[name]}")
+
+    insights = {}
+    for name in COLLECTORS:
+        if name in results:
+            insights[name] = results[name]
+        else:
+            insights[name] = _fallback_result(name, f"Error collecting {name} information: {errors[name]}")
+    if trend_sampler is not None:
+        with step(instrumentation, "trends") as record:
+            if sampler is None:
+                trend_sampler.join()
+            try:
+                insights["trends"] = trend_sampler.summary()
+                record.items = len(insights["trends"]["processes"])
+            except Exception as e:
+                insights["trends"] = {"error": f"Error collecting trends information: {str(e)}"}
+    if instrumentation is not None:
+        insights["timings"] = instrumentation.timings()
+    return insights
+
+def gather_all_insights(token_budget=None, **options):
     """
     Gathers all system insights and formats them into an AI-ready prompt.
 
+    Args:
+        token_budget (int): If given, the collected data is summarized so the prompt fits
+            roughly this many tokens.
+        **options: Passed on to collect_all_insights (concurrent, timeout, partial,
+            collector_options, cpu_interval, cache, instrumentation, trend_window, trend_interval).
+
     Returns:
         str: A formatted prompt containing all relevant system insights.
     """
-    system_info = collect_system_info()
-    network_info = collect_network_info()
-    docker_info = collect_docker_info()
-    services_info = collect_services_info()
+    insights = collect_all_insights(**options)
+
+    with step(options.get("instrumentation"), "render"):
+        sections = (insights["system"], insights["network"], insights["docker"], insights["services"],
+                    insights.get("trends"), insights.get("units"))
+        if token_budget:
+            sections = compact_insights(*sections, token_budget=token_budget)
+
+        # Format the collected data into a single AI-ready prompt
+        return format_prompt(*sections)
+
+def stream_all_insights(stream, token_budget=None, **options):
+    """
+    Gathers all system insights and writes the AI-ready prompt to a stream as it is rendered.
+
+    Active connections and services are fed to the renderer lazily, so peak memory stays
+    flat regardless of how many sockets and processes the host has.
+
+    Args:
+        stream (io.TextIOBase): A writable text stream, such as sys.stdout or an open file.
+        token_budget (int): If given, the collected data is summarized so the prompt fits
+            roughly this many tokens. Compaction has to see all of the data, so lazy
+            collection is not used in this case.
+        **options: Passed on to collect_all_insights (concurrent, timeout, partial,
+            collector_options, cpu_interval, cache, instrumentation, trend_window, trend_interval).
+
+    Returns:
+        int: The number of characters written.
+    """
+    collector_options = {name: dict(opts) for name, opts in (options.pop("collector_options", None) or {}).items()}
+    if not token_budget:
+        collector_options.setdefault("network", {}).setdefault("lazy_connections", True)
+        collector_options.setdefault("services", {}).setdefault("lazy", True)
+
+    insights = collect_all_insights(collector_options=collector_options, **options)
+
+    # Lazily collected connections and services are produced, and measured, while rendering
+    with step(options.get("instrumentation"), "render"):
+        sections = (insights["system"], insights["network"], insights["docker"], insights["services"],
+                    insights.get("trends"), insights.get("units"))
+        if token_budget:
+            sections = compact_insights(*sections, token_budget=token_budget)
+        return write_prompt(stream, *sections)
+
+def export_all_insights(stream, output_format="json", **options):
+    """
+    Gathers all system insights and writes them to a binary stream in a machine-readable format.
+
+    Active connections and services are collected lazily and encoded as they are produced,
+    so large hosts do not need the full lists in memory.
+
+    Args:
+        stream (io.BufferedIOBase): A writable binary stream, such as sys.stdout.buffer.
+        output_format (str): "json", "ndjson", "msgpack" or "compact" (see serialize.iter_serialized).
+        **options: Passed on to collect_all_insights.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    collector_options = {name: dict(opts) for name, opts in (options.pop("collector_options", None) or {}).items()}
+    collector_options.setdefault("network", {}).setdefault("lazy_connections", True)
+    collector_options.setdefault("services", {}).setdefault("lazy", True)
+
+    insights = collect_all_insights(collector_options=collector_options, **options)
+    with step(options.get("instrumentation"), "serialize"):
+        return write_insights(stream, insights, output_format)
+
+def gather_delta_insights(baseline_path, threshold=DEFAULT_THRESHOLD, cpu_threshold=DEFAULT_CPU_THRESHOLD,
+                          update_baseline=True, **options):
+    """
+    Gathers all system insights and reports only what changed since the stored baseline.
+
+    If no usable baseline exists yet, a full report is returned instead. Either way, the
+    current results become the new baseline unless update_baseline is False.
+
+    Args:
+        baseline_path (str): The baseline file, as written by save_baseline.
+        threshold (float): Minimum relative change for sizes and counters to be reported.
+        cpu_threshold (float): Minimum change in CPU percentage points to be reported.
+        update_baseline (bool): Store the current results as the new baseline.
+        **options: Passed on to collect_all_insights.
+
+    Returns:
+        str: The delta report, or a full report if there was no baseline.
+    """
+    insights = collect_all_insights(**options)
+    baseline = load_baseline(baseline_path)
+
+    if baseline is None:
+        prompt = format_prompt(insights["system"], insights["network"], insights["docker"], insights["services"],
+                               trends=insights.get("trends"), units=insights.get("units"))
+    else:
+        delta = diff_insights(baseline["insights"], insights, threshold=threshold, cpu_threshold=cpu_threshold)
+        prompt = format_delta_prompt(delta, baseline_taken_at=baseline["taken_at"])
 
-    # Format the collected data into a single AI-ready prompt
-    return format_prompt(system_info, network_info, docker_info, services_info)
\ No newline at end of file
+    if update_baseline:
+        save_baseline(insights, baseline_path)
+    return prompt
@@ -0,0 +1,224 @@
+import gzip
+import json
+import os
+import re
+import tempfile
+import time
+from .records import to_builtin
+
+BASELINE_FORMAT_VERSION = 2
+DEFAULT_THRESHOLD = 0.2  # Relative change for sizes and counters
+DEFAULT_CPU_THRESHOLD = 10.0  # Absolute change in CPU percentage points
+
+# System fields that are measurements, compared against the threshold. The others (OS,
+# version, hostname, cores, ...) describe the host, so any change of them is reported.
+SYSTEM_METRICS = frozenset({"CPU Frequency", "Total Memory", "Available Memory", "Disk", "Disk Available", "Disk Usage"})
+
+_NUMERIC_PREFIX = re.compile(r"^\s*(-?\d+(?:\.\d+)?)")
+
+def _materialize(insights):
+    """
+    Converts lazily collected lists (generators) into lists so they can be stored and compared.
+    """
+    insights = dict(insights)
+    network_info = insights.get("network")
+    if isinstance(network_info, dict) and "active_connections" in network_info:
+        insights["network"] = dict(network_info, active_connections=list(network_info["active_connections"]))
+    if "services" in insights:
+        insights["services"] = list(insights["services"])
+    return insights
+
+def save_baseline(insights, path):
+    """
+    Persists raw collector results as a baseline for later delta reports.
+
+    The baseline is stored as gzip-compressed JSON and written atomically, so a reader never
+    sees a partially written file.
+
+    Args:
+        insights (dict): Collector results keyed by collector name, as returned by collect_all_insights.
+        path (str): The file to write.
+    """
+    document = {
+        "version": BASELINE_FORMAT_VERSION,
+        "taken_at": time.time(),
+        "insights": _materialize(insights),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".baseline-")
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=1) as f:
+            f.write(json.dumps(document, separators=(",", ":"), default=to_builtin).encode("utf-8"))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def load_baseline(path):
+    """
+    Loads a baseline written by save_baseline.
+
+    Args:
+        path (str): The baseline file.
+
+    Returns:
+        dict: A dictionary with "taken_at" (epoch seconds) and "insights" (the collector results),
+        or None if the file does not exist or is not a readable baseline.
+    """
+    try:
+        with gzip.open(path, "rb") as f:
+            document = json.loads(f.read().decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(document, dict) or document.get("version") != BASELINE_FORMAT_VERSION:
+        return None
+    return document
+
+def _number(value):
+    """
+    Extracts a number from a metric value such as 1024, 12.5, "3.20 GB" or "45%".
+    Returns None for non-numeric values.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        match = _NUMERIC_PREFIX.match(value)
+        if match:
+            return float(match.group(1))
+    return None
+
+def _changed(old, new, threshold, absolute=False):
+    """
+    Decides whether a value changed significantly. Numbers must differ by more than the
+    threshold (relative, or absolute if requested); anything else must simply differ.
+    """
+    old_number, new_number = _number(old), _number(new)
+    if old_number is None or new_number is None:
+        return old != new
+    difference = abs(new_number - old_number)
+    if absolute:
+        return difference > threshold
+    return difference > threshold * max(abs(old_number), 1)
+
+def _diff_keyed(old_items, new_items, key, fields, threshold, cpu_threshold, exact=False):
+    """
+    Compares two lists of records matched by a key function. With exact, any change of a
+    field is significant, as for states and counters where every step matters.
+
+    Returns:
+        dict: "added" and "removed" records, and "changed" entries listing each significantly
+        changed field as an (old, new) pair.
+    """
+    old_index = {key(item): item for item in old_items if "omitted" not in item}
+    new_index = {key(item): item for item in new_items if "omitted" not in item}
+
+    changed = []
+    for item_key in old_index.keys() & new_index.keys():
+        old, new = old_index[item_key], new_index[item_key]
+        differences = {}
+        for field in fields:
+            is_cpu = "cpu" in field
+            if exact:
+                significant = old.get(field) != new.get(field)
+            else:
+                significant = _changed(old.get(field), new.get(field), cpu_threshold if is_cpu else threshold, absolute=is_cpu)
+            if significant:
+                differences[field] = (old.get(field), new.get(field))
+        if differences:
+            changed.append({"key": item_key, "changes": differences})
+
+    return {
+        "added": [item for item_key, item in new_index.items() if item_key not in old_index],
+        "removed": [item for item_key, item in old_index.items() if item_key not in new_index],
+        "changed": changed,
+    }
+
+def _services(insights):
+    """
+    Returns the services of a collector result, without the marker of a failed collector.
+    """
+    return [service for service in insights.get("services", []) if "error" not in service]
+
+def _connection_key(conn):
+    return f"{conn.get('protocol')} {conn.get('local_address')} -> {conn.get('remote_address')} ({conn.get('process')})"
+
+def _route_key(route):
+    if isinstance(route, dict):
+        return " ".join(f"{k}={v}" for k, v in sorted(route.items()))
+    return str(route)
+
+def diff_insights(baseline, current, threshold=DEFAULT_THRESHOLD, cpu_threshold=DEFAULT_CPU_THRESHOLD):
+    """
+    Computes what changed between a baseline and the current collector results.
+
+    Processes, connections, containers, interfaces, routes, Docker networks, volumes and
+    systemd units are matched by identity and reported as added or removed; metrics of matched entries are
+    reported only when they changed by more than the thresholds.
+
+    Args:
+        baseline (dict): Collector results from the baseline.
+        current (dict): Current collector results.
+        threshold (float): Minimum relative change for sizes and counters (0.2 = 20%).
+        cpu_threshold (float): Minimum change in CPU percentage points.
+
+    Returns:
+        dict: The delta, one entry per kind of data.
+    """
+    baseline = _materialize(baseline)
+    current = _materialize(current)
+    old_system, new_system = baseline.get("system", {}), current.get("system", {})
+    old_network, new_network = baseline.get("network", {}), current.get("network", {})
+    old_docker, new_docker = baseline.get("docker", {}), current.get("docker", {})
+    old_units, new_units = baseline.get("units") or {}, current.get("units") or {}
+
+    system_changes = {}
+    for field in new_system.keys() | old_system.keys():
+        if field == "Disk Partitions":
+            continue
+        old, new = old_system.get(field), new_system.get(field)
+        significant = _changed(old, new, threshold) if field in SYSTEM_METRICS else old != new
+        if significant:
+            system_changes[field] = (old, new)
+
+    options = {"threshold": threshold, "cpu_threshold": cpu_threshold}
+    return {
+        "system": system_changes,
+        "partitions": _diff_keyed(old_system.get("Disk Partitions", []), new_system.get("Disk Partitions", []),
+                                  lambda p: p.get("Mountpoint"), ["Used", "Usage"], **options),
+        "interfaces": _diff_keyed(old_network.get("interfaces", []), new_network.get("interfaces", []),
+                                  lambda i: i.get("name"), ["status", "ipv4", "ipv6", "mtu", "speed"], exact=True,
+                                  **options),
+        "routes": _diff_keyed(old_network.get("routing_table", []), new_network.get("routing_table", []),
+                              _route_key, [], **options),
+        "connections": _diff_keyed(old_network.get("active_connections", []), new_network.get("active_connections", []),
+                                   _connection_key, ["status"], **options),
+        "dns": (old_network.get("dns"), new_network.get("dns")) if old_network.get("dns") != new_network.get("dns") else None,
+        "firewall_changed": old_network.get("firewall_rules") != new_network.get("firewall_rules"),
+        "containers": _diff_keyed(old_docker.get("containers", []), new_docker.get("containers", []),
+                                  lambda c: c.get("name"),
+                                  ["image", "status", "health_status", "cpu_percent", "memory_usage"], **options),
+        "docker_networks": _diff_keyed(old_docker.get("networks", []), new_docker.get("networks", []),
+                                       lambda n: n.get("id"), ["containers"], **options),
+        "volumes": _diff_keyed(old_docker.get("volumes", []), new_docker.get("volumes", []),
+                               lambda v: v.get("name"), [], **options),
+        "processes": _diff_keyed(_services(baseline), _services(current),
+                                 lambda s: (s.get("pid"), s.get("name"), s.get("start_time")),
+                                 ["memory_usage", "cpu_usage"], **options),
+        # A unit that failed or restarted once is worth reporting, so unit fields compare exactly
+        "units": _diff_keyed(old_units.get("units", []), new_units.get("units", []), lambda u: u.get("name"),
+                             ["active_state", "sub_state", "result", "restarts"], exact=True, **options),
+    }
+
+def delta_is_empty(delta):
+    """
+    Returns True if a delta produced by diff_insights contains no changes at all.
+    """
+    for value in delta.values():
+        if isinstance(value, dict) and "added" in value:
+            if value["added"] or value["removed"] or value["changed"]:
+                return False
+        elif value:
+            return False
+    return True
@@ -0,0 +1,180 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Default time-to-live, in seconds, for each cached field. Fields not listed use DEFAULT_TTL.
+DEFAULT_TTL = 300
+DEFAULT_TTLS = {
+    "system.platform": 24 * 3600,
+    "network.routing_table": 300,
+    "network.dns": 600,
+    "network.firewall_rules": 600,
+    "docker.networks": 300,
+    "docker.volumes": 300,
+}
+
+class MemoryBackend:
+    """
+    Stores cache entries in process memory. Suitable for long-lived embedders.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def keys(self):
+        return list(self._entries)
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, entry):
+        self._entries[key] = entry
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+class FileBackend:
+    """
+    Stores cache entries in a JSON file, so that separate runs (for example, from cron) can
+    share cached data. Values must be JSON-serializable. The file is rewritten atomically
+    whenever an entry changes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._entries = {key: tuple(entry) for key, entry in json.load(f).items()}
+            except (OSError, ValueError, TypeError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".cache-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._entries, f, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def keys(self):
+        return list(self._load())
+
+    def get(self, key):
+        return self._load().get(key)
+
+    def set(self, key, entry):
+        self._load()[key] = entry
+        self._save()
+
+    def delete(self, key):
+        if self._load().pop(key, None) is not None:
+            self._save()
+
+    def clear(self):
+        self._entries = {}
+        self._save()
+
+class TTLCache:
+    """
+    A cache for slow-changing collector data with a time-to-live per field.
+
+    Entries are looked up by a dotted field name such as "network.routing_table". Expired
+    entries are recomputed on the next lookup; entries can also be invalidated explicitly.
+    Hits and misses are counted in total and per field.
+    """
+
+    def __init__(self, backend=None, ttls=None, default_ttl=DEFAULT_TTL):
+        """
+        Args:
+            backend: Where entries are stored; MemoryBackend (the default) or FileBackend.
+            ttls (dict): Per-field TTLs in seconds, overriding DEFAULT_TTLS.
+            default_ttl (float): TTL for fields with no specific TTL.
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._field_stats = {}
+        self._lock = threading.Lock()
+
+    def _count(self, key, hit):
+        stats = self._field_stats.setdefault(key, {"hits": 0, "misses": 0})
+        if hit:
+            self.hits += 1
+            stats["hits"] += 1
+        else:
+            self.misses += 1
+            stats["misses"] += 1
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """
+        Returns the cached value for a field, computing and storing it if it is missing or expired.
+
+        Args:
+            key (str): The field name.
+            compute (callable): Called with no arguments to produce a fresh value.
+            ttl (float): TTL for this value, overriding the configured TTL for the field.
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        with self._lock:
+            entry = self.backend.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._count(key, hit=True)
+                return entry[1]
+            self._count(key, hit=False)
+
+        value = compute()
+        ttl = ttl if ttl is not None else self.ttls.get(key, self.default_ttl)
+        with self._lock:
+            self.backend.set(key, (time.time() + ttl, value))
+        return value
+
+    def invalidate(self, key=None):
+        """
+        Drops a cached field, every field starting with "<key>.", or, if key is None, everything.
+        """
+        with self._lock:
+            if key is None:
+                self.backend.clear()
+                return
+            for cached_key in self.backend.keys():
+                if cached_key == key or cached_key.startswith(key + "."):
+                    self.backend.delete(cached_key)
+
+    def stats(self):
+        """
+        Returns the cache hit and miss counters.
+
+        Returns:
+            dict: Total "hits" and "misses", and a "fields" mapping of field name to its own counters.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "fields": {key: dict(stats) for key, stats in self._field_stats.items()},
+            }
+
+def cached(cache, key, compute):
+    """
+    Returns cache.get_or_compute(key, compute), or simply compute() when no cache is in use.
+    """
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(key, compute)
@@ -0,0 +1,211 @@
+import os
+import time
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+PROC_ROOT = "/proc"
+
+# Where Docker places a container's cgroup, relative to a hierarchy root: the systemd cgroup
+# driver uses a scope unit, the cgroupfs driver a "docker" directory
+CONTAINER_CGROUP_PATTERNS = ("system.slice/docker-{id}.scope", "docker/{id}")
+
+# cgroup v1 controller directories, in order of preference
+V1_CONTROLLERS = {
+    "cpu": ("cpuacct", "cpu,cpuacct", "cpuacct,cpu"),
+    "memory": ("memory",),
+    "io": ("blkio",),
+}
+
+def cgroup_version(root=CGROUP_ROOT):
+    """
+    Detects the cgroup hierarchy mounted at root.
+
+    Returns:
+        int: 2 for the unified hierarchy, 1 for per-controller (v1 or hybrid) hierarchies,
+        or None if cgroupfs is not accessible.
+    """
+    if os.path.exists(os.path.join(root, "cgroup.controllers")):
+        return 2
+    if any(os.path.isdir(os.path.join(root, name)) for name in V1_CONTROLLERS["cpu"]):
+        return 1
+    return None
+
+def _read_int(path):
+    with open(path, "r") as f:
+        return int(f.read().split()[0])
+
+def _read_keyed(path):
+    """
+    Reads a flat "key value" file such as cpu.stat.
+    """
+    values = {}
+    with open(path, "r") as f:
+        for line in f:
+            key, _, value = line.partition(" ")
+            if value.strip().isdigit():
+                values[key] = int(value)
+    return values
+
+def _find_cgroup(hierarchy, container_id):
+    """
+    Returns the cgroup directory of a container inside one hierarchy, or None.
+    """
+    for pattern in CONTAINER_CGROUP_PATTERNS:
+        path = os.path.join(hierarchy, pattern.format(id=container_id))
+        if os.path.isdir(path):
+            return path
+    return None
+
+def _read_v2(path):
+    usage = {"cpu_usage": _read_keyed(os.path.join(path, "cpu.stat"))["usage_usec"] * 1000,
+             "memory_usage": _read_int(os.path.join(path, "memory.current")),
+             "block_io": None}
+    try:
+        read_bytes = write_bytes = 0
+        with open(os.path.join(path, "io.stat"), "r") as f:
+            for line in f:
+                for field in line.split()[1:]:
+                    key, _, value = field.partition("=")
+                    if key == "rbytes":
+                        read_bytes += int(value)
+                    elif key == "wbytes":
+                        write_bytes += int(value)
+        usage["block_io"] = {"read_bytes": read_bytes, "write_bytes": write_bytes}
+    except OSError:
+        # The io controller is not enabled for this cgroup
+        pass
+    return usage
+
+def _read_v1(paths):
+    usage = {"cpu_usage": _read_int(os.path.join(paths["cpu"], "cpuacct.usage")),
+             "memory_usage": _read_int(os.path.join(paths["memory"], "memory.usage_in_bytes")),
+             "block_io": None}
+    if paths.get("io"):
+        read_bytes = write_bytes = 0
+        try:
+            with open(os.path.join(paths["io"], "blkio.throttle.io_service_bytes"), "r") as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) == 3 and fields[1] == "Read":
+                        read_bytes += int(fields[2])
+                    elif len(fields) == 3 and fields[1] == "Write":
+                        write_bytes += int(fields[2])
+            usage["block_io"] = {"read_bytes": read_bytes, "write_bytes": write_bytes}
+        except OSError:
+            pass
+    return usage
+
+class CgroupReader:
+    """
+    Reads container resource counters directly from cgroupfs (v1 or v2), instead of asking
+    the Docker daemon for stats.
+
+    Container cgroup paths are resolved once per container ID and remembered, so repeated
+    reads (the two samples of a CPU measurement, or daemon refreshes) only open the counter
+    files. The values match the Docker stats API: cpu_usage is the total CPU time in
+    nanoseconds and memory_usage the cgroup's memory usage in bytes.
+    """
+
+    def __init__(self, root=CGROUP_ROOT):
+        self.root = root
+        self.version = cgroup_version(root)
+        self._paths = {}
+        if self.version == 1:
+            self._hierarchies = {
+                controller: next((os.path.join(root, name) for name in names
+                                  if os.path.isdir(os.path.join(root, name))), None)
+                for controller, names in V1_CONTROLLERS.items()
+            }
+
+    def available(self):
+        """
+        Returns True if cgroupfs is mounted and readable.
+        """
+        return self.version is not None and os.access(self.root, os.R_OK)
+
+    def _container_paths(self, container_id):
+        if container_id not in self._paths:
+            if self.version == 2:
+                paths = _find_cgroup(self.root, container_id)
+            else:
+                paths = {controller: _find_cgroup(hierarchy, container_id) if hierarchy else None
+                         for controller, hierarchy in self._hierarchies.items()}
+                if not (paths["cpu"] and paths["memory"]):
+                    paths = None
+            if paths is None:
+                # Not cached: the container may not have started yet
+                return None
+            self._paths[container_id] = paths
+        return self._paths[container_id]
+
+    def read(self, container_ids):
+        """
+        Reads the counters of many containers in one pass.
+
+        Args:
+            container_ids (iterable): Full container IDs.
+
+        Returns:
+            dict: A mapping of container ID to {"time", "cpu_usage", "memory_usage",
+            "block_io"}, where time is a monotonic timestamp of the read and block_io holds
+            "read_bytes" and "write_bytes" (or is None if the io controller is unavailable).
+            Containers whose cgroup cannot be found or read are left out.
+        """
+        usage = {}
+        for container_id in container_ids:
+            paths = self._container_paths(container_id)
+            if paths is None:
+                continue
+            try:
+                counters = _read_v2(paths) if self.version == 2 else _read_v1(paths)
+            except (OSError, KeyError, ValueError, IndexError):
+                # The container stopped between listing and reading
+                self._paths.pop(container_id, None)
+                continue
+            counters["time"] = time.monotonic()
+            usage[container_id] = counters
+        return usage
+
+def container_cpu_percent(before, after):
+    """
+    Computes a container's CPU usage from two timestamped reads, as a percentage of one CPU
+    (the scale of "docker stats"). Returns None if the reads are unusable.
+    """
+    elapsed_ns = (after["time"] - before["time"]) * 1e9
+    cpu_delta = after["cpu_usage"] - before["cpu_usage"]
+    if elapsed_ns <= 0 or cpu_delta < 0:
+        return None
+    return round(cpu_delta / elapsed_ns * 100.0, 2)
+
+def read_process_cgroups(pids, proc_root=PROC_ROOT):
+    """
+    Reads the cgroup path of each process from /proc/<pid>/cgroup.
+
+    The path of the unified hierarchy is used, or on cgroup v1 hosts that of the "name=systemd"
+    hierarchy, which is where systemd places the processes of each unit.
+
+    Args:
+        pids (iterable): Process IDs.
+        proc_root (str): Mountpoint of procfs.
+
+    Returns:
+        dict: A mapping of PID to cgroup path, such as "/system.slice/ssh.service". Processes
+        that exited or cannot be read are left out.
+    """
+    paths = {}
+    for pid in pids:
+        try:
+            with open(os.path.join(proc_root, str(pid), "cgroup"), "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            fields = line.split(":", 2)
+            if len(fields) != 3:
+                continue
+            _, controllers, path = fields
+            if controllers == "name=systemd":
+                paths[pid] = path
+                break
+            if controllers == "":
+                paths[pid] = path
+    return paths
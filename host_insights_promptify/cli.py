@@ -1,5 +1,20 @@
 import argparse
-from host_insights_promptify import gather_all_insights, collect_system_info, collect_network_info, collect_docker_info, collect_services_info, save_prompt_to_file
+import sys
+from host_insights_promptify import TTLCache, FileBackend, Instrumentation, format_prometheus, write_insights, stream_all_insights, export_all_insights, gather_delta_insights, save_prompt_to_file
+from host_insights_promptify.instrumentation import step
+from host_insights_promptify.promptify import raw_output
+
+def _write_structured(insights, output_format, output=None):
+    """
+    Writes insights in a machine-readable format to the output file, or to stdout.
+    """
+    if output:
+        with open(output, "wb") as stream:
+            write_insights(stream, insights, output_format)
+    else:
+        sys.stdout.flush()
+        write_insights(sys.stdout.buffer, insights, output_format)
+        sys.stdout.buffer.flush()
 
 def main():
     parser = argparse.ArgumentParser(description="Host-Insights-Promptify: A tool for gathering and optimizing system insights into an AI-ready prompt.")
@@ -9,56 +24,207 @@ def main():
     parser.add_argument("--network", action="store_true", help="Collect network-related information only")
     parser.add_argument("--docker", action="store_true", help="Collect Docker-related information only")
     parser.add_argument("--services", action="store_true", help="Collect information about running services only")
+    parser.add_argument("--units", action="store_true", help="Collect the state and resource usage of systemd units only")
     parser.add_argument("--output", type=str, help="Specify a file to save the output")
+    parser.add_argument("--format", choices=["prompt", "json", "ndjson", "msgpack", "compact"], default="prompt", help="Output format: the AI-ready prompt (default), or machine-readable data for the selected collectors")
+    parser.add_argument("--sequential", action="store_true", help="Run the collectors one after another instead of concurrently")
+    parser.add_argument("--timeout", type=float, help="Per-collector timeout in seconds; collectors that exceed it are reported as unavailable")
+    parser.add_argument("--docker-workers", type=int, default=8, help="Number of containers inspected concurrently")
+    parser.add_argument("--fast-stats", action="store_true", help="Use one-shot Docker stats sampling (faster, no CPU percentages)")
+    parser.add_argument("--no-cgroups", action="store_true", help="Always use the Docker stats API instead of reading container usage from cgroupfs")
+    parser.add_argument("--cpu-interval", type=float, default=0.5, help="Seconds over which per-process CPU usage is sampled (0 disables sampling)")
+    parser.add_argument("--token-budget", type=int, help="Summarize the report so the prompt fits roughly this many tokens")
+    parser.add_argument("--baseline", type=str, help="Baseline file used by --delta (created on the first run)")
+    parser.add_argument("--delta", action="store_true", help="Report only what changed since the baseline, then update the baseline")
+    parser.add_argument("--cache-file", type=str, help="Cache slow-changing data (platform details, routes, firewall rules, Docker networks and volumes) in this file between runs")
+    parser.add_argument("--cache-stats", action="store_true", help="Print cache hit and miss counters to stderr after the run")
+    parser.add_argument("--timings", action="store_true", help="Print the time and work of each collector and sub-step to stderr after the run")
+    parser.add_argument("--metrics-file", type=str, help="Write collection timings to this file in the Prometheus text format")
+    parser.add_argument("--daemon", type=str, metavar="SOCKET", help="Run as a daemon that keeps insights fresh and serves them on this Unix socket")
+    parser.add_argument("--refresh-interval", type=float, default=60, help="Seconds between daemon refreshes")
+    parser.add_argument("--fleet", nargs="+", metavar="HOST", help="Collect from these hosts in parallel and merge the results into one cluster-level prompt. HOST is user@host or ssh://user@host (SSH), unix:PATH (a daemon socket), or local[:NAME]")
+    parser.add_argument("--fleet-workers", type=int, default=16, help="Number of hosts collected at once with --fleet")
+    parser.add_argument("--host-timeout", type=float, default=60, help="Per-host timeout in seconds with --fleet")
+    parser.add_argument("--query", type=str, metavar="SOCKET", help="Fetch a report from a running daemon instead of collecting locally")
+    parser.add_argument("--query-command", type=str, default="PROMPT", help="Command sent with --query: PROMPT, JSON, METRICS, STATUS, REFRESH or PING")
+    parser.add_argument("--include-interface", action="append", metavar="PATTERN", help="Report only interfaces matching this glob pattern (repeatable)")
+    parser.add_argument("--exclude-interface", action="append", metavar="PATTERN", help="Leave out interfaces matching this glob pattern, e.g. 'veth*' (repeatable)")
+    parser.add_argument("--up-only", action="store_true", help="Report only network interfaces that are up")
+    parser.add_argument("--trend-window", type=float, metavar="SECONDS", help="Sample CPU, memory, disk and network I/O and per-process CPU/RSS over this many seconds and report min/mean/p95/max and trends (continuously with --daemon)")
+    parser.add_argument("--trend-interval", type=float, default=1.0, metavar="SECONDS", help="Seconds between samples with --trend-window")
+    parser.add_argument("--mount-timeout", type=float, default=2.0, metavar="SECONDS", help="Seconds each disk partition's usage query may take before the mount is reported as unresponsive")
+    parser.add_argument("--connection-mode", choices=["auto", "psutil", "procfs", "unattributed"], default="auto", help="How active connections are collected; 'unattributed' skips the socket-to-process join for speed")
 
     args = parser.parse_args()
+    cache = TTLCache(FileBackend(args.cache_file)) if args.cache_file else None
+    instrumentation = Instrumentation() if args.timings or args.metrics_file else None
+    docker_options = {"max_workers": args.docker_workers, "fast_stats": args.fast_stats, "cpu_interval": args.cpu_interval,
+                      "cache": cache}
+    if args.no_cgroups:
+        docker_options["cgroup_root"] = None
+    system_options = {"mount_timeout": args.mount_timeout}
+    network_options = {"connection_mode": args.connection_mode, "include_interfaces": args.include_interface,
+                       "exclude_interfaces": args.exclude_interface, "up_only": args.up_only}
 
-    if args.all or not any(vars(args).values()):
-        # If --all is specified or no specific option is given, gather all insights
+    if args.daemon:
+        from host_insights_promptify.daemon import InsightsDaemon
+        collect_options = dict(concurrent=not args.sequential, timeout=args.timeout,
+                               collector_options={"docker": {k: v for k, v in docker_options.items() if k != "cache"},
+                                                  "network": network_options, "system": system_options},
+                               cpu_interval=args.cpu_interval, trend_window=args.trend_window,
+                               trend_interval=args.trend_interval)
+        if cache is not None:
+            collect_options["cache"] = cache
+        InsightsDaemon(args.daemon, refresh_interval=args.refresh_interval, collect_options=collect_options).serve_forever()
+    elif args.fleet:
+        from host_insights_promptify.fleet import gather_fleet_insights
         try:
-            prompt = gather_all_insights()
+            prompt = gather_fleet_insights(args.fleet, max_workers=args.fleet_workers, timeout=args.host_timeout)
             if args.output:
                 save_prompt_to_file(prompt, args.output)
             else:
                 print(prompt)
+        except Exception as e:
+            print(f"Error gathering fleet insights: {str(e)}")
+    elif args.query:
+        from host_insights_promptify.daemon import query_daemon
+        try:
+            command = args.query_command
+            if args.token_budget and command.upper() == "PROMPT":
+                command = f"PROMPT {args.token_budget}"
+            response = query_daemon(args.query, command)
+            if args.output:
+                save_prompt_to_file(response, args.output)
+            else:
+                print(response)
+        except Exception as e:
+            print(f"Error querying daemon: {str(e)}")
+    elif args.delta:
+        if not args.baseline:
+            parser.error("--delta requires --baseline")
+        try:
+            prompt = gather_delta_insights(args.baseline, concurrent=not args.sequential, timeout=args.timeout,
+                                           collector_options={"docker": docker_options, "network": network_options, "system": system_options},
+                                           cpu_interval=args.cpu_interval, cache=cache, instrumentation=instrumentation)
+            if args.output:
+                save_prompt_to_file(prompt, args.output)
+            else:
+                print(prompt)
+        except Exception as e:
+            print(f"Error gathering insights delta: {str(e)}")
+    elif args.all or not any([args.system, args.network, args.docker, args.services, args.units]):
+        # If --all is specified or no specific option is given, gather all insights
+        try:
+            options = dict(concurrent=not args.sequential, timeout=args.timeout,
+                           collector_options={"docker": docker_options, "network": network_options, "system": system_options}, cpu_interval=args.cpu_interval,
+                           cache=cache, token_budget=args.token_budget, instrumentation=instrumentation,
+                           trend_window=args.trend_window, trend_interval=args.trend_interval)
+            if args.format != "prompt":
+                options.pop("token_budget")
+                if args.output:
+                    with open(args.output, 'wb') as output:
+                        export_all_insights(output, args.format, **options)
+                else:
+                    sys.stdout.flush()
+                    export_all_insights(sys.stdout.buffer, args.format, **options)
+                    sys.stdout.buffer.flush()
+            elif args.output:
+                with open(args.output, 'w') as output:
+                    stream_all_insights(output, **options)
+                print(f"Prompt saved to {args.output}")
+            else:
+                stream_all_insights(sys.stdout, **options)
         except Exception as e:
             print(f"Error gathering all insights: {str(e)}")
     elif args.system:
+        # Collectors are imported on demand, so a single-collector run skips the others' dependencies
+        from host_insights_promptify import collect_system_info
         try:
-            system_info = collect_system_info()
-            if args.output:
+            with step(instrumentation, "system"):
+                system_info = collect_system_info(cache=cache, instrumentation=instrumentation, **system_options)
+            if args.format != "prompt":
+                _write_structured({"system": system_info}, args.format, args.output)
+            elif args.output:
                 save_prompt_to_file(system_info, args.output)
             else:
-                print(system_info)
+                print(raw_output(system_info))
         except Exception as e:
             print(f"Error gathering system information: {str(e)}")
     elif args.network:
+        from host_insights_promptify import collect_network_info
         try:
-            network_info = collect_network_info()
-            if args.output:
+            with step(instrumentation, "network"):
+                network_info = collect_network_info(cache=cache, lazy_connections=args.format != "prompt",
+                                                    instrumentation=instrumentation, **network_options)
+            if args.format != "prompt":
+                _write_structured({"network": network_info}, args.format, args.output)
+            elif args.output:
                 save_prompt_to_file(network_info, args.output)
             else:
-                print(network_info)
+                print(raw_output(network_info))
         except Exception as e:
             print(f"Error gathering network information: {str(e)}")
     elif args.docker:
+        from host_insights_promptify import collect_docker_info
         try:
-            docker_info = collect_docker_info()
-            if args.output:
+            with step(instrumentation, "docker"):
+                docker_info = collect_docker_info(instrumentation=instrumentation, **docker_options)
+            if args.format != "prompt":
+                _write_structured({"docker": docker_info}, args.format, args.output)
+            elif args.output:
                 save_prompt_to_file(docker_info, args.output)
             else:
-                print(docker_info)
+                print(raw_output(docker_info))
         except Exception as e:
             print(f"Error gathering Docker information: {str(e)}")
     elif args.services:
+        from host_insights_promptify import collect_services_info
         try:
-            services_info = collect_services_info()
-            if args.output:
-                save_prompt_to_file(services_info, args.output)
-            else:
-                print(services_info)
+            # Lazily collected services are produced while they are written, so time both
+            with step(instrumentation, "services") as record:
+                services_info = collect_services_info(cpu_interval=args.cpu_interval, lazy=args.format != "prompt")
+                if args.format != "prompt":
+                    _write_structured({"services": services_info}, args.format, args.output)
+                else:
+                    record.items = len(services_info)
+                    if args.output:
+                        save_prompt_to_file(services_info, args.output)
+                    else:
+                        print(raw_output(services_info))
         except Exception as e:
             print(f"Error gathering services information: {str(e)}")
+    elif args.units:
+        from host_insights_promptify import collect_units_info
+        try:
+            with step(instrumentation, "units"):
+                units_info = collect_units_info(cpu_interval=args.cpu_interval, instrumentation=instrumentation)
+            if args.format != "prompt":
+                _write_structured({"units": units_info}, args.format, args.output)
+            elif args.output:
+                save_prompt_to_file(units_info, args.output)
+            else:
+                print(raw_output(units_info))
+        except Exception as e:
+            print(f"Error gathering systemd unit information: {str(e)}")
+
+    if instrumentation is not None:
+        timings = instrumentation.timings()
+        if args.timings:
+            print(f"{'Step':<28}{'Wall (s)':>10}{'CPU (s)':>10}{'Items':>8}  Operations", file=sys.stderr)
+            for name, measurement in timings.items():
+                items = "-" if measurement["items"] is None else measurement["items"]
+                operations = ", ".join(f"{kind}={value}" for kind, value in sorted(measurement["counts"].items()))
+                print(f"{name:<28}{measurement['wall_s']:>10.3f}{measurement['cpu_s']:>10.3f}{items:>8}  {operations}",
+                      file=sys.stderr)
+        if args.metrics_file:
+            with open(args.metrics_file, "w") as f:
+                f.write(format_prometheus(timings))
+
+    if cache is not None and args.cache_stats:
+        stats = cache.stats()
+        print(f"Cache: {stats['hits']} hits, {stats['misses']} misses", file=sys.stderr)
+        for field, field_stats in sorted(stats["fields"].items()):
+            print(f"  {field}: {field_stats['hits']} hits, {field_stats['misses']} misses", file=sys.stderr)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
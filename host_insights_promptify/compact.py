@@ -0,0 +1,261 @@
+import collections
+from .promptify import iter_prompt
+
+# Average number of characters per token for English prose and log-like text
+CHARS_PER_TOKEN = 4
+
+# Compaction levels, from least to most aggressive. Each level caps how many entries of each
+# kind are kept; the first level whose rendered prompt fits the budget is used.
+COMPACTION_LEVELS = [
+    {"services": 50, "connections": 50, "interfaces": 50, "routes": 50, "containers": 50,
+     "docker_networks": 50, "volumes": 50, "firewall_lines": 100, "trend_processes": 10, "units": 50},
+    {"services": 20, "connections": 20, "interfaces": 20, "routes": 20, "containers": 20,
+     "docker_networks": 20, "volumes": 20, "firewall_lines": 40, "trend_processes": 6, "units": 20},
+    {"services": 10, "connections": 10, "interfaces": 10, "routes": 10, "containers": 10,
+     "docker_networks": 10, "volumes": 10, "firewall_lines": 15, "trend_processes": 4, "units": 10},
+    {"services": 5, "connections": 5, "interfaces": 5, "routes": 5, "containers": 5,
+     "docker_networks": 5, "volumes": 5, "firewall_lines": 5, "trend_processes": 2, "units": 5},
+]
+
+def estimate_tokens(text):
+    """
+    Estimates the number of LLM tokens in a piece of text.
+
+    This is a fast, local approximation (about four characters per token) rather than an
+    exact count for any specific tokenizer.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The estimated token count.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def estimate_prompt_tokens(system_info, network_info, docker_info, services_info, trends=None, units=None, limit=None):
+    """
+    Estimates the token count of the prompt that would be rendered from the given data,
+    without building the prompt string.
+
+    Args:
+        trends (dict): Optional metric trends, rendered after the services.
+        units (dict): Optional systemd units, rendered after the trends.
+        limit (int): Stop counting as soon as the estimate exceeds this many tokens.
+
+    Returns:
+        int: The estimated token count (a value above limit if counting stopped early).
+    """
+    characters = 0
+    for line in iter_prompt(system_info, network_info, docker_info, services_info, trends=trends, units=units):
+        characters += len(line) + 1
+        if limit is not None and characters > limit * CHARS_PER_TOKEN:
+            break
+    return (characters + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def _truncate(items, limit):
+    """
+    Keeps the first limit items and appends an "omitted" marker for the rest.
+    """
+    if len(items) <= limit:
+        return list(items)
+    return list(items[:limit]) + [{"omitted": len(items) - limit}]
+
+def _number(value):
+    """
+    Returns a numeric value for sorting, treating "N/A" and other non-numbers as 0.
+    """
+    return value if isinstance(value, (int, float)) else 0
+
+def _split_port(address):
+    """
+    Returns the port of an "ip:port" address string, or None.
+    """
+    if not address:
+        return None
+    return address.rsplit(":", 1)[-1]
+
+def aggregate_connections(connections):
+    """
+    Aggregates individual connections into groups of (process, protocol, status, port).
+
+    Connections with a remote end are grouped by remote port; listening and unconnected
+    sockets are grouped by local port.
+
+    Args:
+        connections (iterable): Connection dictionaries as produced by collect_network_info.
+
+    Returns:
+        list: Group dictionaries with a "count" key, largest group first.
+    """
+    groups = collections.Counter()
+    for conn in connections:
+        remote_port = _split_port(conn.get("remote_address"))
+        local_port = None if remote_port else _split_port(conn.get("local_address"))
+        groups[(conn.get("process"), conn.get("protocol"), conn.get("status"), remote_port, local_port)] += 1
+
+    return [
+        {"process": process, "protocol": protocol, "status": status,
+         "remote_port": remote_port, "local_port": local_port, "count": count}
+        for (process, protocol, status, remote_port, local_port), count in groups.most_common()
+    ]
+
+def top_services(services, limit):
+    """
+    Selects the most resource-hungry services: the top entries by CPU usage together with
+    the top entries by memory usage, ordered by memory usage.
+
+    Args:
+        services (iterable): Service dictionaries as produced by collect_services_info.
+        limit (int): How many services to take from each ranking.
+
+    Returns:
+        list: The selected services, followed by an "omitted" marker if any were dropped.
+    """
+    services = list(services)
+    by_cpu = sorted(services, key=lambda s: _number(s.get("cpu_usage")), reverse=True)[:limit]
+    by_memory = sorted(services, key=lambda s: _number(s.get("memory_usage")), reverse=True)[:limit]
+
+    selected = {id(s): s for s in by_memory + by_cpu}
+    kept = sorted(selected.values(), key=lambda s: _number(s.get("memory_usage")), reverse=True)
+    if len(kept) < len(services):
+        kept.append({"omitted": len(services) - len(kept)})
+    return kept
+
+def collapse_containers(containers):
+    """
+    Collapses containers that share an image, status, health status, and restart policy
+    (for example, the replicas of one service) into a single entry with a "count".
+
+    Args:
+        containers (iterable): Container dictionaries as produced by collect_docker_info.
+
+    Returns:
+        list: Container dictionaries; collapsed entries list their members' names.
+    """
+    groups = collections.OrderedDict()
+    for container in containers:
+        key = (tuple(container.get("image") or ()), container.get("status"),
+               container.get("health_status"), container.get("restart_policy"))
+        groups.setdefault(key, []).append(container)
+
+    collapsed = []
+    for members in groups.values():
+        if len(members) == 1:
+            collapsed.append(members[0])
+            continue
+        representative = dict(members[0])
+        names = [member.get("name", "N/A") for member in members]
+        representative["name"] = ", ".join(names[:5]) + (f" (+{len(names) - 5} more)" if len(names) > 5 else "")
+        representative["count"] = len(members)
+        collapsed.append(representative)
+    return collapsed
+
+def truncate_lines(text, limit):
+    """
+    Truncates multi-line text (such as firewall rules) to its first limit lines.
+    """
+    if not text:
+        return text
+    lines = text.splitlines()
+    if len(lines) <= limit:
+        return text
+    return "\n".join(lines[:limit] + [f"... {len(lines) - limit} more lines truncated"])
+
+def compact_units(units_info, limit):
+    """
+    Summarizes systemd units: inactive units are reduced to a count, and at most limit of
+    the other units are listed, failed units and units with the most restarts first.
+
+    Args:
+        units_info (dict): Units as produced by collect_units_info.
+        limit (int): How many units to list.
+
+    Returns:
+        dict: The units, ordered by name and followed by an "omitted" marker if any were
+        dropped, with the totals per state in "counts".
+    """
+    units = units_info.get("units", [])
+    listed = [unit for unit in units if unit.get("active_state") != "inactive"]
+    failed = sum(1 for unit in listed if unit.get("active_state") == "failed")
+    counts = {"active": len(listed) - failed, "failed": failed, "inactive": len(units) - len(listed)}
+
+    ranked = sorted(listed, key=lambda unit: (unit.get("active_state") != "failed", -_number(unit.get("restarts"))))
+    kept = sorted(ranked[:limit], key=lambda unit: unit.get("name", ""))
+    if len(kept) < len(listed):
+        kept.append({"omitted": len(listed) - len(kept)})
+    return dict(units_info, units=kept, counts=counts)
+
+def apply_compaction(system_info, network_info, docker_info, services_info, level, trends=None, units=None):
+    """
+    Applies one compaction level to the collected data.
+
+    Args:
+        level (dict): Per-kind entry limits, as in COMPACTION_LEVELS.
+        trends (dict): Optional metric trends; only the busiest processes are kept.
+        units (dict): Optional systemd units; see compact_units.
+
+    Returns:
+        tuple: Compacted (system_info, network_info, docker_info, services_info, trends, units).
+    """
+    network_info = dict(network_info)
+    network_info["interfaces"] = _truncate(
+        sorted(network_info.get("interfaces", []), key=lambda i: i.get("status") != "up"), level["interfaces"])
+    network_info["routing_table"] = _truncate(network_info.get("routing_table", []), level["routes"])
+    network_info["active_connections"] = _truncate(
+        aggregate_connections(network_info.get("active_connections", [])), level["connections"])
+    network_info["firewall_rules"] = truncate_lines(network_info.get("firewall_rules"), level["firewall_lines"])
+
+    docker_info = dict(docker_info)
+    docker_info["containers"] = _truncate(collapse_containers(docker_info.get("containers", [])), level["containers"])
+    docker_info["networks"] = _truncate(docker_info.get("networks", []), level["docker_networks"])
+    docker_info["volumes"] = _truncate(docker_info.get("volumes", []), level["volumes"])
+
+    if trends and trends.get("processes"):
+        # Summaries are ordered by mean CPU usage, so the busiest processes are kept
+        trends = dict(trends, processes=_truncate(trends["processes"], level["trend_processes"]))
+
+    if units and units.get("units"):
+        units = compact_units(units, level["units"])
+
+    return system_info, network_info, docker_info, top_services(services_info, level["services"]), trends, units
+
+def compact_insights(system_info, network_info, docker_info, services_info, trends=None, units=None,
+                     token_budget=None):
+    """
+    Ranks and summarizes the collected data so the rendered prompt fits a token budget.
+
+    The data is returned unchanged if it already fits. Otherwise, connections are aggregated
+    by (process, status, port), only the top services by CPU and memory are kept, identical
+    containers are collapsed, firewall output is truncated, only the busiest processes of the
+    metric trends are kept, inactive systemd units are reduced to a count and failed and
+    restarting units are listed first, and long lists are cut with a note of how many entries
+    were omitted, tightening until the prompt fits. If even the most
+    aggressive level does not fit, its result is returned anyway.
+
+    Args:
+        system_info (dict): System-related information.
+        network_info (dict): Network-related information.
+        docker_info (dict): Docker-related information.
+        services_info (list): Information about running services.
+        trends (dict): Optional metric trends sampled over a window.
+        units (dict): Optional systemd units.
+        token_budget (int): The target prompt size in (estimated) tokens. None returns the
+            data unchanged.
+
+    Returns:
+        tuple: The (system_info, network_info, docker_info, services_info, trends, units) to render.
+    """
+    # Compaction needs to look at the data more than once, so materialize lazy collections
+    network_info = dict(network_info, active_connections=list(network_info.get("active_connections", [])))
+    services_info = list(services_info)
+
+    insights = (system_info, network_info, docker_info, services_info, trends, units)
+    if token_budget is None or estimate_prompt_tokens(*insights, limit=token_budget) <= token_budget:
+        return insights
+
+    for level in COMPACTION_LEVELS:
+        compacted = apply_compaction(system_info, network_info, docker_info, services_info, level, trends=trends,
+                                     units=units)
+        if estimate_prompt_tokens(*compacted, limit=token_budget) <= token_budget:
+            return compacted
+    return compacted
@@ -0,0 +1,83 @@
+import collections
+import threading
+import time
+
+def run_concurrently(tasks, timeout=None, max_workers=None):
+    """
+    Runs a set of zero-argument callables concurrently on a bounded pool of daemon threads.
+
+    Each task gets its own deadline, measured from the moment a worker picks it up. A task
+    that misses its deadline is abandoned: its result is discarded, and a replacement worker
+    is started so the remaining tasks are not starved by a stalled one. Because the workers
+    are daemon threads, an abandoned task can never block interpreter shutdown.
+
+    Args:
+        tasks (dict): A mapping of task name to a callable taking no arguments.
+        timeout (float): Per-task timeout in seconds. None waits indefinitely.
+        max_workers (int): Maximum number of tasks running at once. Defaults to one worker per task.
+
+    Returns:
+        tuple: A (results, errors) pair of dictionaries keyed by task name. Tasks that completed
+        appear in results; tasks that raised or timed out appear in errors with a message.
+    """
+    pending = collections.deque(tasks.items())
+    total = len(pending)
+    results = {}
+    errors = {}
+    running = {}
+    condition = threading.Condition()
+
+    if not total:
+        return results, errors
+
+    def worker():
+        while True:
+            with condition:
+                if not pending:
+                    return
+                name, func = pending.popleft()
+                running[name] = time.monotonic()
+                # Wake the supervisor so it starts tracking this task's deadline
+                condition.notify_all()
+
+            try:
+                value, error = func(), None
+            except Exception as e:
+                value, error = None, str(e)
+
+            with condition:
+                if name not in running:
+                    # This task was abandoned and a replacement worker has taken our place
+                    return
+                del running[name]
+                if error is None:
+                    results[name] = value
+                else:
+                    errors[name] = error
+                condition.notify_all()
+
+    def spawn_worker():
+        threading.Thread(target=worker, name="hip-worker", daemon=True).start()
+
+    with condition:
+        for _ in range(min(max_workers or total, total)):
+            spawn_worker()
+
+        while len(results) + len(errors) < total:
+            wait = None
+            if timeout is not None:
+                now = time.monotonic()
+                for name, started in list(running.items()):
+                    remaining = started + timeout - now
+                    if remaining <= 0:
+                        del running[name]
+                        errors[name] = f"timed out after {timeout}s"
+                        if pending:
+                            spawn_worker()
+                    elif wait is None or remaining < wait:
+                        wait = remaining
+                if len(results) + len(errors) >= total:
+                    break
+            condition.wait(wait)
+
+    return results, errors
@@ -0,0 +1,280 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from . import collect_all_insights
+from .cache import TTLCache
+from .compact import compact_insights
+from .instrumentation import Instrumentation, format_prometheus
+from .promptify import PromptRenderer, format_prompt
+from .sampling import DEFAULT_SAMPLE_INTERVAL, MetricsSampler
+from .serialize import iter_serialized
+
+DEFAULT_REFRESH_INTERVAL = 60
+COMMANDS = ("PING", "PROMPT", "JSON", "METRICS", "REFRESH", "STATUS")
+
+class InsightsDaemon:
+    """
+    Keeps the collectors warm in a long-running process and serves reports over a Unix socket.
+
+    Insights are refreshed on a schedule in a background thread, and the rendered prompt and
+    JSON document are prepared once per refresh, so a query returns a fresh report without
+    paying for interpreter startup, imports, Docker client construction, or collection. Docker
+    objects are tracked by a DockerInventory, so a refresh only inspects what changed.
+
+    Protocol: a client connects, sends one command line and reads the response. Commands are
+    PING, PROMPT [token_budget], JSON, METRICS (collection timings in the Prometheus text
+    format), REFRESH (collect now and wait for it) and STATUS. The
+    response starts with a header line, "OK <length>" or "ERR <message>", and for OK is
+    followed by <length> bytes of UTF-8 body. The server then closes the connection.
+
+    With a trend window, metrics are sampled continuously on a background thread and every
+    report summarizes the most recent window, without waiting for a sampling run.
+    """
+
+    def __init__(self, socket_path, refresh_interval=DEFAULT_REFRESH_INTERVAL, collect_options=None):
+        """
+        Args:
+            socket_path (str): Path of the Unix domain socket to listen on.
+            refresh_interval (float): Seconds between background refreshes.
+            collect_options (dict): Keyword arguments passed to collect_all_insights on each refresh.
+                A trend_window (and trend_interval) starts continuous trend sampling instead.
+        """
+        self.socket_path = socket_path
+        self.refresh_interval = refresh_interval
+        self.collect_options = dict(collect_options or {})
+        self.collect_options.setdefault("cache", TTLCache())
+        trend_window = self.collect_options.pop("trend_window", None)
+        trend_interval = self.collect_options.pop("trend_interval", DEFAULT_SAMPLE_INTERVAL)
+        self.sampler = MetricsSampler(trend_window, interval=trend_interval) if trend_window else None
+        self.cache = self.collect_options["cache"]
+        self.renderer = PromptRenderer()
+        self.refresh_count = 0
+        self.last_refresh_duration = None
+        self._docker_client = None
+        self._docker_inventory = None
+        self._insights = None
+        self._prompt = None
+        self._json = None
+        self._updated_at = None
+        self._last_error = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._server = None
+
+    def _get_docker_client(self):
+        """
+        Returns a Docker client that is created once and reused by every refresh.
+        Returns None if the daemon is unreachable; creation is retried on the next refresh.
+        """
+        if self._docker_client is None:
+            # Imported here, so clients that only query a daemon do not load the Docker SDK
+            import docker
+            from .docker import DEFAULT_MAX_WORKERS
+            try:
+                self._docker_client = docker.from_env(max_pool_size=DEFAULT_MAX_WORKERS)
+            except Exception:
+                return None
+        return self._docker_client
+
+    def _get_docker_inventory(self):
+        """
+        Returns the event-driven Docker inventory, started on first use, so refreshes after the
+        first only fetch containers, networks and volumes that changed. Returns None if the
+        Docker daemon is unreachable.
+        """
+        if self._docker_inventory is None:
+            client = self._get_docker_client()
+            if client is None:
+                return None
+            from .inventory import DockerInventory
+            docker_options = (self.collect_options.get("collector_options") or {}).get("docker", {})
+            self._docker_inventory = DockerInventory(client, **{key: docker_options[key] for key in
+                                                                ("max_workers", "fast_stats", "cgroup_root",
+                                                                 "cpu_interval")
+                                                                if key in docker_options})
+            self._docker_inventory.start()
+        return self._docker_inventory
+
+    def refresh(self):
+        """
+        Collects fresh insights and pre-renders the prompt and JSON responses.
+        """
+        with self._refresh_lock:
+            started = time.monotonic()
+            options = dict(self.collect_options)
+            collector_options = {name: dict(opts) for name, opts in (options.pop("collector_options", None) or {}).items()}
+            inventory = self._get_docker_inventory()
+            if inventory is not None:
+                collector_options.setdefault("docker", {}).setdefault("inventory", inventory)
+            options.setdefault("instrumentation", Instrumentation())
+            if self.sampler is not None:
+                options.setdefault("sampler", self.sampler)
+            insights = collect_all_insights(collector_options=collector_options, **options)
+
+            prompt = format_prompt(insights["system"], insights["network"], insights["docker"], insights["services"],
+                                   trends=insights.get("trends"), units=insights.get("units"), renderer=self.renderer)
+            document = b"".join(iter_serialized(insights, "json")).decode("utf-8")
+            with self._lock:
+                self._insights = insights
+                self._prompt = prompt
+                self._json = document
+                self._updated_at = time.time()
+            self.refresh_count += 1
+            self.last_refresh_duration = time.monotonic() - started
+            self._ready.set()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+                self._last_error = None
+            except Exception as e:
+                self._last_error = str(e)
+                print(f"Error refreshing insights: {str(e)}")
+                # Let waiting queries fail instead of blocking until a refresh succeeds
+                self._ready.set()
+            self._stop.wait(self.refresh_interval)
+
+    def handle_command(self, line):
+        """
+        Executes one protocol command.
+
+        Args:
+            line (str): The command line sent by the client.
+
+        Returns:
+            str: The response body.
+
+        Raises:
+            ValueError: If the command is unknown or malformed.
+        """
+        parts = line.strip().split()
+        command = parts[0].upper() if parts else ""
+        if command not in COMMANDS:
+            raise ValueError(f"unknown command '{command}', expected one of {', '.join(COMMANDS)}")
+
+        if command == "PING":
+            return "PONG"
+        if command == "REFRESH":
+            self.refresh()
+            return "refreshed"
+
+        self._ready.wait()
+        with self._lock:
+            insights, prompt, document, updated_at = self._insights, self._prompt, self._json, self._updated_at
+        if insights is None:
+            raise RuntimeError(f"no insights collected yet: {self._last_error}")
+
+        if command == "STATUS":
+            return json.dumps({
+                "updated_at": updated_at,
+                "refresh_count": self.refresh_count,
+                "last_refresh_duration": self.last_refresh_duration,
+                "refresh_interval": self.refresh_interval,
+                "last_error": self._last_error,
+                "cache": self.cache.stats() if self.cache is not None else None,
+                "render_cache": self.renderer.stats(),
+            })
+        if command == "JSON":
+            return document
+        if command == "METRICS":
+            return format_prometheus(insights.get("timings", {}))
+        if len(parts) > 1:
+            try:
+                token_budget = int(parts[1])
+            except ValueError:
+                raise ValueError(f"invalid token budget '{parts[1]}'")
+            sections = (insights["system"], insights["network"], insights["docker"], insights["services"],
+                        insights.get("trends"), insights.get("units"))
+            return format_prompt(*compact_insights(*sections, token_budget=token_budget))
+        return prompt
+
+    def start(self):
+        """
+        Starts the refresh thread and the socket server in the background.
+        """
+        if os.path.exists(self.socket_path):
+            # A stale socket from a previous run would make bind() fail
+            os.unlink(self.socket_path)
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline(1024).decode("utf-8", "replace")
+                try:
+                    body = daemon.handle_command(line).encode("utf-8")
+                    self.wfile.write(f"OK {len(body)}\n".encode("utf-8") + body)
+                except Exception as e:
+                    self.wfile.write(f"ERR {str(e)}\n".encode("utf-8"))
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self._server.daemon_threads = True
+        os.chmod(self.socket_path, 0o600)
+
+        if self.sampler is not None:
+            self.sampler.start()
+        threading.Thread(target=self._refresh_loop, name="hip-refresh", daemon=True).start()
+        threading.Thread(target=self._server.serve_forever, name="hip-server", daemon=True).start()
+
+    def serve_forever(self):
+        """
+        Starts the daemon and blocks until it is stopped (for example, with Ctrl+C).
+        """
+        self.start()
+        try:
+            while not self._stop.wait(1):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """
+        Stops the refresh thread and the socket server and removes the socket file.
+        """
+        self._stop.set()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self._docker_inventory is not None:
+            self._docker_inventory.stop()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+def query_daemon(socket_path, command="PROMPT", timeout=30):
+    """
+    Sends a command to a running InsightsDaemon and returns its response.
+
+    Args:
+        socket_path (str): Path of the daemon's Unix domain socket.
+        command (str): The protocol command, e.g. "PROMPT", "PROMPT 4000", "JSON" or "STATUS".
+        timeout (float): Socket timeout in seconds.
+
+    Returns:
+        str: The response body.
+
+    Raises:
+        RuntimeError: If the daemon reports an error or the response is malformed.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(command.encode("utf-8") + b"\n")
+        with sock.makefile("rb") as response:
+            header = response.readline().decode("utf-8").rstrip("\n")
+            status, _, detail = header.partition(" ")
+            if status == "ERR":
+                raise RuntimeError(f"Daemon error: {detail}")
+            if status != "OK" or not detail.isdigit():
+                raise RuntimeError(f"Malformed daemon response: {header!r}")
+            return response.read(int(detail)).decode("utf-8")
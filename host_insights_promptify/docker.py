@@ -1,13 +1,206 @@
+import time
 import docker
+from .cache import cached
+from .cgroups import CGROUP_ROOT, CgroupReader, container_cpu_percent
+from .concurrency import run_concurrently
+from .instrumentation import step
+from .processes import DEFAULT_CPU_INTERVAL
+from .records import ContainerRecord
 
-def collect_docker_info():
+DEFAULT_MAX_WORKERS = 8
+
+def _cpu_percent(stats):
+    """
+    Computes a container's CPU usage percentage from the current and previous CPU samples
+    in a stats payload. Returns None if the payload carries no previous sample (one-shot mode).
+    """
+    try:
+        cpu_stats = stats["cpu_stats"]
+        precpu_stats = stats["precpu_stats"]
+        cpu_delta = cpu_stats["cpu_usage"]["total_usage"] - precpu_stats["cpu_usage"]["total_usage"]
+        system_delta = cpu_stats["system_cpu_usage"] - precpu_stats["system_cpu_usage"]
+        online_cpus = cpu_stats.get("online_cpus") or len(cpu_stats["cpu_usage"].get("percpu_usage") or [1])
+    except (KeyError, TypeError):
+        return None
+    if system_delta <= 0 or cpu_delta < 0:
+        return None
+    return round(cpu_delta / system_delta * online_cpus * 100.0, 2)
+
+def _block_io(stats):
+    """
+    Sums the bytes read and written by a container from a stats payload, or returns None.
+    """
+    entries = (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive")
+    if not entries:
+        return None
+    totals = {"read_bytes": 0, "write_bytes": 0}
+    for entry in entries:
+        op = str(entry.get("op", "")).lower()
+        if op in ("read", "write"):
+            totals[f"{op}_bytes"] += entry.get("value", 0)
+    return totals
+
+def _api_call(record, endpoint):
+    """
+    Calls an API list endpoint, counting the call on the instrumentation record.
+    """
+    record.count("api_calls")
+    return endpoint()
+
+def _container_name(summary):
+    """
+    Returns a container's name from its list (summary) entry.
+    """
+    names = summary.get("Names") or [summary["Id"][:12]]
+    return names[0].lstrip("/")
+
+def _collect_container(api, summary, image_tags, fast_stats, api_stats=True):
+    """
+    Fetches the attributes and resource statistics of a single container.
+
+    Image tags are resolved from the prefetched image index instead of inspecting the
+    container's image, so each container costs one inspect and at most one stats call.
+
+    Args:
+        api (docker.APIClient): The low-level API client.
+        summary (dict): The container's entry from the container list.
+        image_tags (dict): A mapping of image ID to its repository tags.
+        fast_stats (bool): Use one-shot stats sampling, which returns immediately instead of
+            waiting for the daemon to take a second CPU sample.
+        api_stats (bool): Fetch resource statistics from the stats API. If False, the usage
+            fields are left as None for the caller to fill in (from cgroupfs).
+
+    Returns:
+        ContainerRecord: The container's details.
+    """
+    attrs = api.inspect_container(summary["Id"])
+    cpu_usage = memory_usage = cpu_percent = block_io = None
+    if api_stats:
+        try:
+            if fast_stats:
+                container_stats = api.stats(summary["Id"], stream=False, one_shot=True)
+            else:
+                container_stats = api.stats(summary["Id"], stream=False)
+            cpu_usage = container_stats["cpu_stats"]["cpu_usage"]["total_usage"]
+            memory_usage = container_stats["memory_stats"]["usage"]
+            cpu_percent = _cpu_percent(container_stats)
+            block_io = _block_io(container_stats)
+        except KeyError:
+            # Handle the case where stats might not be available or complete
+            cpu_usage = "N/A"
+            memory_usage = "N/A"
+            cpu_percent = None
+
+    return ContainerRecord(
+        name=_container_name(summary),
+        image=image_tags.get(summary.get("ImageID"), []),
+        status=attrs["State"]["Status"],
+        ports=attrs["NetworkSettings"].get("Ports") or {},
+        cpu_usage=cpu_usage,
+        cpu_percent=cpu_percent,
+        memory_usage=memory_usage,
+        block_io=block_io,
+        env=attrs["Config"]["Env"],
+        health_status=attrs["State"].get("Health", {}).get("Status", "No health check"),
+        restart_policy=attrs["HostConfig"]["RestartPolicy"]["Name"],
+        mounts=attrs["Mounts"],
+        networks=attrs["NetworkSettings"]["Networks"]
+    )
+
+def _network_members(container_summaries):
+    """
+    Builds a mapping of network ID to the names of the containers attached to it, using
+    the network settings already present in the container list.
+    """
+    members = {}
+    for summary in container_summaries:
+        networks = (summary.get("NetworkSettings") or {}).get("Networks") or {}
+        for endpoint in networks.values():
+            members.setdefault(endpoint.get("NetworkID"), []).append(_container_name(summary))
+    return members
+
+def _container_error(summary, image_tags, error):
+    """
+    Describes a container whose details could not be collected.
+    """
+    return {
+        "name": _container_name(summary),
+        "image": image_tags.get(summary.get("ImageID"), []),
+        "status": summary.get("State", "N/A"),
+        "error": error
+    }
+
+def _network_info(network, network_members):
+    ipam_config = (network.get("IPAM") or {}).get("Config") or [{}]
+    return {
+        "name": network["Name"],
+        "id": network["Id"],
+        "driver": network["Driver"],
+        "subnet": ipam_config[0].get("Subnet"),
+        "gateway": ipam_config[0].get("Gateway"),
+        "containers": network_members.get(network["Id"], [])
+    }
+
+def _volume_info(volume):
+    return {
+        "name": volume["Name"],
+        "mountpoint": volume['Mountpoint'],
+        "driver": volume["Driver"],
+        "labels": volume.get("Labels") or {},
+        # Docker API does not provide direct usage statistics for volumes,
+        # so usage statistics are not included here.
+    }
+
+def _apply_cgroup_usage(container, before, after):
+    """
+    Fills a container's usage fields from one or two cgroupfs reads.
+    """
+    latest = after or before
+    container.cpu_usage = latest["cpu_usage"]
+    container.memory_usage = latest["memory_usage"]
+    container.block_io = latest["block_io"]
+    container.cpu_percent = container_cpu_percent(before, after) if after else None
+
+def collect_docker_info(client=None, max_workers=DEFAULT_MAX_WORKERS, fast_stats=False, timeout=None, cache=None,
+                        instrumentation=None, cgroup_root=CGROUP_ROOT, cpu_interval=DEFAULT_CPU_INTERVAL,
+                        inventory=None):
     """
     Collects detailed information about Docker containers, networks, and volumes.
 
+    Containers, images, networks, and volumes are each listed once and joined in memory by ID,
+    so image tags and network membership cost no extra API calls. Per-container inspection and
+    stats sampling are fanned out over a pool of worker threads sharing one pooled Docker API
+    connection, so collection time scales with the number of workers rather than the number
+    of containers.
+
+    When cgroupfs is readable (the collector runs on the Docker host, or in a container with
+    /sys/fs/cgroup mounted), CPU, memory and block I/O usage of running containers are read
+    from their cgroups in two batched passes cpu_interval apart, and the stats API is only
+    called for containers whose cgroup cannot be found.
+
+    Args:
+        client (docker.DockerClient): An existing client to reuse. If None, one is created from the
+            environment with a connection pool sized to max_workers.
+        max_workers (int): Number of containers inspected concurrently.
+        fast_stats (bool): Use one-shot stats sampling. CPU percentages are unavailable in this mode.
+        timeout (float): Per-container timeout in seconds. None waits indefinitely.
+        cache (TTLCache): Optional cache for the network and volume lists. Network membership is
+            always derived from the live container list.
+        instrumentation (Instrumentation): Optional recorder for the time and API calls of each sub-step.
+        cgroup_root (str): Mountpoint of cgroupfs. None always uses the stats API.
+        cpu_interval (float): Seconds between the two cgroup reads a CPU percentage is computed from.
+            None or 0 skips the second read, leaving CPU percentages unavailable.
+        inventory (DockerInventory): An event-driven inventory to report from instead of listing
+            and inspecting every object. The other collection options are then ignored.
+
     Returns:
         dict: A dictionary containing Docker information such as running containers, networks, and volumes.
     """
-    client = docker.from_env()
+    if inventory is not None:
+        return inventory.report(instrumentation=instrumentation)
+    if client is None:
+        client = docker.from_env(max_pool_size=max(max_workers, 1))
+    api = client.api
     docker_info = {
         "containers": [],
         "networks": [],
@@ -15,59 +208,75 @@ def collect_docker_info():
     }
 
     try:
+        # List every object type once; everything else is joined in memory
+        with step(instrumentation, "docker.list") as record:
+            container_summaries = _api_call(record, api.containers)
+            image_tags = {image["Id"]: image.get("RepoTags") or [] for image in _api_call(record, api.images)}
+            network_members = _network_members(container_summaries)
+            record.items = len(container_summaries)
+
+        # Read resource usage of running containers straight from cgroupfs where possible
+        first_read = {}
+        reader = CgroupReader(cgroup_root) if cgroup_root else None
+        if reader is not None and reader.available():
+            with step(instrumentation, "docker.cgroups") as record:
+                first_read = reader.read(summary["Id"] for summary in container_summaries
+                                         if summary.get("State") == "running")
+                record.items = len(first_read)
+                record.count("cgroup_reads", len(first_read))
+
         # Collect running containers with detailed info
-        containers = client.containers.list()
-        for container in containers:
-            try:
-                container_stats = container.stats(stream=False)
-                cpu_usage = container_stats["cpu_stats"]["cpu_usage"]["total_usage"]
-                memory_usage = container_stats["memory_stats"]["usage"]
-            except KeyError:
-                # Handle the case where stats might not be available or complete
-                cpu_usage = "N/A"
-                memory_usage = "N/A"
-
-            docker_info["containers"].append({
-                "name": container.name,
-                "image": container.image.tags,
-                "status": container.status,
-                "ports": container.ports,
-                "cpu_usage": cpu_usage,
-                "memory_usage": memory_usage,
-                "env": container.attrs["Config"]["Env"],
-                "health_status": container.attrs["State"].get("Health", {}).get("Status", "No health check"),
-                "restart_policy": container.attrs["HostConfig"]["RestartPolicy"]["Name"],
-                "mounts": container.attrs["Mounts"],
-                "networks": container.attrs["NetworkSettings"]["Networks"]
-            })
+        with step(instrumentation, "docker.containers") as record:
+            tasks = {
+                index: (lambda summary=summary: _collect_container(api, summary, image_tags, fast_stats,
+                                                                   api_stats=summary["Id"] not in first_read))
+                for index, summary in enumerate(container_summaries)
+            }
+            results, errors = run_concurrently(tasks, timeout=timeout, max_workers=max_workers)
+            record.items = len(results)
+            # One inspect per container, plus a stats call for those not covered by cgroupfs
+            stats_calls = sum(1 for summary in container_summaries if summary["Id"] not in first_read)
+            record.count("api_calls", len(tasks) + stats_calls)
+            if errors:
+                record.count("errors", len(errors))
+
+        if first_read:
+            second_read = {}
+            # Without a sampling window, a second read would measure CPU over a few milliseconds
+            if not fast_stats and cpu_interval:
+                # The inspects above usually cover most of the interval
+                with step(instrumentation, "docker.cgroups") as record:
+                    remaining = cpu_interval - (time.monotonic() - min(usage["time"] for usage in first_read.values()))
+                    if remaining > 0:
+                        time.sleep(remaining)
+                    second_read = reader.read(first_read)
+                    record.count("cgroup_reads", len(second_read))
+            for index, summary in enumerate(container_summaries):
+                if index in results and summary["Id"] in first_read:
+                    _apply_cgroup_usage(results[index], first_read[summary["Id"]], second_read.get(summary["Id"]))
+        for index, summary in enumerate(container_summaries):
+            if index in results:
+                docker_info["containers"].append(results[index])
+            else:
+                docker_info["containers"].append(_container_error(summary, image_tags, errors[index]))
 
         # Collect networks with detailed info
-        networks = client.networks.list()
+        with step(instrumentation, "docker.networks") as record:
+            networks = cached(cache, "docker.networks", lambda: _api_call(record, api.networks))
+            record.items = len(networks)
         for network in networks:
-            docker_info["networks"].append({
-                "name": network.name,
-                "id": network.id,
-                "driver": network.attrs["Driver"],
-                "subnet": network.attrs["IPAM"]["Config"][0].get("Subnet"),
-                "gateway": network.attrs["IPAM"]["Config"][0].get("Gateway"),
-                "containers": list(network.containers)
-            })
+            docker_info["networks"].append(_network_info(network, network_members))
 
         # Collect volumes with detailed info
-        volumes = client.volumes.list()
+        with step(instrumentation, "docker.volumes") as record:
+            volumes = cached(cache, "docker.volumes", lambda: _api_call(record, api.volumes).get("Volumes") or [])
+            record.items = len(volumes)
         for volume in volumes:
-            docker_info["volumes"].append({
-                "name": volume.name,
-                "mountpoint": volume.attrs['Mountpoint'],
-                "driver": volume.attrs["Driver"],
-                "labels": volume.attrs.get("Labels", {}),
-                # Docker API does not provide direct usage statistics for volumes,
-                # so usage statistics are not included here.
-            })
+            docker_info["volumes"].append(_volume_info(volume))
 
     except docker.errors.APIError as e:
         docker_info["error"] = f"Error collecting Docker information: {str(e)}"
     except Exception as e:
         docker_info["error"] = f"Unexpected error: {str(e)}"
 
-    return docker_info
\ No newline at end of file
+    return docker_info
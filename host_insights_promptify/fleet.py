@@ -0,0 +1,215 @@
+import json
+import subprocess
+import sys
+from .concurrency import run_concurrently
+from .daemon import query_daemon
+from .promptify import format_fleet_prompt
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_HOST_TIMEOUT = 60
+DEFAULT_REMOTE_COMMAND = "host-insights-promptify --all --format json"
+
+# System fields compared across hosts; identical values are reported once for the fleet
+SHARED_SYSTEM_FIELDS = ("OS", "OS Version", "Architecture", "CPU", "Physical Cores", "Logical Cores", "Total Memory")
+
+def _parse_document(output, host):
+    """
+    Parses a JSON document produced by "--format json" into collector results.
+    """
+    try:
+        document = json.loads(output)
+    except ValueError:
+        raise RuntimeError(f"{host} returned invalid JSON: {output[:200]!r}")
+    if not isinstance(document, dict) or "schema" not in document:
+        raise RuntimeError(f"{host} did not return an insights document")
+    return document
+
+def _run_collection(args, host, timeout):
+    """
+    Runs a collection command with a hard timeout and parses its JSON output.
+    """
+    try:
+        result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"timed out after {timeout}s")
+    if result.returncode != 0:
+        raise RuntimeError(f"exit status {result.returncode}: {result.stderr.strip()[:200]}")
+    return _parse_document(result.stdout, host)
+
+def local_fetcher(name="localhost", extra_args=()):
+    """
+    Returns a fetcher that collects insights on this machine in a separate process. Several
+    local fetchers stand in for a fleet in tests and demos.
+
+    Args:
+        name (str): The host name used in reports.
+        extra_args (tuple): Additional CLI arguments, e.g. ("--cpu-interval", "0").
+    """
+    args = [sys.executable, "-m", "host_insights_promptify.cli", "--all", "--format", "json", *extra_args]
+    return lambda timeout: _run_collection(args, name, timeout)
+
+def ssh_fetcher(destination, remote_command=DEFAULT_REMOTE_COMMAND):
+    """
+    Returns a fetcher that runs the collector on a remote host over SSH. Authentication must
+    not be interactive (keys or an agent); host key prompts fail instead of blocking.
+
+    Args:
+        destination (str): The SSH destination, e.g. "user@web-01".
+        remote_command (str): The command run on the remote host; it must print a JSON report.
+    """
+    def fetch(timeout):
+        args = ["ssh", "-o", "BatchMode=yes", "-o", f"ConnectTimeout={max(int(timeout), 1)}",
+                destination, remote_command]
+        return _run_collection(args, destination, timeout)
+    return fetch
+
+def daemon_fetcher(socket_path):
+    """
+    Returns a fetcher that reads the latest report from a running daemon (see daemon.py),
+    for example through a Unix socket forwarded from the remote host.
+    """
+    def fetch(timeout):
+        return _parse_document(query_daemon(socket_path, "JSON", timeout=timeout), socket_path)
+    return fetch
+
+def parse_target(spec):
+    """
+    Turns a host specification into a (name, fetcher) pair.
+
+    Specifications are "local" or "local:NAME" (a local process), "unix:PATH" (a daemon
+    socket), and "ssh://DESTINATION" or a bare "user@host" / "host" (SSH).
+
+    Returns:
+        tuple: (name, fetcher), where fetcher takes a timeout in seconds and returns collector results.
+    """
+    if spec == "local" or spec.startswith("local:"):
+        name = spec.partition(":")[2] or "localhost"
+        return name, local_fetcher(name)
+    if spec.startswith("unix:"):
+        path = spec[len("unix:"):]
+        return path, daemon_fetcher(path)
+    destination = spec[len("ssh://"):] if spec.startswith("ssh://") else spec
+    return destination, ssh_fetcher(destination)
+
+def collect_fleet(targets, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_HOST_TIMEOUT):
+    """
+    Collects insights from many hosts in parallel.
+
+    Args:
+        targets: Host specifications (see parse_target), or a dict of host name to fetcher.
+        max_workers (int): Maximum number of hosts collected at once.
+        timeout (float): Per-host timeout in seconds. A host that exceeds it is reported as failed.
+
+    Returns:
+        tuple: A (results, errors) pair of dictionaries keyed by host name.
+    """
+    if not isinstance(targets, dict):
+        targets = dict(parse_target(spec) for spec in targets)
+    tasks = {name: (lambda fetch=fetch: fetch(timeout)) for name, fetch in targets.items()}
+    # Fetchers enforce the timeout themselves; the task timeout is only a backstop
+    return run_concurrently(tasks, timeout=timeout + 5, max_workers=max_workers)
+
+def _group(values):
+    """
+    Groups hosts by value.
+
+    Args:
+        values (dict): A mapping of host name to a JSON-serializable value.
+
+    Returns:
+        list: {"value", "hosts"} groups, the most common value first.
+    """
+    groups = {}
+    for host, value in values.items():
+        key = json.dumps(value, sort_keys=True, default=str)
+        groups.setdefault(key, {"value": value, "hosts": []})["hosts"].append(host)
+    return sorted(groups.values(), key=lambda group: -len(group["hosts"]))
+
+def _default_gateway(network_info):
+    for route in network_info.get("routing_table") or []:
+        if isinstance(route, dict) and route.get("destination") == "default":
+            return route.get("gateway")
+    return None
+
+def merge_fleet(results, errors=None):
+    """
+    Merges per-host collector results into a cluster-level view.
+
+    Facts that are identical on several hosts (OS, CPU model, DNS servers, default gateway,
+    firewall rules) are grouped instead of repeated per host; container images and services
+    are counted across the fleet; per-host metrics are kept in a short summary per host.
+
+    Args:
+        results (dict): Collector results keyed by host name.
+        errors (dict): Error messages of hosts that could not be collected.
+
+    Returns:
+        dict: "hosts", "failed", "facts" (name to value groups), "images", "services" and
+        "host_summaries".
+    """
+    hosts = sorted(results)
+    facts = {}
+    for field in SHARED_SYSTEM_FIELDS:
+        facts[field] = _group({host: results[host].get("system", {}).get(field) for host in hosts})
+    facts["DNS"] = _group({host: results[host].get("network", {}).get("dns") for host in hosts})
+    facts["Default Gateway"] = _group({host: _default_gateway(results[host].get("network", {})) for host in hosts})
+    facts["Firewall Rules"] = _group({host: results[host].get("network", {}).get("firewall_rules") for host in hosts})
+
+    images, services, summaries = {}, {}, []
+    for host in hosts:
+        insights = results[host]
+        containers = insights.get("docker", {}).get("containers", [])
+        for container in containers:
+            for tag in container.get("image") or ["<untagged>"]:
+                entry = images.setdefault(tag, {"image": tag, "containers": 0, "hosts": set()})
+                entry["containers"] += 1
+                entry["hosts"].add(host)
+        # A failed services collector leaves an error marker instead of services
+        host_services = [service for service in insights.get("services", []) if "error" not in service]
+        service_errors = [service["error"] for service in insights.get("services", []) if "error" in service]
+        for service in host_services:
+            entry = services.setdefault(service.get("name"), {"name": service.get("name"), "instances": 0, "hosts": set()})
+            entry["instances"] += 1
+            entry["hosts"].add(host)
+
+        system_info = insights.get("system", {})
+        sections = (system_info, insights.get("network", {}), insights.get("docker", {}), insights.get("units", {}))
+        summaries.append({
+            "host": host,
+            "hostname": system_info.get("Hostname"),
+            "available_memory": system_info.get("Available Memory"),
+            "disk_usage": system_info.get("Disk Usage"),
+            "containers": len(containers),
+            "connections": len(insights.get("network", {}).get("active_connections", [])),
+            "services": len(host_services),
+            "errors": [section["error"] for section in sections if isinstance(section, dict) and section.get("error")]
+                      + service_errors,
+        })
+
+    def ranked(entries, count_field):
+        ordered = sorted(entries.values(), key=lambda entry: (-len(entry["hosts"]), -entry[count_field]))
+        return [dict(entry, hosts=sorted(entry["hosts"])) for entry in ordered]
+
+    return {
+        "hosts": hosts,
+        "failed": dict(errors or {}),
+        "facts": facts,
+        "images": ranked(images, "containers"),
+        "services": ranked(services, "instances"),
+        "host_summaries": summaries,
+    }
+
+def gather_fleet_insights(targets, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_HOST_TIMEOUT):
+    """
+    Collects insights from many hosts and formats them into one cluster-level prompt.
+
+    Args:
+        targets: Host specifications (see parse_target), or a dict of host name to fetcher.
+        max_workers (int): Maximum number of hosts collected at once.
+        timeout (float): Per-host timeout in seconds.
+
+    Returns:
+        str: The cluster-level prompt.
+    """
+    results, errors = collect_fleet(targets, max_workers=max_workers, timeout=timeout)
+    return format_fleet_prompt(merge_fleet(results, errors))
@@ -0,0 +1,126 @@
+import contextlib
+import threading
+import time
+
+class Step:
+    """
+    The measurements of one collection step: wall time, CPU time of the thread that ran it,
+    the number of items it produced, and counters such as subprocesses or API calls.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.items = None
+        self.counts = {}
+
+    def count(self, kind, amount=1):
+        """
+        Adds to one of the step's counters, e.g. count("subprocesses").
+        """
+        self.counts[kind] = self.counts.get(kind, 0) + amount
+
+    def as_dict(self):
+        return {
+            "wall_s": round(self.wall_s, 6),
+            "cpu_s": round(self.cpu_s, 6),
+            "items": self.items,
+            "counts": dict(self.counts),
+        }
+
+class _NullStep:
+    """
+    Accepts the same updates as Step and discards them, for uninstrumented runs.
+    """
+    items = None
+
+    def count(self, kind, amount=1):
+        pass
+
+class Instrumentation:
+    """
+    Records how long each collector and sub-step took and how much work it did.
+
+    Steps are named with dotted paths such as "network" and "network.firewall_rules". A step
+    measured more than once accumulates its times and counters. CPU time is the thread CPU
+    time of the thread running the step, so concurrently running collectors are measured
+    independently.
+    """
+
+    def __init__(self):
+        self._steps = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def step(self, name):
+        """
+        Measures the enclosed block as the named step.
+
+        Yields:
+            Step: The step's record, for setting items and counters.
+        """
+        with self._lock:
+            record = self._steps.setdefault(name, Step(name))
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        try:
+            yield record
+        finally:
+            wall, cpu = time.perf_counter() - started, time.thread_time() - cpu_started
+            with self._lock:
+                record.wall_s += wall
+                record.cpu_s += cpu
+
+    def timings(self):
+        """
+        Returns the measurements of every step.
+
+        Returns:
+            dict: A mapping of step name to its "wall_s", "cpu_s", "items" and "counts".
+        """
+        with self._lock:
+            return {name: record.as_dict() for name, record in sorted(self._steps.items())}
+
+def step(instrumentation, name):
+    """
+    Returns instrumentation.step(name), or a context that measures nothing when no
+    instrumentation is in use.
+    """
+    if instrumentation is None:
+        return contextlib.nullcontext(_NullStep())
+    return instrumentation.step(name)
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def format_prometheus(timings, prefix="host_insights"):
+    """
+    Renders step timings in the Prometheus text exposition format, for example for the
+    node_exporter textfile collector.
+
+    Args:
+        timings (dict): Step timings, as returned by Instrumentation.timings().
+        prefix (str): Prefix of the metric names.
+
+    Returns:
+        str: The metrics, one family per measurement.
+    """
+    families = [
+        ("step_wall_seconds", "Wall-clock time spent in a collection step.", "wall_s"),
+        ("step_cpu_seconds", "CPU time spent in a collection step.", "cpu_s"),
+        ("step_items", "Number of items produced by a collection step.", "items"),
+    ]
+    lines = []
+    for suffix, description, field in families:
+        lines.append(f"# HELP {prefix}_{suffix} {description}")
+        lines.append(f"# TYPE {prefix}_{suffix} gauge")
+        for name, measurement in timings.items():
+            if measurement.get(field) is not None:
+                lines.append(f"{prefix}_{suffix}{{step=\"{_escape_label(name)}\"}} {measurement[field]}")
+
+    lines.append(f"# HELP {prefix}_step_operations Operations performed by a collection step, by kind.")
+    lines.append(f"# TYPE {prefix}_step_operations gauge")
+    for name, measurement in timings.items():
+        for kind, value in sorted(measurement.get("counts", {}).items()):
+            lines.append(f"{prefix}_step_operations{{step=\"{_escape_label(name)}\",kind=\"{_escape_label(kind)}\"}} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,311 @@
+import threading
+import time
+import docker
+from .cgroups import CGROUP_ROOT, CgroupReader
+from .concurrency import run_concurrently
+from .docker import (DEFAULT_MAX_WORKERS, _api_call, _apply_cgroup_usage, _collect_container, _container_error,
+                     _network_info, _network_members, _volume_info)
+from .instrumentation import step
+from .processes import DEFAULT_CPU_INTERVAL
+
+DEFAULT_RETRY_INTERVAL = 5.0  # Seconds before resubscribing after the event stream broke
+
+# Container events after which the container is listed and inspected again. Other events
+# (exec, attach, top, ...) do not change what is reported.
+CONTAINER_REFRESH_ACTIONS = frozenset({"create", "start", "restart", "pause", "unpause", "rename", "update",
+                                       "health_status"})
+# Container events after which the container is no longer running, so it leaves the report
+CONTAINER_REMOVE_ACTIONS = frozenset({"die", "destroy"})
+IMAGE_ACTIONS = frozenset({"pull", "tag", "untag", "delete", "import", "load"})
+
+class DockerInventory:
+    """
+    An in-memory model of the running containers, networks and volumes of a Docker host,
+    kept current by the daemon's event stream.
+
+    The inventory is fully synchronized once (on the first report, or after the event stream
+    broke), exactly like collect_docker_info. After that, a background thread applies events
+    as they arrive, marking the affected objects as changed, and each report only lists and
+    inspects those objects. A report on a quiet host therefore costs no Docker API calls at
+    all, and a busy one costs API calls in proportion to the number of changes rather than the
+    number of objects.
+
+    Without start(), no events are received and every report synchronizes fully.
+
+    When cgroupfs is readable, container CPU, memory and block I/O usage is re-read on every
+    report. CPU percentages cover the time since the sample they were last computed from,
+    which must be at least cpu_interval old, so a freshly inspected container has none until
+    a later report. Otherwise usage is as of the container's last inspection.
+    """
+
+    def __init__(self, client=None, max_workers=DEFAULT_MAX_WORKERS, fast_stats=False, timeout=None,
+                 cgroup_root=CGROUP_ROOT, retry_interval=DEFAULT_RETRY_INTERVAL, cpu_interval=DEFAULT_CPU_INTERVAL):
+        """
+        Args:
+            client (docker.DockerClient): An existing client to reuse. If None, one is created from the environment.
+            max_workers (int): Number of containers inspected concurrently.
+            fast_stats (bool): Use one-shot stats sampling for containers not covered by cgroupfs.
+            timeout (float): Per-container timeout in seconds. None waits indefinitely.
+            cgroup_root (str): Mountpoint of cgroupfs. None always uses the stats API.
+            retry_interval (float): Seconds to wait before resubscribing to a broken event stream.
+            cpu_interval (float): Shortest window in seconds a CPU percentage is computed over.
+                None or 0 leaves CPU percentages unavailable.
+        """
+        if client is None:
+            client = docker.from_env(max_pool_size=max(max_workers, 1))
+        self.client = client
+        self.max_workers = max_workers
+        self.fast_stats = fast_stats
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.cpu_interval = cpu_interval
+        reader = CgroupReader(cgroup_root) if cgroup_root else None
+        self._reader = reader if reader is not None and reader.available() else None
+        self.events_applied = 0
+        self._events_since_report = 0
+        self._stale = True
+        self._summaries = {}
+        self._containers = {}
+        self._errors = {}
+        self._usage = {}
+        self._image_tags = {}
+        self._networks = {}
+        self._volumes = {}
+        self._dirty_containers = set()
+        self._dirty_networks = set()
+        self._dirty_volumes = set()
+        self._images_dirty = False
+        self._since = None
+        self._stream = None
+        self._thread = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+
+    def start(self):
+        """
+        Subscribes to the event stream on a background thread. The full synchronization
+        happens on the first report, and events from this moment on are replayed, so no
+        change made in between is missed.
+        """
+        self._since = int(time.time())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="docker-inventory", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops watching events. The inventory can still report, but only by synchronizing fully.
+        """
+        self._stop.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            self._stale = True
+
+    def _watch(self):
+        while not self._stop.is_set():
+            since = self._since
+            try:
+                self._stream = self.client.api.events(since=since, decode=True)
+                for event in self._stream:
+                    self.apply_event(event)
+                    if self._stop.is_set():
+                        break
+            except Exception:
+                pass
+            finally:
+                self._stream = None
+            if self._stop.is_set():
+                break
+            # Events may have been lost: resynchronize on the next report, and replay from here
+            self._since = int(time.time())
+            with self._lock:
+                self._stale = True
+            self._stop.wait(self.retry_interval)
+
+    def apply_event(self, event):
+        """
+        Applies one event from the Docker event stream to the model.
+
+        Args:
+            event (dict): A decoded event, with "Type", "Action" and "Actor" ({"ID", "Attributes"}).
+        """
+        kind = event.get("Type")
+        action = (event.get("Action") or "").split(":")[0]
+        actor = event.get("Actor") or {}
+        actor_id = actor.get("ID")
+        with self._lock:
+            self.events_applied += 1
+            self._events_since_report += 1
+            if kind == "container":
+                if action in CONTAINER_REMOVE_ACTIONS:
+                    self._forget_container(actor_id)
+                elif action in CONTAINER_REFRESH_ACTIONS:
+                    self._dirty_containers.add(actor_id)
+            elif kind == "network":
+                if action == "destroy":
+                    self._networks.pop(actor_id, None)
+                    self._dirty_networks.discard(actor_id)
+                elif action == "create":
+                    self._dirty_networks.add(actor_id)
+                elif action in ("connect", "disconnect"):
+                    # Membership is derived from the container list entry, so refresh the container
+                    container_id = (actor.get("Attributes") or {}).get("container")
+                    if container_id in self._summaries:
+                        self._dirty_containers.add(container_id)
+            elif kind == "volume":
+                if action == "destroy":
+                    self._volumes.pop(actor_id, None)
+                    self._dirty_volumes.discard(actor_id)
+                elif action == "create":
+                    self._dirty_volumes.add(actor_id)
+            elif kind == "image" and action in IMAGE_ACTIONS:
+                self._images_dirty = True
+
+    def _forget_container(self, container_id):
+        self._summaries.pop(container_id, None)
+        self._containers.pop(container_id, None)
+        self._errors.pop(container_id, None)
+        self._usage.pop(container_id, None)
+        self._dirty_containers.discard(container_id)
+
+    def _inspect(self, record, summaries):
+        """
+        Inspects containers concurrently and stores their records.
+        """
+        api = self.client.api
+        usage = self._reader.read(summary["Id"] for summary in summaries) if self._reader else {}
+        self._usage.update(usage)
+        tasks = {
+            summary["Id"]: (lambda summary=summary: _collect_container(api, summary, self._image_tags, self.fast_stats,
+                                                                       api_stats=summary["Id"] not in usage))
+            for summary in summaries
+        }
+        results, errors = run_concurrently(tasks, timeout=self.timeout, max_workers=self.max_workers)
+        record.count("api_calls", len(tasks) + sum(1 for container_id in tasks if container_id not in usage))
+        for container_id, container in results.items():
+            self._containers[container_id] = container
+            self._errors.pop(container_id, None)
+        for container_id, error in errors.items():
+            self._containers.pop(container_id, None)
+            self._errors[container_id] = error
+            # Retried on the next report
+            self._dirty_containers.add(container_id)
+
+    def _sync(self, record):
+        api = self.client.api
+        self._dirty_containers.clear()
+        self._dirty_networks.clear()
+        self._dirty_volumes.clear()
+        self._images_dirty = False
+        summaries = _api_call(record, api.containers)
+        self._image_tags = {image["Id"]: image.get("RepoTags") or [] for image in _api_call(record, api.images)}
+        self._networks = {network["Id"]: network for network in _api_call(record, api.networks)}
+        self._volumes = {volume["Name"]: volume for volume in _api_call(record, api.volumes).get("Volumes") or []}
+        self._summaries = {summary["Id"]: summary for summary in summaries}
+        self._containers, self._errors, self._usage = {}, {}, {}
+        self._inspect(record, summaries)
+        self._stale = False
+
+    def _update(self, record):
+        api = self.client.api
+        if self._images_dirty:
+            self._images_dirty = False
+            self._image_tags = {image["Id"]: image.get("RepoTags") or [] for image in _api_call(record, api.images)}
+            for container_id, container in self._containers.items():
+                container.image = self._image_tags.get(self._summaries[container_id].get("ImageID"), [])
+
+        for network_id in list(self._dirty_networks):
+            self._dirty_networks.discard(network_id)
+            try:
+                self._networks[network_id] = _api_call(record, lambda: api.inspect_network(network_id))
+            except docker.errors.NotFound:
+                self._networks.pop(network_id, None)
+
+        for name in list(self._dirty_volumes):
+            self._dirty_volumes.discard(name)
+            try:
+                self._volumes[name] = _api_call(record, lambda: api.inspect_volume(name))
+            except docker.errors.NotFound:
+                self._volumes.pop(name, None)
+
+        if self._dirty_containers:
+            container_ids = sorted(self._dirty_containers)
+            self._dirty_containers.clear()
+            # One filtered list call for all changed containers; those missing are no longer running
+            summaries = {summary["Id"]: summary
+                         for summary in _api_call(record, lambda: api.containers(filters={"id": container_ids}))}
+            for container_id in container_ids:
+                if container_id not in summaries:
+                    self._forget_container(container_id)
+            self._summaries.update(summaries)
+            self._inspect(record, list(summaries.values()))
+
+    def _refresh_usage(self, record):
+        current = self._reader.read(container_id for container_id in self._containers if container_id in self._usage)
+        record.count("cgroup_reads", len(current))
+        for container_id, after in current.items():
+            container, before = self._containers[container_id], self._usage[container_id]
+            if self.cpu_interval and after["time"] - before["time"] >= self.cpu_interval:
+                _apply_cgroup_usage(container, before, after)
+                self._usage[container_id] = after
+            else:
+                # Too short a window for a CPU percentage: keep the sample it will be computed
+                # from, and the previous percentage, if any
+                cpu_percent = container.cpu_percent
+                _apply_cgroup_usage(container, after, None)
+                container.cpu_percent = cpu_percent
+
+    def report(self, instrumentation=None):
+        """
+        Brings the model up to date and returns it in the shape of collect_docker_info.
+
+        Args:
+            instrumentation (Instrumentation): Optional recorder for the time, API calls and
+                events of the update.
+
+        Returns:
+            dict: A dictionary containing Docker information such as running containers, networks, and volumes.
+        """
+        with self._lock:
+            try:
+                if self._stale or self._thread is None:
+                    with step(instrumentation, "docker.inventory.sync") as record:
+                        self._sync(record)
+                else:
+                    with step(instrumentation, "docker.inventory.update") as record:
+                        record.count("events", self._events_since_report)
+                        self._update(record)
+                self._events_since_report = 0
+                if self._reader is not None:
+                    with step(instrumentation, "docker.cgroups") as record:
+                        self._refresh_usage(record)
+                return self._render()
+            except docker.errors.APIError as e:
+                self._stale = True
+                return {"containers": [], "networks": [], "volumes": [],
+                        "error": f"Error collecting Docker information: {str(e)}"}
+            except Exception as e:
+                self._stale = True
+                return {"containers": [], "networks": [], "volumes": [], "error": f"Unexpected error: {str(e)}"}
+
+    def _render(self):
+        containers = []
+        for container_id, summary in self._summaries.items():
+            if container_id in self._containers:
+                containers.append(self._containers[container_id])
+            else:
+                containers.append(_container_error(summary, self._image_tags, self._errors.get(container_id, "Not inspected")))
+        network_members = _network_members(self._summaries.values())
+        return {
+            "containers": containers,
+            "networks": [_network_info(network, network_members) for network in self._networks.values()],
+            "volumes": [_volume_info(volume) for volume in self._volumes.values()],
+        }
@@ -1,13 +1,226 @@
+import fnmatch
 import psutil
 import socket
 import subprocess
 import platform
+from .cache import cached
+from .concurrency import run_concurrently
+from .instrumentation import step
+from .processes import take_process_snapshot
+from .procnet import iter_proc_connections, procfs_available, read_routing_table, routes_available
+from .records import ConnectionRecord, InterfaceRecord
 
-def collect_network_info():
+CONNECTION_MODES = ("auto", "psutil", "procfs", "unattributed")
+COMMAND_TIMEOUT = 5  # Seconds an external tool may run before it is killed
+
+def _iter_connections(connections, snapshot):
+    """
+    Lazily converts psutil connection tuples into connection records.
+    """
+    for conn in connections:
+        protocol = "TCP" if conn.type == socket.SOCK_STREAM else "UDP"
+        yield ConnectionRecord(protocol, conn.laddr, conn.raddr or None, conn.status, conn.pid, snapshot)
+
+def _run_command(args, timeout=COMMAND_TIMEOUT, record=None):
+    """
+    Runs an external command with a hard timeout and returns its standard output.
+    The run is counted on the instrumentation record, if one is given.
+
+    Raises:
+        FileNotFoundError: If the command is not installed.
+        subprocess.TimeoutExpired: If the command did not finish in time; it is killed.
+    """
+    if record is not None:
+        record.count("subprocesses")
+    return subprocess.run(args, capture_output=True, text=True, timeout=timeout).stdout
+
+def _collect_routing_table(record=None):
+    """
+    Collects the routing table. On Linux, /proc/net/route and /proc/net/ipv6_route are parsed
+    into route dictionaries; elsewhere, the platform's routing tool output is returned line by line.
+    """
+    routing_table = []
+    if platform.system() == "Linux" and routes_available():
+        routing_table = read_routing_table()
+    elif platform.system() == "Linux":
+        routing_table = _run_command(['ip', 'route'], record=record).splitlines()
+    elif platform.system() == "Darwin":  # macOS
+        routing_table = _run_command(['netstat', '-rn'], record=record).splitlines()
+    elif platform.system() == "Windows":
+        routing_table = _run_command(['route', 'print'], record=record).splitlines()
+    return routing_table
+
+def _collect_dns(record=None):
+    """
+    Collects the DNS servers and search domains.
+    """
+    dns = {}
+    if platform.system() == "Linux":
+        with open('/etc/resolv.conf', 'r') as f:
+            lines = f.readlines()
+            for line in lines:
+                if line.startswith('nameserver'):
+                    dns_server = line.split()[1]
+                    if "primary" not in dns:
+                        dns["primary"] = dns_server
+                    else:
+                        dns["secondary"] = dns_server
+                elif line.startswith('search'):
+                    dns["search_domains"] = line.split()[1:]
+
+    elif platform.system() == "Darwin":  # macOS
+        dns_output = _run_command(['scutil', '--dns'], record=record).splitlines()
+        for line in dns_output:
+            if 'nameserver' in line:
+                dns_server = line.split()[-1]
+                if "primary" not in dns:
+                    dns["primary"] = dns_server
+                else:
+                    dns["secondary"] = dns_server
+            elif 'search domain' in line:
+                if "search_domains" not in dns:
+                    dns["search_domains"] = []
+                dns["search_domains"].append(line.split()[-1])
+
+    elif platform.system() == "Windows":
+        dns_output = _run_command(['ipconfig', '/all'], record=record).splitlines()
+        dns["primary"] = None
+        dns["secondary"] = None
+        for line in dns_output:
+            if "DNS Servers" in line:
+                dns_servers = line.split(":")[1].strip().split()
+                if dns_servers:
+                    dns["primary"] = dns_servers[0]
+                    if len(dns_servers) > 1:
+                        dns["secondary"] = dns_servers[1]
+    return dns
+
+def _collect_firewall_rules(record=None):
+    """
+    Collects the firewall rules using the first available firewall tool.
+
+    On Linux, UFW, iptables and nftables are queried concurrently, each with a hard timeout,
+    and the first in that order with rules wins (UFW only if it is active).
+    """
+    firewall_rules = None
+    if platform.system() == "Linux":
+        # "ufw status numbered" also reports the status, so one call is enough; "-n" keeps
+        # iptables from resolving every address in the rules through DNS
+        commands = {
+            "ufw": ['ufw', 'status', 'numbered'],
+            "iptables": ['iptables', '-L', '-n'],
+            "nft": ['nft', 'list', 'ruleset'],
+        }
+        tasks = {name: (lambda args=args: _run_command(args, record=record)) for name, args in commands.items()}
+        # The subprocess timeout kills the child; the task timeout is only a backstop
+        outputs, errors = run_concurrently(tasks, timeout=COMMAND_TIMEOUT + 1)
+
+        if "Status: active" in outputs.get("ufw", ""):
+            firewall_rules = outputs["ufw"]
+        elif "iptables" in outputs or "nft" in outputs:
+            # Prefer whichever tool actually listed rules
+            firewall_rules = outputs.get("iptables") or outputs.get("nft") or ""
+        elif any("timed out" in error for error in errors.values()):
+            firewall_rules = f"Firewall tools did not respond within {COMMAND_TIMEOUT}s"
+        else:
+            firewall_rules = "Neither UFW, iptables, nor nftables found"
+
+    elif platform.system() == "Darwin":  # macOS
+        try:
+            firewall_rules = _run_command(['pfctl', '-sr'], record=record)
+        except subprocess.TimeoutExpired:
+            firewall_rules = f"pfctl did not respond within {COMMAND_TIMEOUT}s"
+    return firewall_rules
+
+def _collect_connections(mode, snapshot):
+    """
+    Collects active connections using the requested mode (see collect_network_info).
+
+    Returns:
+        iterable: A generator of ConnectionRecord mappings.
+    """
+    if mode not in CONNECTION_MODES:
+        raise ValueError(f"Unknown connection mode '{mode}', expected one of {', '.join(CONNECTION_MODES)}")
+    if mode == "auto":
+        mode = "procfs" if platform.system() == "Linux" and procfs_available() else "psutil"
+
+    if mode == "unattributed":
+        return iter_proc_connections(attribute=False)
+    if snapshot is None:
+        snapshot = take_process_snapshot()
+    if mode == "procfs":
+        return iter_proc_connections(attribute=True, snapshot=snapshot)
+    return _iter_connections(psutil.net_connections(), snapshot)
+
+def _interface_selected(name, include, exclude):
+    """
+    Applies the include and exclude glob patterns to an interface name.
+    """
+    if include and not any(fnmatch.fnmatchcase(name, pattern) for pattern in include):
+        return False
+    return not (exclude and any(fnmatch.fnmatchcase(name, pattern) for pattern in exclude))
+
+def _collect_interfaces(include=None, exclude=None, up_only=False):
+    """
+    Collects interface details from one snapshot each of addresses, link stats and I/O counters,
+    so the cost stays linear in the number of interfaces.
+
+    Returns:
+        list: InterfaceRecord mappings for the selected interfaces.
+    """
+    addresses = psutil.net_if_addrs()
+    stats = psutil.net_if_stats()
+    names = [name for name in addresses if _interface_selected(name, include, exclude)]
+    if up_only:
+        names = [name for name in names if name in stats and stats[name].isup]
+    if not names:
+        return []
+    io_counters = psutil.net_io_counters(pernic=True) or {}
+
+    interfaces = []
+    for interface_name in names:
+        link = stats.get(interface_name)
+        interface_info = InterfaceRecord(
+            interface_name,
+            mtu=link.mtu if link else None,
+            status="up" if link and link.isup else "down",
+            speed=link.speed if link else None,
+            io=io_counters.get(interface_name)
+        )
+        for addr in addresses[interface_name]:
+            if addr.family == socket.AF_INET:
+                interface_info.ipv4 = addr.address
+                interface_info.netmask = addr.netmask
+                interface_info.broadcast = addr.broadcast
+            elif addr.family == socket.AF_INET6:
+                interface_info.ipv6 = addr.address
+            elif addr.family == psutil.AF_LINK:
+                interface_info.mac = addr.address
+        interfaces.append(interface_info)
+    return interfaces
+
+def collect_network_info(snapshot=None, lazy_connections=False, cache=None, connection_mode="auto",
+                         include_interfaces=None, exclude_interfaces=None, up_only=False, instrumentation=None):
     """
     Collects detailed information about network interfaces, routing tables, active connections, 
     DNS configuration, and firewall rules.
 
+    Args:
+        snapshot (ProcessSnapshot): A process table snapshot used to resolve connection owners.
+            If None, a new snapshot is taken when any connection has an owning PID.
+        lazy_connections (bool): Return active connections as a generator that builds each entry
+            on demand, for streaming renderers, instead of a list.
+        cache (TTLCache): Optional cache for the routing table, DNS configuration, and firewall rules.
+        connection_mode (str): How active connections are collected. "procfs" parses the
+            /proc/net socket tables directly (Linux) and attributes sockets to processes with a
+            single inode-to-PID map; "unattributed" does the same but skips attribution
+            entirely, which is the fastest option on hosts with very many sockets; "psutil"
+            uses psutil.net_connections(). "auto" (the default) picks "procfs" where available.
+        include_interfaces (list): Glob patterns (e.g. "eth*"); only matching interfaces are reported.
+        exclude_interfaces (list): Glob patterns (e.g. "veth*", "cali*") of interfaces to leave out.
+        up_only (bool): Report only interfaces that are up.
+        instrumentation (Instrumentation): Optional recorder for the time and work of each sub-step.
+
     Returns:
         dict: A dictionary containing network-related information.
     """
@@ -20,120 +233,39 @@ def collect_network_info():
     }
 
     try:
-        # Collect network interfaces and their details
-        for interface_name, addrs in psutil.net_if_addrs().items():
-            interface_info = {
-                "name": interface_name,
-                "ipv4": None,
-                "ipv6": None,
-                "mac": None,
-                "netmask": None,
-                "broadcast": None,
-                "mtu": None,
-                "status": "up" if psutil.net_if_stats()[interface_name].isup else "down",
-                "speed": psutil.net_if_stats()[interface_name].speed
-            }
-            for addr in addrs:
-                if addr.family == socket.AF_INET:
-                    interface_info["ipv4"] = addr.address
-                    interface_info["netmask"] = addr.netmask
-                    interface_info["broadcast"] = addr.broadcast
-                elif addr.family == socket.AF_INET6:
-                    interface_info["ipv6"] = addr.address
-                elif addr.family == psutil.AF_LINK:
-                    interface_info["mac"] = addr.address
-            network_info["interfaces"].append(interface_info)
-
-        # Collect routing table
-        if platform.system() == "Linux":
-            result = subprocess.run(['ip', 'route'], capture_output=True, text=True)
-            network_info["routing_table"] = result.stdout.splitlines()
-        elif platform.system() == "Darwin":  # macOS
-            result = subprocess.run(['netstat', '-rn'], capture_output=True, text=True)
-            network_info["routing_table"] = result.stdout.splitlines()
-        elif platform.system() == "Windows":
-            result = subprocess.run(['route', 'print'], capture_output=True, text=True)
-            network_info["routing_table"] = result.stdout.splitlines()
+        with step(instrumentation, "network.interfaces") as record:
+            network_info["interfaces"] = _collect_interfaces(include_interfaces, exclude_interfaces, up_only)
+            record.items = len(network_info["interfaces"])
 
         # Collect active connections
-        connections = psutil.net_connections()
-        for conn in connections:
-            connection_info = {
-                "protocol": "TCP" if conn.type == socket.SOCK_STREAM else "UDP",
-                "local_address": f"{conn.laddr.ip}:{conn.laddr.port}",
-                "remote_address": f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else None,
-                "status": conn.status,
-                "pid": conn.pid,
-                "process": psutil.Process(conn.pid).name() if conn.pid else None
-            }
-            network_info["active_connections"].append(connection_info)
-
-        # Collect DNS configuration
-        if platform.system() == "Linux":
-            with open('/etc/resolv.conf', 'r') as f:
-                lines = f.readlines()
-                for line in lines:
-                    if line.startswith('nameserver'):
-                        dns_server = line.split()[1]
-                        if "primary" not in network_info["dns"]:
-                            network_info["dns"]["primary"] = dns_server
-                        else:
-                            network_info["dns"]["secondary"] = dns_server
-                    elif line.startswith('search'):
-                        network_info["dns"]["search_domains"] = line.split()[1:]
-
-        elif platform.system() == "Darwin":  # macOS
-            result = subprocess.run(['scutil', '--dns'], capture_output=True, text=True)
-            dns_output = result.stdout.splitlines()
-            for line in dns_output:
-                if 'nameserver' in line:
-                    dns_server = line.split()[-1]
-                    if "primary" not in network_info["dns"]:
-                        network_info["dns"]["primary"] = dns_server
-                    else:
-                        network_info["dns"]["secondary"] = dns_server
-                elif 'search domain' in line:
-                    if "search_domains" not in network_info["dns"]:
-                        network_info["dns"]["search_domains"] = []
-                    network_info["dns"]["search_domains"].append(line.split()[-1])
-
-        elif platform.system() == "Windows":
-            result = subprocess.run(['ipconfig', '/all'], capture_output=True, text=True)
-            dns_output = result.stdout.splitlines()
-            network_info["dns"]["primary"] = None
-            network_info["dns"]["secondary"] = None
-            for line in dns_output:
-                if "DNS Servers" in line:
-                    dns_servers = line.split(":")[1].strip().split()
-                    if dns_servers:
-                        network_info["dns"]["primary"] = dns_servers[0]
-                        if len(dns_servers) > 1:
-                            network_info["dns"]["secondary"] = dns_servers[1]
-
-        # Collect firewall rules
-        if platform.system() == "Linux":
-            try:
-                # Check if UFW is active and collect its rules
-                ufw_status = subprocess.run(['ufw', 'status'], capture_output=True, text=True)
-                if "Status: active" in ufw_status.stdout:
-                    network_info["firewall_rules"] = subprocess.run(['ufw', 'status', 'numbered'], capture_output=True, text=True).stdout
-                else:
-                    # Fallback to iptables or nftables if UFW is not active
-                    result = subprocess.run(['iptables', '-L'], capture_output=True, text=True)
-                    network_info["firewall_rules"] = result.stdout
-            except FileNotFoundError:
-                try:
-                    result = subprocess.run(['nft', 'list', 'ruleset'], capture_output=True, text=True)
-                    network_info["firewall_rules"] = result.stdout
-                except FileNotFoundError:
-                    network_info["firewall_rules"] = "Neither UFW, iptables, nor nftables found"
-
-        elif platform.system() == "Darwin":  # macOS
-            try:
-                result = subprocess.run(['pfctl', '-sr'], capture_output=True, text=True)
-                network_info["firewall_rules"] = result.stdout
-            except subprocess.CalledProcessError:
-                network_info["firewall_rules"] = "pfctl command requires elevated privileges"
+        with step(instrumentation, "network.connections") as record:
+            active_connections = _collect_connections(connection_mode, snapshot)
+            if not lazy_connections:
+                # Lazily collected connections are produced while rendering and are not measured here
+                active_connections = list(active_connections)
+                record.items = len(active_connections)
+            network_info["active_connections"] = active_connections
+
+        # Collect slow-changing data concurrently, from the cache when one is given
+        slow_fields = {
+            "routing_table": _collect_routing_table,
+            "dns": _collect_dns,
+            "firewall_rules": _collect_firewall_rules,
+        }
+        def collect_field(field, compute):
+            with step(instrumentation, f"network.{field}") as record:
+                value = cached(cache, f"network.{field}", lambda: compute(record))
+                if isinstance(value, list):
+                    record.items = len(value)
+                return value
+
+        tasks = {field: (lambda field=field, compute=compute: collect_field(field, compute))
+                 for field, compute in slow_fields.items()}
+        results, errors = run_concurrently(tasks, timeout=2 * COMMAND_TIMEOUT)
+        network_info.update(results)
+        if errors:
+            details = "; ".join(f"{field}: {error}" for field, error in errors.items())
+            network_info["error"] = f"Error collecting network information: {details}"
 
     except Exception as e:
         network_info["error"] = f"Error collecting network information: {str(e)}"
@@ -0,0 +1,124 @@
+import threading
+import psutil
+from .concurrency import run_concurrently
+
+DEFAULT_MOUNT_TIMEOUT = 2.0  # Seconds a single statvfs call may take
+DEFAULT_MAX_WORKERS = 8
+
+# Virtual, in-memory and image filesystems whose usage says nothing about storage capacity
+PSEUDO_FILESYSTEMS = frozenset({
+    "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs", "debugfs", "devpts",
+    "devtmpfs", "efivarfs", "fuse.gvfsd-fuse", "fuse.lxcfs", "fusectl", "hugetlbfs", "mqueue",
+    "nsfs", "overlay", "proc", "pstore", "ramfs", "rpc_pipefs", "securityfs", "selinuxfs",
+    "squashfs", "sysfs", "tmpfs", "tracefs",
+})
+
+# Mountpoints whose statvfs call has not returned yet, so a stale mount is probed by at most
+# one thread at a time across repeated scans (e.g. daemon refreshes)
+_outstanding = set()
+_outstanding_lock = threading.Lock()
+
+def select_partitions(partitions):
+    """
+    Drops pseudo filesystems and duplicate mounts before any partition is probed.
+
+    Pseudo filesystems (see PSEUDO_FILESYSTEMS) are skipped, except for the root mount, which
+    is an overlay inside containers. A device mounted more than once (bind mounts) is kept
+    only at its shortest mountpoint.
+
+    Args:
+        partitions (list): Entries from psutil.disk_partitions().
+
+    Returns:
+        list: The partitions worth probing, in their original order.
+    """
+    candidates = [p for p in partitions if p.mountpoint == "/" or p.fstype not in PSEUDO_FILESYSTEMS]
+    seen_devices = set()
+    kept = set()
+    for partition in sorted(candidates, key=lambda p: len(p.mountpoint)):
+        if partition.device not in seen_devices or partition.device in ("", "none"):
+            seen_devices.add(partition.device)
+            kept.add(partition.mountpoint)
+    return [p for p in candidates if p.mountpoint in kept]
+
+def _probe(mountpoint):
+    """
+    Runs statvfs on a mountpoint, tracking the call while it is outstanding.
+    """
+    try:
+        return psutil.disk_usage(mountpoint)
+    finally:
+        with _outstanding_lock:
+            _outstanding.discard(mountpoint)
+
+def _partition_info(partition, usage):
+    return {
+        "Device": partition.device,
+        "Mountpoint": partition.mountpoint,
+        "File System": partition.fstype,
+        "Total Size": f"{usage.total / (1024 ** 3):.2f} GB",
+        "Used": f"{usage.used / (1024 ** 3):.2f} GB",
+        "Free": f"{usage.free / (1024 ** 3):.2f} GB",
+        "Usage": f"{usage.percent}%",
+        "Status": "ok",
+    }
+
+def _unresponsive_info(partition):
+    return {
+        "Device": partition.device,
+        "Mountpoint": partition.mountpoint,
+        "File System": partition.fstype,
+        "Total Size": "N/A",
+        "Used": "N/A",
+        "Free": "N/A",
+        "Usage": "N/A",
+        "Status": "unresponsive",
+    }
+
+def scan_partitions(partitions=None, timeout=DEFAULT_MOUNT_TIMEOUT, max_workers=DEFAULT_MAX_WORKERS, record=None):
+    """
+    Collects the usage of every real partition without letting a stale mount hang the report.
+
+    statvfs calls run concurrently on a dedicated pool of daemon threads, each with its own
+    deadline. A mount that misses its deadline (typically a stale NFS or CIFS mount) is
+    reported with status "unresponsive" and its thread is abandoned. While that call is
+    still blocked, later scans report the mount as unresponsive without probing it again.
+
+    Args:
+        partitions (list): Entries from psutil.disk_partitions(). If None, they are read here.
+        timeout (float): Per-mount deadline in seconds.
+        max_workers (int): Maximum number of statvfs calls running at once.
+        record (Step): Optional instrumentation record; statvfs calls and timeouts are counted.
+
+    Returns:
+        list: Partition dictionaries in mount order, with "Status" "ok" or "unresponsive".
+        Partitions that cannot be read (e.g. permission denied) are left out.
+    """
+    if partitions is None:
+        partitions = psutil.disk_partitions()
+    selected = select_partitions(partitions)
+
+    tasks, blocked = {}, set()
+    with _outstanding_lock:
+        for partition in selected:
+            if partition.mountpoint in _outstanding:
+                blocked.add(partition.mountpoint)
+            else:
+                _outstanding.add(partition.mountpoint)
+                tasks[partition.mountpoint] = lambda mountpoint=partition.mountpoint: _probe(mountpoint)
+    if record is not None:
+        record.count("statvfs", len(tasks))
+
+    results, errors = run_concurrently(tasks, timeout=timeout, max_workers=max_workers)
+
+    partitions_info = []
+    for partition in selected:
+        mountpoint = partition.mountpoint
+        if mountpoint in results:
+            partitions_info.append(_partition_info(partition, results[mountpoint]))
+        elif mountpoint in blocked or "timed out" in errors.get(mountpoint, ""):
+            if record is not None:
+                record.count("unresponsive")
+            partitions_info.append(_unresponsive_info(partition))
+        # Other errors (permission denied, mount vanished) leave the partition out
+    return partitions_info
@@ -0,0 +1,209 @@
+import collections
+import os
+import time
+import psutil
+
+PROC_ROOT = "/proc"
+DEFAULT_CPU_INTERVAL = 0.5
+
+ProcessEntry = collections.namedtuple(
+    "ProcessEntry", ["pid", "name", "status", "create_time", "rss", "cpu_percent"]
+)
+
+class ProcessSnapshot:
+    """
+    A point-in-time, PID-indexed view of the process table.
+
+    The snapshot is read once per report and shared by every collector that needs process
+    details, so the process table is scanned a single time and all sections of the report
+    agree on which processes existed.
+    """
+
+    def __init__(self, entries, taken_at=None):
+        self._entries = entries
+        self.taken_at = taken_at if taken_at is not None else time.time()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    def __contains__(self, pid):
+        return pid in self._entries
+
+    def get(self, pid):
+        """
+        Returns the ProcessEntry for a PID, or None if the process was not in the snapshot.
+        """
+        return self._entries.get(pid)
+
+    def name(self, pid):
+        """
+        Returns the name of the process with the given PID, or None if it is unknown.
+        """
+        entry = self._entries.get(pid)
+        return entry.name if entry else None
+
+def _read_proc_cpu_times(proc_root=PROC_ROOT):
+    """
+    Reads the accumulated user and system CPU time of every process from /proc/<pid>/stat.
+
+    Returns:
+        dict: A mapping of PID to CPU time in clock ticks.
+    """
+    cpu_times = {}
+    for entry in os.listdir(proc_root):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(proc_root, entry, "stat"), "rb") as f:
+                stat = f.read()
+        except OSError:
+            # The process exited or is not readable
+            continue
+        # The command name may contain spaces and parentheses, so split after the last ')'
+        fields = stat[stat.rfind(b")") + 2:].split()
+        try:
+            cpu_times[int(entry)] = int(fields[11]) + int(fields[12])  # utime + stime
+        except (IndexError, ValueError):
+            continue
+    return cpu_times
+
+def read_cpu_times():
+    """
+    Reads the accumulated CPU time of every process in one pass over the process table.
+
+    On Linux, /proc/<pid>/stat is read directly; elsewhere psutil is used.
+
+    Returns:
+        tuple: A (cpu_times, ticks_per_second) pair, where cpu_times maps PID to accumulated
+        CPU time expressed in ticks of 1 / ticks_per_second seconds.
+    """
+    if os.path.isdir(PROC_ROOT) and psutil.LINUX:
+        return _read_proc_cpu_times(), os.sysconf("SC_CLK_TCK")
+
+    cpu_times = {}
+    for process in psutil.process_iter(['pid', 'cpu_times']):
+        times = process.info['cpu_times']
+        if times:
+            cpu_times[process.info['pid']] = times.user + times.system
+    return cpu_times, 1
+
+def _read_proc_usage(proc_root=PROC_ROOT):
+    """
+    Reads the name, accumulated CPU time and resident set size of every process from
+    /proc/<pid>/stat, one file per process.
+
+    Returns:
+        dict: A mapping of PID to a (name, cpu_ticks, rss_bytes) tuple.
+    """
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    usage = {}
+    for entry in os.listdir(proc_root):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(proc_root, entry, "stat"), "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        close = stat.rfind(b")")
+        name = stat[stat.find(b"(") + 1:close].decode("utf-8", "replace")
+        fields = stat[close + 2:].split()
+        try:
+            usage[int(entry)] = (name, int(fields[11]) + int(fields[12]), int(fields[21]) * page_size)
+        except (IndexError, ValueError):
+            continue
+    return usage
+
+def read_process_usage():
+    """
+    Reads the name, accumulated CPU time and resident set size of every process in one pass
+    over the process table, for repeated sampling.
+
+    On Linux, /proc/<pid>/stat is read directly (names are the kernel's command names, at
+    most 15 characters); elsewhere psutil is used.
+
+    Returns:
+        tuple: A (usage, ticks_per_second) pair, where usage maps PID to a
+        (name, cpu_ticks, rss_bytes) tuple.
+    """
+    if os.path.isdir(PROC_ROOT) and psutil.LINUX:
+        return _read_proc_usage(), os.sysconf("SC_CLK_TCK")
+
+    usage = {}
+    for process in psutil.process_iter(['pid', 'name', 'cpu_times', 'memory_info']):
+        info = process.info
+        if info['cpu_times'] and info['memory_info']:
+            usage[info['pid']] = (info['name'], info['cpu_times'].user + info['cpu_times'].system,
+                                  info['memory_info'].rss)
+    return usage, 1
+
+def cpu_percent_between(before, after, elapsed):
+    """
+    Computes per-process CPU usage percentages from two CPU time readings.
+
+    Args:
+        before (tuple): A (cpu_times, ticks_per_second) pair from read_cpu_times().
+        after (tuple): A later (cpu_times, ticks_per_second) pair from read_cpu_times().
+        elapsed (float): Wall-clock seconds between the two readings.
+
+    Returns:
+        dict: A mapping of PID to CPU usage percentage over the interval. Only processes present
+        in both readings are included. As with psutil, a multi-threaded process can exceed 100%.
+    """
+    start_times, ticks_per_second = before
+    end_times = after[0]
+    if elapsed <= 0:
+        return {}
+    scale = 100.0 / (elapsed * ticks_per_second)
+    return {
+        pid: round(max(end - start_times[pid], 0) * scale, 1)
+        for pid, end in end_times.items()
+        if pid in start_times
+    }
+
+def take_process_snapshot(cpu_interval=None):
+    """
+    Reads the process table once into a ProcessSnapshot.
+
+    Processes that exit during the scan are skipped, and attributes that cannot be read
+    (for example, due to permissions) are recorded as None.
+
+    When cpu_interval is given, CPU usage is sampled for all processes at once: CPU times are
+    read in bulk before and after a single fixed interval, so the sampling window does not grow
+    with the number of processes. The process table scan itself runs inside that window.
+
+    Args:
+        cpu_interval (float): Length of the CPU sampling window in seconds. If None or 0,
+            CPU percentages are not sampled and are recorded as None.
+
+    Returns:
+        ProcessSnapshot: The snapshot of all processes visible to the current user.
+    """
+    if cpu_interval:
+        cpu_before = read_cpu_times()
+        started = time.monotonic()
+
+    entries = {}
+    for process in psutil.process_iter(['pid', 'name', 'status', 'create_time', 'memory_info']):
+        info = process.info
+        memory_info = info['memory_info']
+        entries[info['pid']] = ProcessEntry(
+            pid=info['pid'],
+            name=info['name'],
+            status=info['status'],
+            create_time=info['create_time'],
+            rss=memory_info.rss if memory_info else None,
+            cpu_percent=None,
+        )
+
+    if cpu_interval:
+        time.sleep(max(cpu_interval - (time.monotonic() - started), 0))
+        cpu_after = read_cpu_times()
+        cpu_percent = cpu_percent_between(cpu_before, cpu_after, time.monotonic() - started)
+        for pid, entry in entries.items():
+            entries[pid] = entry._replace(cpu_percent=cpu_percent.get(pid))
+
+    return ProcessSnapshot(entries)
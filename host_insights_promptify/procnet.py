@@ -0,0 +1,227 @@
+import functools
+import os
+import socket
+import sys
+from .records import ConnectionRecord
+
+PROC_ROOT = "/proc"
+HOST_LITTLE_ENDIAN = sys.byteorder == "little"  # /proc/net prints addresses as host-order words
+
+# Socket tables in /proc/net and the protocol of each
+SOCKET_TABLES = (
+    ("tcp", "TCP"),
+    ("tcp6", "TCP"),
+    ("udp", "UDP"),
+    ("udp6", "UDP"),
+)
+
+# Kernel TCP states (include/net/tcp_states.h), named as psutil names them
+TCP_STATES = {
+    "01": "ESTABLISHED",
+    "02": "SYN_SENT",
+    "03": "SYN_RECV",
+    "04": "FIN_WAIT1",
+    "05": "FIN_WAIT2",
+    "06": "TIME_WAIT",
+    "07": "CLOSE",
+    "08": "CLOSE_WAIT",
+    "09": "LAST_ACK",
+    "0A": "LISTEN",
+    "0B": "CLOSING",
+    "0C": "SYN_RECV",
+}
+
+# Route flags (include/uapi/linux/route.h, ipv6_route.h), lettered as "route -n" shows them
+ROUTE_FLAGS = ((0x0001, "U"), (0x0002, "G"), (0x0004, "H"), (0x0010, "D"), (0x0020, "M"), (0x0200, "!"))
+RTF_LOCAL = 0x80000000
+
+def procfs_available(proc_root=PROC_ROOT):
+    """
+    Returns True if the /proc/net socket tables can be read on this host.
+    """
+    return os.access(os.path.join(proc_root, "net", "tcp"), os.R_OK)
+
+def routes_available(proc_root=PROC_ROOT):
+    """
+    Returns True if the /proc/net routing tables can be read on this host.
+    """
+    return os.access(os.path.join(proc_root, "net", "route"), os.R_OK)
+
+@functools.lru_cache(maxsize=65536)
+def _decode_ip(hex_ip):
+    """
+    Decodes an IP address from /proc/net notation: the address bytes as hexadecimal,
+    in host byte order per 32-bit word.
+    """
+    raw = bytes.fromhex(hex_ip)
+    if not HOST_LITTLE_ENDIAN:
+        return socket.inet_ntop(socket.AF_INET if len(raw) == 4 else socket.AF_INET6, raw)
+    if len(raw) == 4:
+        return socket.inet_ntop(socket.AF_INET, raw[::-1])
+    words = b"".join(raw[i:i + 4][::-1] for i in range(0, 16, 4))
+    return socket.inet_ntop(socket.AF_INET6, words)
+
+def _decode_address(hex_address, remote=False):
+    """
+    Decodes an "ADDR:PORT" field. For the remote end, the unspecified address with port 0
+    (how the kernel shows unconnected sockets) is returned as None.
+
+    Returns:
+        tuple: An (ip, port) pair, or None.
+    """
+    hex_ip, hex_port = hex_address.split(":")
+    port = int(hex_port, 16)
+    if remote and port == 0 and hex_ip.strip("0") == "":
+        return None
+    return _decode_ip(hex_ip), port
+
+def build_inode_pid_map(proc_root=PROC_ROOT):
+    """
+    Maps socket inodes to the PIDs that own them, in one pass over /proc/<pid>/fd.
+
+    Only processes whose file descriptors are readable by the current user are included.
+
+    Returns:
+        dict: A mapping of socket inode (int) to PID.
+    """
+    inode_pids = {}
+    for entry in os.listdir(proc_root):
+        if not entry.isdigit():
+            continue
+        fd_dir = os.path.join(proc_root, entry, "fd")
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        pid = int(entry)
+        for fd in fds:
+            try:
+                target = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            if target.startswith("socket:["):
+                inode_pids[int(target[8:-1])] = pid
+    return inode_pids
+
+def iter_socket_table(table, protocol, proc_root=PROC_ROOT):
+    """
+    Parses one /proc/net socket table line by line.
+
+    Args:
+        table (str): The table name, e.g. "tcp" or "udp6".
+        protocol (str): "TCP" or "UDP".
+
+    Yields:
+        tuple: (protocol, local, remote, status, inode) for each socket, where local and
+        remote are (ip, port) pairs (remote is None for unconnected sockets).
+    """
+    try:
+        f = open(os.path.join(proc_root, "net", table), "r")
+    except OSError:
+        return
+    with f:
+        next(f, None)  # Header line
+        for line in f:
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+            status = TCP_STATES.get(fields[3], "NONE") if protocol == "TCP" else "NONE"
+            yield protocol, _decode_address(fields[1]), _decode_address(fields[2], remote=True), status, int(fields[9])
+
+def iter_proc_connections(attribute=True, snapshot=None, proc_root=PROC_ROOT):
+    """
+    Lazily yields active connections parsed directly from the /proc/net socket tables.
+
+    This avoids psutil.net_connections(), which walks every process's file descriptor table
+    for each call. When attribution is requested, the inode-to-PID map is built once.
+
+    Args:
+        attribute (bool): Resolve the owning PID (and, with a snapshot, the process name) of
+            each socket. If False, the PID join is skipped entirely and pid/process are None.
+        snapshot (ProcessSnapshot): Used to resolve process names from PIDs.
+        proc_root (str): The procfs mount point.
+
+    Yields:
+        ConnectionRecord: Connections in the same shape as collect_network_info produces.
+    """
+    inode_pids = build_inode_pid_map(proc_root) if attribute else {}
+    for table, protocol in SOCKET_TABLES:
+        for _, local, remote, status, inode in iter_socket_table(table, protocol, proc_root):
+            yield ConnectionRecord(protocol, local, remote, status, inode_pids.get(inode), snapshot)
+
+def _route_flags(bits):
+    """
+    Renders route flag bits as letters, e.g. 0x0003 as "UG".
+    """
+    return "".join(letter for bit, letter in ROUTE_FLAGS if bits & bit)
+
+def iter_ipv4_routes(proc_root=PROC_ROOT):
+    """
+    Parses the IPv4 main routing table from /proc/net/route.
+
+    Yields:
+        dict: Route dictionaries with destination, gateway, interface, netmask, flags and metric.
+    """
+    try:
+        f = open(os.path.join(proc_root, "net", "route"), "r")
+    except OSError:
+        return
+    with f:
+        next(f, None)  # Header line
+        for line in f:
+            fields = line.split()
+            if len(fields) < 8:
+                continue
+            destination, gateway, mask = _decode_ip(fields[1]), _decode_ip(fields[2]), _decode_ip(fields[7])
+            yield {
+                "destination": "default" if destination == mask == "0.0.0.0" else destination,
+                "gateway": None if gateway == "0.0.0.0" else gateway,
+                "interface": fields[0],
+                "netmask": mask,
+                "flags": _route_flags(int(fields[3], 16)),
+                "metric": int(fields[6]),
+            }
+
+def iter_ipv6_routes(proc_root=PROC_ROOT):
+    """
+    Parses the IPv6 routing table from /proc/net/ipv6_route.
+
+    Local, multicast and loopback-unreachable entries, which "ip -6 route" keeps in
+    separate tables, are skipped.
+
+    Yields:
+        dict: Route dictionaries in the same shape as iter_ipv4_routes produces; the netmask
+        is given as a prefix length such as "/64".
+    """
+    try:
+        f = open(os.path.join(proc_root, "net", "ipv6_route"), "r")
+    except OSError:
+        return
+    with f:
+        for line in f:
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+            flags, interface = int(fields[8], 16), fields[9]
+            if flags & RTF_LOCAL or interface == "lo" or fields[0].startswith("ff"):
+                continue
+            prefix_length = int(fields[1], 16)
+            destination = socket.inet_ntop(socket.AF_INET6, bytes.fromhex(fields[0]))
+            gateway = socket.inet_ntop(socket.AF_INET6, bytes.fromhex(fields[4]))
+            yield {
+                "destination": "default" if prefix_length == 0 else f"{destination}/{prefix_length}",
+                "gateway": None if gateway == "::" else gateway,
+                "interface": interface,
+                "netmask": f"/{prefix_length}",
+                "flags": _route_flags(flags),
+                "metric": int(fields[5], 16),
+            }
+
+def read_routing_table(proc_root=PROC_ROOT):
+    """
+    Reads the IPv4 and IPv6 routing tables from procfs, without running "ip route".
+
+    Returns:
+        list: Route dictionaries, IPv4 routes first.
+    """
+    return list(iter_ipv4_routes(proc_root)) + list(iter_ipv6_routes(proc_root))
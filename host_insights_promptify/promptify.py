@@ -1,6 +1,484 @@
-import os
+import collections.abc
+import itertools
+import json
+import marshal
+import threading
+from datetime import datetime
+from .records import Record, ServiceRecord, to_builtin
 
-def format_prompt(system_info, network_info, docker_info, services_info):
+# Prompt labels of the host metrics in a trends summary
+TREND_LABELS = {
+    "cpu_percent": "CPU Usage",
+    "memory_percent": "Memory Usage",
+    "disk_read_bytes_s": "Disk Read",
+    "disk_write_bytes_s": "Disk Write",
+    "net_sent_bytes_s": "Network Sent",
+    "net_recv_bytes_s": "Network Received",
+}
+
+def _peek(iterable):
+    """
+    Returns (is_empty, iterator) for any iterable without consuming its first item,
+    so generators can be tested for emptiness before rendering.
+    """
+    iterator = iter(iterable)
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return True, iter(())
+    return False, itertools.chain((first,), iterator)
+
+def _omitted(item, kind):
+    """
+    Returns the summary line for an "omitted" marker left in a list by the compaction stage,
+    or None if the item is a regular entry.
+    """
+    if "omitted" in item:
+        return f"- ... {item['omitted']} more {kind} omitted for brevity"
+    return None
+
+def _format_time(value):
+    """
+    Formats a raw timestamp (epoch seconds) for the prompt. Values that are already text,
+    such as timestamps from older reports, are returned unchanged.
+    """
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+def _format_bytes(value):
+    """
+    Formats a byte count with a binary unit, e.g. "1.5 MiB".
+    """
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(value) < 1024 or unit == "GiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+def _format_stats(stats, unit):
+    """
+    Formats a metric summary (see sampling.summarize) as "min X, mean X, p95 X, max X (trend)".
+    """
+    if unit == "%":
+        show = lambda value: f"{value}%"
+    elif unit == "B/s":
+        show = lambda value: f"{_format_bytes(value)}/s"
+    else:
+        show = _format_bytes
+    return f"min {show(stats['min'])}, mean {show(stats['mean'])}, p95 {show(stats['p95'])}, max {show(stats['max'])} ({stats['trend']})"
+
+def _render_header(_):
+    yield "### AI SYSTEM INSIGHTS REPORT ###"
+    yield "This report provides a detailed overview of the current system's state. Your task is to use this information to assist with any queries or issues related to the system. Please keep the following in mind:"
+    yield "- Be proactive in identifying potential issues or optimizations based on the data provided."
+    yield "- Always search the web for additional, up-to-date information if needed to ensure that the advice provided is accurate and current."
+    yield "- Ensure all recommendations adhere to the latest security best practices and are tailored to the specific configurations of this system."
+    yield "- Verify the correctness of all information before making suggestions or changes."
+    yield "- Offer specific suggestions and advice on how to address any concerns that might arise from the system's current state."
+    yield "- Be prepared to answer follow-up questions with additional details or clarifications as needed."
+    yield ""
+
+def _render_system(system_info):
+    yield "### Section 1: System Information ###"
+    yield "The following data provides an overview of the system's hardware and operating system:"
+    yield f"- Operating System: {system_info.get('OS', 'N/A')}"
+    yield f"- OS Version: {system_info.get('OS Version', 'N/A')}"
+    yield f"- Architecture: {system_info.get('Architecture', 'N/A')}"
+    yield f"- Hostname: {system_info.get('Hostname', 'N/A')}"
+    yield f"- CPU: {system_info.get('CPU', 'N/A')}"
+    yield f"- Memory: {system_info.get('Memory', 'N/A')}"
+    yield f"- Disk: {system_info.get('Disk', 'N/A')}"
+    unresponsive = [p for p in system_info.get('Disk Partitions') or [] if p.get('Status') == 'unresponsive']
+    if unresponsive:
+        mounts = ", ".join(f"{p.get('Mountpoint', 'N/A')} ({p.get('File System', 'N/A')})" for p in unresponsive)
+        yield f"- Unresponsive Mounts (usage query timed out, e.g. a stale network mount): {mounts}"
+    yield ""
+    yield "Review this information to ensure the system is running optimally. If any configurations seem suboptimal, provide recommendations."
+    yield ""
+
+def _render_interfaces(interfaces):
+    yield "### Section 2: Network Information ###"
+    yield "Details regarding network interfaces, routing, active connections, DNS configuration, and firewall rules:"
+    
+    yield "#### 2.1 Network Interfaces ####"
+    for iface in interfaces:
+        if _omitted(iface, "interfaces"):
+            yield _omitted(iface, "interfaces")
+            yield ""
+            continue
+        yield f"- Interface: {iface.get('name', 'N/A')}"
+        yield f"  - Status: {iface.get('status', 'N/A')}"
+        yield f"  - IPv4 Address: {iface.get('ipv4', 'N/A')}"
+        yield f"  - IPv6 Address: {iface.get('ipv6', 'N/A')}"
+        yield f"  - MAC Address: {iface.get('mac', 'N/A')}"
+        yield f"  - Netmask: {iface.get('netmask', 'N/A')}"
+        yield f"  - Broadcast: {iface.get('broadcast', 'N/A')}"
+        yield f"  - MTU: {iface.get('mtu', 'N/A')}"
+        yield f"  - Speed: {iface.get('speed', 'N/A')} Mbps"
+        io = iface.get('io')
+        if io:
+            yield f"  - Sent: {io['bytes_sent']} bytes ({io['packets_sent']} packets)"
+            yield f"  - Received: {io['bytes_recv']} bytes ({io['packets_recv']} packets)"
+            yield f"  - Errors: {io['errin']} in, {io['errout']} out; Drops: {io['dropin']} in, {io['dropout']} out"
+        yield ""
+    yield "Check the status and configurations of the network interfaces. Provide guidance if any interfaces are down or misconfigured."
+    yield ""
+
+def _render_routes(routing_table):
+    yield "#### 2.2 Routing Table ####"
+    for route in routing_table:
+        if _omitted(route, "routes"):
+            yield _omitted(route, "routes")
+            yield ""
+            continue
+        if isinstance(route, str):
+            # Raw routing tool output, on platforms without a structured reader
+            yield f"- {route}"
+            continue
+        yield f"- Destination: {route.get('destination', 'N/A')}"
+        yield f"  - Gateway: {route.get('gateway', 'N/A')}"
+        yield f"  - Interface: {route.get('interface', 'N/A')}"
+        yield f"  - Netmask: {route.get('netmask', 'N/A')}"
+        yield f"  - Flags: {route.get('flags', 'N/A')}"
+        yield f"  - Metric: {route.get('metric', 'N/A')}"
+        yield ""
+    yield "Analyze the routing table for any potential misconfigurations or routes that might affect network performance. Offer insights on improving routing efficiency."
+    yield ""
+
+def _render_connections(active_connections):
+    yield "#### 2.3 Active Connections ####"
+    for conn in active_connections:
+        if _omitted(conn, "connection groups"):
+            yield _omitted(conn, "connection groups")
+            yield ""
+            continue
+        if "count" in conn:
+            # An aggregated group of connections produced by the compaction stage
+            port = f"remote port {conn['remote_port']}" if conn.get('remote_port') else f"local port {conn.get('local_port', 'N/A')}"
+            yield f"- {conn['count']} x {conn.get('protocol', 'N/A')} {conn.get('status', 'N/A')} on {port}"
+            yield f"  - Associated Process: {conn.get('process', 'N/A')}"
+            yield ""
+            continue
+        yield f"- Protocol: {conn.get('protocol', 'N/A')}"
+        yield f"  - Local Address: {conn.get('local_address', 'N/A')}"
+        yield f"  - Remote Address: {conn.get('remote_address', 'N/A')}"
+        yield f"  - Status: {conn.get('status', 'N/A')}"
+        yield f"  - Associated Process: {conn.get('process', 'N/A')} (PID: {conn.get('pid', 'N/A')})"
+        yield ""
+    yield "Review active connections to ensure there are no unauthorized or suspicious activities. Provide advice on securing network traffic where necessary."
+    yield ""
+
+def _render_dns(dns):
+    yield "#### 2.4 DNS Configuration ####"
+    yield f"- Primary DNS: {dns.get('primary', 'N/A')}"
+    yield f"- Secondary DNS: {dns.get('secondary', 'N/A')}"
+    yield f"- Search Domains: {', '.join(dns.get('search_domains', []))}"
+    yield ""
+    yield "Evaluate the DNS settings. Suggest improvements if the current configuration might cause resolution delays or other issues."
+    yield ""
+
+def _render_firewall(firewall_rules):
+    if firewall_rules:
+        yield "#### 2.5 Firewall Rules ####"
+        yield firewall_rules
+        yield ""
+    yield "Check the firewall rules for any gaps in security. Recommend changes to tighten security if necessary."
+    yield ""
+
+def _render_containers(containers):
+    yield "### Section 3: Docker Information ###"
+    yield "Information about Docker containers, networks, and volumes on the system:"
+    
+    yield "#### 3.1 Containers ####"
+    for container in containers:
+        if _omitted(container, "containers"):
+            yield _omitted(container, "containers")
+            yield ""
+            continue
+        yield f"- Container Name: {container.get('name', 'N/A')}"
+        if container.get('count', 1) > 1:
+            yield f"  - Identical Containers: {container['count']}"
+        yield f"  - Image: {', '.join(container.get('image', []))}"
+        yield f"  - Status: {container.get('status', 'N/A')}"
+        yield f"  - Ports: {container.get('ports', 'N/A')}"
+        yield f"  - CPU Usage: {container.get('cpu_usage', 'N/A')}"
+        if container.get('cpu_percent') is not None:
+            yield f"  - CPU Percent: {container['cpu_percent']}%"
+        yield f"  - Memory Usage: {container.get('memory_usage', 'N/A')} bytes"
+        if container.get('block_io'):
+            yield f"  - Block I/O: read {_format_bytes(container['block_io']['read_bytes'])}, written {_format_bytes(container['block_io']['write_bytes'])}"
+        yield f"  - Health Status: {container.get('health_status', 'N/A')}"
+        yield f"  - Restart Policy: {container.get('restart_policy', 'N/A')}"
+        yield f"  - Mounts: {container.get('mounts', 'N/A')}"
+        yield f"  - Networks: {container.get('networks', 'N/A')}"
+        yield ""
+    yield "Examine the state of Docker containers. If any containers are underperforming or experiencing issues, suggest troubleshooting steps or optimizations."
+    yield ""
+
+def _render_docker_networks(networks):
+    yield "#### 3.2 Networks ####"
+    for network in networks:
+        if _omitted(network, "networks"):
+            yield _omitted(network, "networks")
+            yield ""
+            continue
+        yield f"- Network Name: {network.get('name', 'N/A')}"
+        yield f"  - ID: {network.get('id', 'N/A')}"
+        yield f"  - Driver: {network.get('driver', 'N/A')}"
+        yield f"  - Subnet: {network.get('subnet', 'N/A')}"
+        yield f"  - Gateway: {network.get('gateway', 'N/A')}"
+        yield f"  - Connected Containers: {', '.join([container for container in network.get('containers', [])])}"
+        yield ""
+    yield "Assess the Docker network configurations. Provide recommendations if there are any security or performance concerns."
+    yield ""
+
+def _render_volumes(volumes):
+    yield "#### 3.3 Volumes ####"
+    for volume in volumes:
+        if _omitted(volume, "volumes"):
+            yield _omitted(volume, "volumes")
+            yield ""
+            continue
+        yield f"- Volume Name: {volume.get('name', 'N/A')}"
+        yield f"  - Mountpoint: {volume.get('mountpoint', 'N/A')}"
+        yield f"  - Driver: {volume.get('driver', 'N/A')}"
+        yield f"  - Labels: {volume.get('labels', 'N/A')}"
+        yield ""
+    yield "Review Docker volumes. If there are storage or access issues, offer potential solutions."
+    yield ""
+
+def _render_services(services_info):
+    services_empty, services_info = _peek(services_info or ())
+    if services_empty:
+        return
+    yield "### Section 4: Running Services ###"
+    yield "The following services are currently running on the system:"
+    for service in services_info:
+        if _omitted(service, "services"):
+            yield _omitted(service, "services")
+            yield ""
+            continue
+        if "error" in service:
+            # The marker left by a failed or timed-out services collector
+            yield f"Error: {service['error']}"
+            yield ""
+            continue
+        yield f"- Service Name: {service.get('name', 'N/A')}"
+        yield f"  - Status: {service.get('status', 'N/A')}"
+        yield f"  - Start Time: {_format_time(service.get('start_time', 'N/A'))}"
+        yield f"  - Memory Usage: {service.get('memory_usage', 'N/A')} bytes"
+        cpu_usage = service.get('cpu_usage', 'N/A')
+        yield f"  - CPU Usage: {cpu_usage}%" if isinstance(cpu_usage, (int, float)) else f"  - CPU Usage: {cpu_usage}"
+        yield ""
+    yield "Ensure that all critical services are running as expected. If any services are misbehaving or consuming excessive resources, suggest corrective actions."
+    yield ""
+
+def _render_trends(trends):
+    if not trends:
+        return
+    yield "### Section 5: Metric Trends ###"
+    if trends.get("error"):
+        yield f"Error: {trends['error']}"
+    else:
+        yield f"The following metrics were sampled every {trends.get('interval')}s over {trends.get('samples', 0)} samples. Trends compare the start and the end of the window; a high max or p95 with a steady trend indicates short spikes:"
+        for name, stats in trends.get("host", {}).items():
+            yield f"- {TREND_LABELS.get(name, name)}: {_format_stats(stats, stats.get('unit'))}"
+        processes = trends.get("processes") or []
+        if processes:
+            yield "Busiest processes over the window:"
+        for process in processes:
+            if _omitted(process, "processes"):
+                yield _omitted(process, "processes")
+                continue
+            yield f"- {process.get('name', 'N/A')} (PID: {process.get('pid', 'N/A')})"
+            yield f"  - CPU Usage: {_format_stats(process['cpu_percent'], '%')}"
+            yield f"  - Memory (RSS): {_format_stats(process['rss_bytes'], 'B')}"
+    yield ""
+    yield "Distinguish sustained load from transient spikes using these trends, and point out any resource that is steadily rising."
+    yield ""
+
+def _render_units(units_info):
+    units = (units_info or {}).get("units") or []
+    # Compacted units carry their totals, as inactive and surplus units were dropped
+    counts = (units_info or {}).get("counts")
+    if not units and not counts:
+        return
+    inactive = [unit for unit in units if unit.get('active_state') == 'inactive']
+    if counts is None:
+        failed = sum(1 for unit in units if unit.get('active_state') == 'failed')
+        counts = {"active": len(units) - len(inactive) - failed, "failed": failed, "inactive": len(inactive)}
+    yield "### Section 6: Systemd Units ###"
+    yield f"The following systemd units are loaded on the system ({counts['active']} active, {counts['failed']} failed, {counts['inactive']} inactive):"
+    for unit in units:
+        if _omitted(unit, "units"):
+            yield _omitted(unit, "units")
+            yield ""
+            continue
+        if unit.get('active_state') == 'inactive':
+            continue
+        yield f"- {unit.get('name', 'N/A')}: {unit.get('active_state', 'N/A')} ({unit.get('sub_state', 'N/A')}), result: {unit.get('result', 'N/A')}, restarts: {unit.get('restarts') if unit.get('restarts') is not None else 'N/A'}"
+        yield f"  - Description: {unit.get('description', 'N/A')}"
+        if unit.get('active_since'):
+            yield f"  - Active Since: {unit['active_since']}"
+        memory = _format_bytes(unit['memory_usage']) if unit.get('memory_usage') is not None else 'N/A'
+        cpu = f"{unit['cpu_usage'] / 1e9:.1f}s" if unit.get('cpu_usage') is not None else 'N/A'
+        yield f"  - Main PID: {unit.get('main_pid') or 'N/A'}; Memory: {memory}; CPU Time: {cpu}; Tasks: {unit.get('tasks') if unit.get('tasks') is not None else 'N/A'}"
+        if unit.get('processes'):
+            yield f"  - Processes: {len(unit['processes'])} (RSS {_format_bytes(unit.get('process_rss', 0))}, CPU {unit.get('process_cpu_percent', 0.0):.1f}%)"
+        yield ""
+    if inactive:
+        yield f"- Inactive Units: {', '.join(unit.get('name', 'N/A') for unit in inactive)}"
+        yield ""
+    yield "Investigate failed units and units that restart repeatedly, and check whether each unit's resource usage fits its purpose."
+    yield ""
+
+def _render_footer(_):
+    yield "### END OF REPORT ###"
+    yield "Please ensure that all suggestions are verified and are in line with the latest security best practices. Be prepared to provide further assistance and clarification as needed."
+
+def _sections(system_info, network_info, docker_info, services_info, trends, units):
+    """
+    Splits the report into independently rendered sections.
+
+    Returns:
+        list: (name, renderer, data) triples in report order, where renderer(data) yields
+        the section's lines.
+    """
+    sections = [
+        ("header", _render_header, None),
+        ("system", _render_system, system_info),
+        ("network.interfaces", _render_interfaces, network_info.get('interfaces', [])),
+        ("network.routes", _render_routes, network_info.get('routing_table', [])),
+        ("network.connections", _render_connections, network_info.get('active_connections', [])),
+        ("network.dns", _render_dns, network_info.get('dns', {})),
+        ("network.firewall", _render_firewall, network_info.get('firewall_rules')),
+    ]
+    if docker_info.get("containers") or docker_info.get("networks") or docker_info.get("volumes"):
+        sections += [
+            ("docker.containers", _render_containers, docker_info.get("containers", [])),
+            ("docker.networks", _render_docker_networks, docker_info.get("networks", [])),
+            ("docker.volumes", _render_volumes, docker_info.get("volumes", [])),
+        ]
+    sections += [
+        ("services", _render_services, services_info),
+        ("trends", _render_trends, trends),
+        ("units", _render_units, units),
+        ("footer", _render_footer, None),
+    ]
+    return sections
+
+def iter_prompt(system_info, network_info, docker_info, services_info, trends=None, units=None):
+    """
+    Renders the collected information as a stream of prompt lines.
+
+    Lines are produced one at a time, so the complete report never has to be held in memory.
+    The list-valued fields (interfaces, routes, connections, containers, services, ...) may be
+    any iterable, including generators that collect their items lazily.
+
+    Args:
+        system_info (dict): System-related information.
+        network_info (dict): Network-related information.
+        docker_info (dict): Docker-related information.
+        services_info (iterable): Information about running services.
+        trends (dict): Optional metric trends sampled over a window (see sampling.MetricsSampler).
+        units (dict): Optional systemd units (see systemd.collect_units_info).
+
+    Yields:
+        str: The lines of the prompt, without trailing newlines.
+    """
+    for _, render, data in _sections(system_info, network_info, docker_info, services_info, trends, units):
+        yield from render(data)
+
+def _structural_hash(value):
+    """
+    Hashes section data by content. Plain data (dicts, lists, strings, numbers) is serialized
+    with marshal, in C, which also keeps apart values that render differently but compare
+    equal, such as 1 and 1.0. Anything marshal cannot encode falls back to JSON.
+    """
+    try:
+        return hash(marshal.dumps(value))
+    except ValueError:
+        return hash(json.dumps(value, default=to_builtin))
+
+class PromptRenderer:
+    """
+    Renders prompts like format_prompt, reusing the text of every section whose input did not
+    change since the previous render.
+
+    Each section (the system overview, the interfaces, the routing table, the Docker
+    networks, ...) is keyed by a hash of a compact serialization of the data it renders, which
+    costs a fraction of rendering it. Repeated reports of
+    the same host, such as the daemon's refreshes, typically re-render only the sections with
+    fast-moving data (connections, container and service usage). One rendered text is kept
+    per section. Hits and misses are counted in total and per section.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._sections = {}
+        self._section_stats = {}
+        self._lock = threading.Lock()
+
+    def _render_section(self, name, render, data):
+        if isinstance(data, collections.abc.Iterator):
+            # A lazily collected list is consumed once, for both the key and the render
+            data = list(data)
+        if isinstance(data, list) and any(isinstance(item, Record) for item in data):
+            # Evaluate the records' lazy fields once, for both the key and the render
+            data = [item.as_dict() if isinstance(item, Record) else item for item in data]
+        key = _structural_hash(data)
+        with self._lock:
+            stats = self._section_stats.setdefault(name, {"hits": 0, "misses": 0})
+            cached = self._sections.get(name)
+            if cached is not None and cached[0] == key:
+                self.hits += 1
+                stats["hits"] += 1
+                return cached[1]
+            self.misses += 1
+            stats["misses"] += 1
+        lines = list(render(data))
+        text = "\n".join(lines) if lines else None
+        with self._lock:
+            self._sections[name] = (key, text)
+        return text
+
+    def render(self, system_info, network_info, docker_info, services_info, trends=None, units=None):
+        """
+        Formats the collected information into a prompt, identical to format_prompt's.
+
+        Args:
+            system_info (dict): System-related information.
+            network_info (dict): Network-related information.
+            docker_info (dict): Docker-related information.
+            services_info (iterable): Information about running services.
+            trends (dict): Optional metric trends sampled over a window.
+            units (dict): Optional systemd units.
+
+        Returns:
+            str: The prompt.
+        """
+        texts = (self._render_section(name, render, data)
+                 for name, render, data in _sections(system_info, network_info, docker_info, services_info, trends, units))
+        return "\n".join(text for text in texts if text is not None)
+
+    def stats(self):
+        """
+        Returns the section cache hit and miss counters.
+
+        Returns:
+            dict: Total "hits", "misses" and "hit_rate", and a "sections" mapping of section
+            name to its own counters and hit rate.
+        """
+        def with_rate(hits, misses):
+            return {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None}
+
+        with self._lock:
+            return dict(with_rate(self.hits, self.misses),
+                        sections={name: with_rate(stats["hits"], stats["misses"])
+                                  for name, stats in self._section_stats.items()})
+
+def format_prompt(system_info, network_info, docker_info, services_info, trends=None, units=None, renderer=None):
     """
     Formats the collected system, network, Docker, and services information into a single AI-ready prompt.
 
@@ -9,168 +487,287 @@ def format_prompt(system_info, network_info, docker_info, services_info):
         network_info (dict): Network-related information.
         docker_info (dict): Docker-related information.
         services_info (dict): Information about running services.
+        trends (dict): Optional metric trends sampled over a window.
+        units (dict): Optional systemd units.
+        renderer (PromptRenderer): Optional renderer that reuses the sections unchanged since
+            its previous render.
 
     Returns:
         str: A formatted string containing all the collected information, optimized for AI interaction.
     """
-    prompt = []
-
-    # Header with directives
-    prompt.append("### AI SYSTEM INSIGHTS REPORT ###")
-    prompt.append("This report provides a detailed overview of the current system's state. Your task is to use this information to assist with any queries or issues related to the system. Please keep the following in mind:")
-    prompt.append("- Be proactive in identifying potential issues or optimizations based on the data provided.")
-    prompt.append("- Always search the web for additional, up-to-date information if needed to ensure that the advice provided is accurate and current.")
-    prompt.append("- Ensure all recommendations adhere to the latest security best practices and are tailored to the specific configurations of this system.")
-    prompt.append("- Verify the correctness of all information before making suggestions or changes.")
-    prompt.append("- Offer specific suggestions and advice on how to address any concerns that might arise from the system's current state.")
-    prompt.append("- Be prepared to answer follow-up questions with additional details or clarifications as needed.")
-    prompt.append("")
-
-    # System Information
-    prompt.append("### Section 1: System Information ###")
-    prompt.append("The following data provides an overview of the system's hardware and operating system:")
-    prompt.append(f"- Operating System: {system_info.get('OS', 'N/A')}")
-    prompt.append(f"- OS Version: {system_info.get('OS Version', 'N/A')}")
-    prompt.append(f"- Architecture: {system_info.get('Architecture', 'N/A')}")
-    prompt.append(f"- Hostname: {system_info.get('Hostname', 'N/A')}")
-    prompt.append(f"- CPU: {system_info.get('CPU', 'N/A')}")
-    prompt.append(f"- Memory: {system_info.get('Memory', 'N/A')}")
-    prompt.append(f"- Disk: {system_info.get('Disk', 'N/A')}")
-    prompt.append("")
-    prompt.append("Review this information to ensure the system is running optimally. If any configurations seem suboptimal, provide recommendations.")
-    prompt.append("")
-
-    # Network Information
-    prompt.append("### Section 2: Network Information ###")
-    prompt.append("Details regarding network interfaces, routing, active connections, DNS configuration, and firewall rules:")
-    
-    prompt.append("#### 2.1 Network Interfaces ####")
-    for iface in network_info.get('interfaces', []):
-        prompt.append(f"- Interface: {iface.get('name', 'N/A')}")
-        prompt.append(f"  - Status: {iface.get('status', 'N/A')}")
-        prompt.append(f"  - IPv4 Address: {iface.get('ipv4', 'N/A')}")
-        prompt.append(f"  - IPv6 Address: {iface.get('ipv6', 'N/A')}")
-        prompt.append(f"  - MAC Address: {iface.get('mac', 'N/A')}")
-        prompt.append(f"  - Netmask: {iface.get('netmask', 'N/A')}")
-        prompt.append(f"  - Broadcast: {iface.get('broadcast', 'N/A')}")
-        prompt.append(f"  - MTU: {iface.get('mtu', 'N/A')}")
-        prompt.append(f"  - Speed: {iface.get('speed', 'N/A')} Mbps")
-        prompt.append("")
-    prompt.append("Check the status and configurations of the network interfaces. Provide guidance if any interfaces are down or misconfigured.")
-    prompt.append("")
-    
-    prompt.append("#### 2.2 Routing Table ####")
-    for route in network_info.get('routing_table', []):
-        prompt.append(f"- Destination: {route.get('destination', 'N/A')}")
-        prompt.append(f"  - Gateway: {route.get('gateway', 'N/A')}")
-        prompt.append(f"  - Interface: {route.get('interface', 'N/A')}")
-        prompt.append(f"  - Netmask: {route.get('netmask', 'N/A')}")
-        prompt.append(f"  - Flags: {route.get('flags', 'N/A')}")
-        prompt.append(f"  - Metric: {route.get('metric', 'N/A')}")
-        prompt.append("")
-    prompt.append("Analyze the routing table for any potential misconfigurations or routes that might affect network performance. Offer insights on improving routing efficiency.")
-    prompt.append("")
-
-    prompt.append("#### 2.3 Active Connections ####")
-    for conn in network_info.get('active_connections', []):
-        prompt.append(f"- Protocol: {conn.get('protocol', 'N/A')}")
-        prompt.append(f"  - Local Address: {conn.get('local_address', 'N/A')}")
-        prompt.append(f"  - Remote Address: {conn.get('remote_address', 'N/A')}")
-        prompt.append(f"  - Status: {conn.get('status', 'N/A')}")
-        prompt.append(f"  - Associated Process: {conn.get('process', 'N/A')} (PID: {conn.get('pid', 'N/A')})")
-        prompt.append("")
-    prompt.append("Review active connections to ensure there are no unauthorized or suspicious activities. Provide advice on securing network traffic where necessary.")
-    prompt.append("")
-
-    prompt.append("#### 2.4 DNS Configuration ####")
-    prompt.append(f"- Primary DNS: {network_info['dns'].get('primary', 'N/A')}")
-    prompt.append(f"- Secondary DNS: {network_info['dns'].get('secondary', 'N/A')}")
-    prompt.append(f"- Search Domains: {', '.join(network_info['dns'].get('search_domains', []))}")
-    prompt.append("")
-    prompt.append("Evaluate the DNS settings. Suggest improvements if the current configuration might cause resolution delays or other issues.")
-    prompt.append("")
-
-    if network_info.get('firewall_rules'):
-        prompt.append("#### 2.5 Firewall Rules ####")
-        prompt.append(network_info['firewall_rules'])
-        prompt.append("")
-    prompt.append("Check the firewall rules for any gaps in security. Recommend changes to tighten security if necessary.")
-    prompt.append("")
-
-    # Docker Information
-    if docker_info["containers"] or docker_info["networks"] or docker_info["volumes"]:
-        prompt.append("### Section 3: Docker Information ###")
-        prompt.append("Information about Docker containers, networks, and volumes on the system:")
-        
-        prompt.append("#### 3.1 Containers ####")
-        for container in docker_info.get("containers", []):
-            prompt.append(f"- Container Name: {container.get('name', 'N/A')}")
-            prompt.append(f"  - Image: {', '.join(container.get('image', []))}")
-            prompt.append(f"  - Status: {container.get('status', 'N/A')}")
-            prompt.append(f"  - Ports: {container.get('ports', 'N/A')}")
-            prompt.append(f"  - CPU Usage: {container.get('cpu_usage', 'N/A')}")
-            prompt.append(f"  - Memory Usage: {container.get('memory_usage', 'N/A')} bytes")
-            prompt.append(f"  - Health Status: {container.get('health_status', 'N/A')}")
-            prompt.append(f"  - Restart Policy: {container.get('restart_policy', 'N/A')}")
-            prompt.append(f"  - Mounts: {container.get('mounts', 'N/A')}")
-            prompt.append(f"  - Networks: {container.get('networks', 'N/A')}")
-            prompt.append("")
-        prompt.append("Examine the state of Docker containers. If any containers are underperforming or experiencing issues, suggest troubleshooting steps or optimizations.")
-        prompt.append("")
-
-        prompt.append("#### 3.2 Networks ####")
-        for network in docker_info.get("networks", []):
-            prompt.append(f"- Network Name: {network.get('name', 'N/A')}")
-            prompt.append(f"  - ID: {network.get('id', 'N/A')}")
-            prompt.append(f"  - Driver: {network.get('driver', 'N/A')}")
-            prompt.append(f"  - Subnet: {network.get('subnet', 'N/A')}")
-            prompt.append(f"  - Gateway: {network.get('gateway', 'N/A')}")
-            prompt.append(f"  - Connected Containers: {', '.join([container for container in network.get('containers', [])])}")
-            prompt.append("")
-        prompt.append("Assess the Docker network configurations. Provide recommendations if there are any security or performance concerns.")
-        prompt.append("")
-
-        prompt.append("#### 3.3 Volumes ####")
-        for volume in docker_info.get("volumes", []):
-            prompt.append(f"- Volume Name: {volume.get('name', 'N/A')}")
-            prompt.append(f"  - Mountpoint: {volume.get('mountpoint', 'N/A')}")
-            prompt.append(f"  - Driver: {volume.get('driver', 'N/A')}")
-            prompt.append(f"  - Labels: {volume.get('labels', 'N/A')}")
-            prompt.append("")
-        prompt.append("Review Docker volumes. If there are storage or access issues, offer potential solutions.")
-        prompt.append("")
-
-    # Services Information
-    if services_info:
-        prompt.append("### Section 4: Running Services ###")
-        prompt.append("The following services are currently running on the system:")
-        for service in services_info:
-            prompt.append(f"- Service Name: {service.get('name', 'N/A')}")
-            prompt.append(f"  - Status: {service.get('status', 'N/A')}")
-            prompt.append(f"  - Start Time: {service.get('start_time', 'N/A')}")
-            prompt.append(f"  - Memory Usage: {service.get('memory_usage', 'N/A')} bytes")
-            prompt.append(f"  - CPU Usage: {service.get('cpu_usage', 'N/A')}")
-            prompt.append("")
-        prompt.append("Ensure that all critical services are running as expected. If any services are misbehaving or consuming excessive resources, suggest corrective actions.")
-        prompt.append("")
-
-    # Closing statement
-    prompt.append("### END OF REPORT ###")
-    prompt.append("Please ensure that all suggestions are verified and are in line with the latest security best practices. Be prepared to provide further assistance and clarification as needed.")
-    
-    return "\n".join(prompt)
+    if renderer is not None:
+        return renderer.render(system_info, network_info, docker_info, services_info, trends=trends, units=units)
+    return "\n".join(iter_prompt(system_info, network_info, docker_info, services_info, trends=trends, units=units))
+
+def write_prompt(stream, system_info, network_info, docker_info, services_info, trends=None, units=None):
+    """
+    Writes the prompt to a text stream (stdout, a file, or a socket wrapped with makefile())
+    line by line as it is rendered, keeping memory use flat regardless of the size of the host.
+
+    Args:
+        stream (io.TextIOBase): A writable text stream.
+        system_info (dict): System-related information.
+        network_info (dict): Network-related information.
+        docker_info (dict): Docker-related information.
+        services_info (iterable): Information about running services.
+        trends (dict): Optional metric trends sampled over a window.
+        units (dict): Optional systemd units.
+
+    Returns:
+        int: The number of characters written.
+    """
+    written = 0
+    for line in iter_prompt(system_info, network_info, docker_info, services_info, trends=trends, units=units):
+        written += stream.write(line + "\n")
+    return written
+
+
+def _describe(item):
+    """
+    Returns a short one-line description of a record in a delta report.
+    """
+    if not isinstance(item, collections.abc.Mapping):
+        return str(item)
+    if "local_address" in item:
+        return f"{item.get('protocol', 'N/A')} {item.get('local_address')} -> {item.get('remote_address') or '*'} [{item.get('status', 'N/A')}] ({item.get('process') or 'unknown process'})"
+    if "Mountpoint" in item:
+        return f"{item.get('Mountpoint')} ({item.get('Device', 'N/A')}, {item.get('Usage', 'N/A')} used)"
+    if "destination" in item:
+        return f"{item.get('destination', 'N/A')} via {item.get('gateway', 'N/A')} dev {item.get('interface', 'N/A')}"
+    if "pid" in item and "name" in item:
+        return f"{item.get('name', 'N/A')} (PID: {item.get('pid', 'N/A')})"
+    if "image" in item:
+        return f"{item.get('name', 'N/A')} ({', '.join(item.get('image') or []) or 'untagged'}, {item.get('status', 'N/A')})"
+    if "active_state" in item:
+        return f"{item.get('name', 'N/A')} ({item.get('active_state', 'N/A')}, {item.get('sub_state', 'N/A')})"
+    return str(item.get('name', item))
+
+def iter_delta_prompt(delta, baseline_taken_at=None):
+    """
+    Renders a delta produced by baseline.diff_insights as a stream of prompt lines that
+    describe only what changed since the baseline.
+
+    Args:
+        delta (dict): The delta to render.
+        baseline_taken_at (float): When the baseline was taken (epoch seconds), if known.
+
+    Yields:
+        str: The lines of the prompt, without trailing newlines.
+    """
+    yield "### AI SYSTEM INSIGHTS DELTA REPORT ###"
+    since = f" since {datetime.fromtimestamp(baseline_taken_at).strftime('%Y-%m-%d %H:%M:%S')}" if baseline_taken_at else ""
+    yield f"This report lists only what changed on the system{since}. Anything not mentioned is unchanged. Use it together with the previous full report to assist with any queries or issues related to the system."
+    yield ""
+
+    sections = [
+        ("partitions", "Disk Partitions"),
+        ("interfaces", "Network Interfaces"),
+        ("routes", "Routing Table"),
+        ("connections", "Active Connections"),
+        ("containers", "Docker Containers"),
+        ("docker_networks", "Docker Networks"),
+        ("volumes", "Docker Volumes"),
+        ("processes", "Running Services"),
+        ("units", "Systemd Units"),
+    ]
+    changes_found = False
+
+    if delta.get("system"):
+        changes_found = True
+        yield "#### System Information ####"
+        for field, (old, new) in sorted(delta["system"].items()):
+            yield f"- {field}: {old} -> {new}"
+        yield ""
+
+    for key, title in sections:
+        section = delta.get(key) or {}
+        if not (section.get("added") or section.get("removed") or section.get("changed")):
+            continue
+        changes_found = True
+        yield f"#### {title} ####"
+        for item in section.get("added", []):
+            yield f"- Added: {_describe(item)}"
+        for item in section.get("removed", []):
+            yield f"- Removed: {_describe(item)}"
+        for item in section.get("changed", []):
+            changes = "; ".join(f"{field}: {old} -> {new}" for field, (old, new) in item["changes"].items())
+            key = item["key"]
+            # Process keys end with the raw start time, which is shown formatted
+            parts = key if isinstance(key, tuple) else (key,)
+            label = " ".join(str(_format_time(part) if isinstance(part, float) else part) for part in parts if part is not None)
+            yield f"- Changed: {label}: {changes}"
+        yield ""
+
+    if delta.get("dns"):
+        changes_found = True
+        old, new = delta["dns"]
+        yield "#### DNS Configuration ####"
+        yield f"- Changed: {old} -> {new}"
+        yield ""
+
+    if delta.get("firewall_changed"):
+        changes_found = True
+        yield "#### Firewall Rules ####"
+        yield "- The firewall rules changed. Request a full report to review the new rule set."
+        yield ""
+
+    if not changes_found:
+        yield "No significant changes were detected."
+        yield ""
+
+    yield "### END OF REPORT ###"
+    yield "Assess whether these changes could cause or explain any issues, and flag anything that looks unexpected or insecure."
+
+def format_delta_prompt(delta, baseline_taken_at=None):
+    """
+    Formats a delta produced by baseline.diff_insights into an AI-ready prompt.
+
+    Args:
+        delta (dict): The delta to render.
+        baseline_taken_at (float): When the baseline was taken (epoch seconds), if known.
+
+    Returns:
+        str: The delta report.
+    """
+    return "\n".join(iter_delta_prompt(delta, baseline_taken_at))
+
+def _host_list(hosts, total, limit=8):
+    """
+    Describes a set of hosts: "all N hosts", or their names, shortened after limit names.
+    """
+    if len(hosts) == total and total > 1:
+        return f"all {total} hosts"
+    names = ", ".join(hosts[:limit])
+    return names + (f" (+{len(hosts) - limit} more)" if len(hosts) > limit else "")
+
+def _fact_value(name, value):
+    """
+    Renders a fleet fact value on one line.
+    """
+    if value is None:
+        return "N/A"
+    if name == "Firewall Rules":
+        lines = len(str(value).splitlines())
+        return f"{lines} line{'s' if lines != 1 else ''} of rules"
+    if name == "DNS" and isinstance(value, dict):
+        servers = ", ".join(str(value[key]) for key in ("primary", "secondary") if value.get(key))
+        domains = " ".join(value.get("search_domains") or [])
+        return (servers or "no servers") + (f" (search: {domains})" if domains else "")
+    return str(value)
+
+def iter_fleet_prompt(fleet, limit=20):
+    """
+    Renders a cluster-level view produced by fleet.merge_fleet as a stream of prompt lines.
+
+    Facts shared by every host are stated once; facts that differ are listed per group of
+    hosts, so the prompt grows with the number of distinct configurations rather than the
+    number of hosts.
+
+    Args:
+        fleet (dict): The merged fleet view.
+        limit (int): Maximum number of images and services listed.
+
+    Yields:
+        str: The lines of the prompt, without trailing newlines.
+    """
+    hosts = fleet.get("hosts", [])
+    total = len(hosts)
+    failed = fleet.get("failed", {})
+    yield "### AI FLEET INSIGHTS REPORT ###"
+    yield f"This report summarizes {total} hosts{f' ({len(failed)} more could not be reached)' if failed else ''}. Facts shared by several hosts are listed once, with the hosts they apply to. Use this information to assist with any queries or issues related to the fleet."
+    yield ""
+
+    facts = fleet.get("facts", {})
+    yield "#### 1. Shared Configuration ####"
+    for name, groups in facts.items():
+        if len(groups) == 1:
+            yield f"- {name}: {_fact_value(name, groups[0]['value'])} ({_host_list(groups[0]['hosts'], total)})"
+    yield ""
+
+    differing = {name: groups for name, groups in facts.items() if len(groups) > 1}
+    yield "#### 2. Configuration Differences ####"
+    if not differing:
+        yield "- None: every host shares the configuration above."
+    for name, groups in differing.items():
+        yield f"- {name}:"
+        for group in groups:
+            yield f"  - {_fact_value(name, group['value'])}: {_host_list(group['hosts'], total)}"
+    yield "Check whether these differences are intended; drift between hosts that should be identical is a common source of issues."
+    yield ""
+
+    yield "#### 3. Container Images ####"
+    if not fleet.get("images"):
+        yield "- No containers found."
+    for image in fleet.get("images", [])[:limit]:
+        yield f"- {image['image']}: {image['containers']} containers on {_host_list(image['hosts'], total)}"
+    if len(fleet.get("images", [])) > limit:
+        yield f"- ... {len(fleet['images']) - limit} more images omitted"
+    yield ""
+
+    yield "#### 4. Services ####"
+    for service in fleet.get("services", [])[:limit]:
+        yield f"- {service['name']}: {service['instances']} processes on {_host_list(service['hosts'], total)}"
+    if len(fleet.get("services", [])) > limit:
+        yield f"- ... {len(fleet['services']) - limit} more services omitted"
+    yield ""
+
+    yield "#### 5. Hosts ####"
+    for summary in fleet.get("host_summaries", []):
+        yield f"- {summary['host']}: {summary.get('available_memory') or 'N/A'} memory available, disk {summary.get('disk_usage') or 'N/A'} used, {summary['containers']} containers, {summary['connections']} connections, {summary['services']} processes"
+        for error in summary.get("errors", []):
+            yield f"  - Error: {error}"
+    for host, error in sorted(failed.items()):
+        yield f"- {host}: unreachable ({error})"
+    yield ""
+    yield "Identify hosts that stand out from the rest of the fleet and suggest how to bring them in line."
+
+def format_fleet_prompt(fleet):
+    """
+    Formats a cluster-level view produced by fleet.merge_fleet into an AI-ready prompt.
+
+    Args:
+        fleet (dict): The merged fleet view.
+
+    Returns:
+        str: The fleet report.
+    """
+    return "\n".join(iter_fleet_prompt(fleet))
+
+def raw_output(value):
+    """
+    Converts raw collector output into the plain dictionaries and lists the CLI prints for a
+    single collector: records become dictionaries, and service start times are formatted as
+    in the prompt.
+    """
+    if isinstance(value, ServiceRecord):
+        return dict(value.as_dict(), start_time=_format_time(value.start_time))
+    if isinstance(value, Record):
+        return value.as_dict()
+    if isinstance(value, dict):
+        return {key: raw_output(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [raw_output(item) for item in value]
+    return value
 
 def save_prompt_to_file(prompt, file_path="host_insights_prompt.txt"):
     """
     Saves the generated prompt to a file.
 
     Args:
-        prompt (str): The generated AI-ready prompt.
+        prompt (str or iterable): The generated AI-ready prompt, or an iterable of prompt lines
+            (such as the generator returned by iter_prompt) which is written incrementally.
         file_path (str): The file path where the prompt will be saved.
     """
     try:
         with open(file_path, 'w') as file:
-            file.write(prompt)
+            if isinstance(prompt, str):
+                file.write(prompt)
+            elif isinstance(prompt, (dict, list)):
+                # Raw collector output is saved in the same form the CLI prints it
+                file.write(str(raw_output(prompt)))
+            else:
+                for line in prompt:
+                    file.write(line + "\n")
         print(f"Prompt saved to {file_path}")
     except Exception as e:
         print(f"Error saving prompt to {file_path}: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,158 @@
+import collections.abc
+
+class Record(collections.abc.Mapping):
+    """
+    Base class of the compact record types produced by the collectors.
+
+    A record stores its data in __slots__, without a per-instance dict, and keeps raw values
+    (numbers, addresses as (ip, port) pairs, psutil tuples); derived and formatted values
+    are computed only when a field is read. Records are read-only mappings over FIELDS, so
+    code written for the plain dictionaries the collectors used to return (record["name"],
+    record.get("pid"), dict(record), "omitted" in record) keeps working.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    def __getitem__(self, key):
+        if key not in self._field_set:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._field_set
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+    def as_dict(self):
+        """
+        Returns the record as a plain dictionary.
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+def to_builtin(value):
+    """
+    Converts records to plain dictionaries; a JSON encoder "default" hook. Other values that
+    JSON cannot represent are converted with str().
+    """
+    if isinstance(value, Record):
+        return value.as_dict()
+    return str(value)
+
+def _format_endpoint(endpoint):
+    return f"{endpoint[0]}:{endpoint[1]}" if endpoint else None
+
+class ServiceRecord(Record):
+    """
+    A running process, as reported in the services section. Wraps the snapshot's
+    ProcessEntry without copying it; start_time is the raw creation time (epoch seconds).
+    """
+    __slots__ = ("_entry",)
+    FIELDS = ("pid", "name", "status", "start_time", "memory_usage", "cpu_usage")
+
+    def __init__(self, entry):
+        self._entry = entry
+
+    @property
+    def pid(self):
+        return self._entry.pid
+
+    @property
+    def name(self):
+        return self._entry.name
+
+    @property
+    def status(self):
+        return self._entry.status
+
+    @property
+    def start_time(self):
+        return self._entry.create_time
+
+    @property
+    def memory_usage(self):
+        # Resident Set Size in bytes
+        return self._entry.rss if self._entry.rss is not None else 'N/A'
+
+    @property
+    def cpu_usage(self):
+        # Percent over the sampling window
+        return self._entry.cpu_percent if self._entry.cpu_percent is not None else 'N/A'
+
+class ConnectionRecord(Record):
+    """
+    An active connection. Endpoints are stored as (ip, port) pairs and formatted as
+    "ip:port" on access; the owning process name is looked up in the snapshot on access.
+    """
+    __slots__ = ("protocol", "_local", "_remote", "status", "pid", "_snapshot")
+    FIELDS = ("protocol", "local_address", "remote_address", "status", "pid", "process")
+
+    def __init__(self, protocol, local, remote, status, pid=None, snapshot=None):
+        self.protocol = protocol
+        self._local = local
+        self._remote = remote
+        self.status = status
+        self.pid = pid
+        self._snapshot = snapshot
+
+    @property
+    def local_address(self):
+        return _format_endpoint(self._local)
+
+    @property
+    def remote_address(self):
+        return _format_endpoint(self._remote)
+
+    @property
+    def process(self):
+        return self._snapshot.name(self.pid) if self.pid and self._snapshot is not None else None
+
+class InterfaceRecord(Record):
+    """
+    A network interface. I/O counters are kept as psutil's tuple and converted to a
+    dictionary on access.
+    """
+    __slots__ = ("name", "ipv4", "ipv6", "mac", "netmask", "broadcast", "mtu", "status", "speed", "_io")
+    FIELDS = ("name", "ipv4", "ipv6", "mac", "netmask", "broadcast", "mtu", "status", "speed", "io")
+    IO_FIELDS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv", "errin", "errout", "dropin", "dropout")
+
+    def __init__(self, name, mtu=None, status="down", speed=None, io=None):
+        self.name = name
+        self.ipv4 = None
+        self.ipv6 = None
+        self.mac = None
+        self.netmask = None
+        self.broadcast = None
+        self.mtu = mtu
+        self.status = status
+        self.speed = speed
+        self._io = io
+
+    @property
+    def io(self):
+        if self._io is None:
+            return None
+        return {field: getattr(self._io, field) for field in self.IO_FIELDS}
+
+class ContainerRecord(Record):
+    """
+    A Docker container with its raw resource usage (CPU time in nanoseconds, memory and block
+    I/O in bytes).
+    """
+    __slots__ = ("name", "image", "status", "ports", "cpu_usage", "cpu_percent", "memory_usage", "block_io", "env",
+                 "health_status", "restart_policy", "mounts", "networks")
+    FIELDS = __slots__
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, fields.get(field))
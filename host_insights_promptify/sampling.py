@@ -0,0 +1,343 @@
+import array
+import functools
+import math
+import os
+import statistics
+import threading
+import time
+import psutil
+from .processes import read_process_usage
+
+DEFAULT_SAMPLE_INTERVAL = 1.0
+DEFAULT_TOP_PROCESSES = 10
+TREND_THRESHOLD = 0.1  # Change over the window, relative to the mean, reported as rising or falling
+
+# Host metrics sampled on every tick: name, unit, and the smallest change that counts as a trend
+HOST_METRICS = (
+    ("cpu_percent", "%", 1.0),
+    ("memory_percent", "%", 1.0),
+    ("disk_read_bytes_s", "B/s", 1024.0),
+    ("disk_write_bytes_s", "B/s", 1024.0),
+    ("net_sent_bytes_s", "B/s", 1024.0),
+    ("net_recv_bytes_s", "B/s", 1024.0),
+)
+PROCESS_CPU_SIGNIFICANT = 1.0  # Percentage points
+PROCESS_RSS_SIGNIFICANT = 1024 * 1024  # Bytes
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """
+    Returns the numpy module, or None if it is not installed. It is imported on first use,
+    since it is slow to import and only trend sampling needs it.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+class RingBuffer:
+    """
+    A fixed-capacity buffer of float samples that overwrites the oldest sample when full.
+
+    Storage is allocated once: a NumPy array when NumPy is installed, otherwise an
+    array.array of doubles.
+    """
+    __slots__ = ("_data", "_capacity", "_count", "_next")
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        numpy = _numpy()
+        self._data = numpy.zeros(capacity) if numpy is not None else array.array("d", bytes(8 * capacity))
+        self._capacity = capacity
+        self._count = 0
+        self._next = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def values(self):
+        """
+        Returns the samples, oldest first.
+        """
+        numpy = _numpy()
+        if self._count < self._capacity:
+            # Copied, so the result does not change while sampling continues
+            return self._data[:self._count].copy() if numpy is not None else self._data[:self._count]
+        if numpy is not None:
+            return numpy.concatenate((self._data[self._next:], self._data[:self._next]))
+        return self._data[self._next:] + self._data[:self._next]
+
+def _percentile(ordered, fraction):
+    """
+    Returns a percentile of sorted values, interpolating linearly between the closest ranks.
+    """
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def _change(values, median):
+    """
+    Returns the change between the median of the first and of the last third of the samples,
+    which a few outliers do not move.
+    """
+    if len(values) < 2:
+        return 0.0
+    third = max(len(values) // 3, 1)
+    return float(median(values[-third:]) - median(values[:third]))
+
+def summarize(values, significant=0.0):
+    """
+    Summarizes a series of evenly spaced samples.
+
+    The change is the difference between the medians of the last and the first third of the
+    series. The trend is "rising" or "falling" if the change exceeds TREND_THRESHOLD of the
+    mean and the significant amount, otherwise "steady", so a short spike shows up in max and
+    p95 but not as a trend.
+
+    Args:
+        values: The samples, oldest first.
+        significant (float): The smallest absolute change reported as a trend.
+
+    Returns:
+        dict: "samples", "min", "mean", "p95", "max", "last", "change" (over the series) and
+        "trend", or None if there are no samples.
+    """
+    count = len(values)
+    if not count:
+        return None
+    numpy = _numpy()
+    if numpy is not None:
+        values = numpy.asarray(values, dtype=float)
+        low, mean, p95, high = values.min(), values.mean(), numpy.percentile(values, 95), values.max()
+        change = _change(values, numpy.median)
+    else:
+        ordered = sorted(values)
+        low, mean, p95, high = ordered[0], sum(ordered) / count, _percentile(ordered, 0.95), ordered[-1]
+        change = _change(values, statistics.median)
+
+    if abs(change) > max(TREND_THRESHOLD * abs(mean), significant):
+        trend = "rising" if change > 0 else "falling"
+    else:
+        trend = "steady"
+    return {
+        "samples": count,
+        "min": round(float(low), 2),
+        "mean": round(float(mean), 2),
+        "p95": round(float(p95), 2),
+        "max": round(float(high), 2),
+        "last": round(float(values[-1]), 2),
+        "change": round(change, 2),
+        "trend": trend,
+    }
+
+class _ProcessSeries:
+    """
+    The CPU and RSS samples of one process.
+    """
+    __slots__ = ("name", "cpu", "rss", "last_tick")
+
+    def __init__(self, name, capacity):
+        self.name = name
+        self.cpu = RingBuffer(capacity)
+        self.rss = RingBuffer(capacity)
+        self.last_tick = 0
+
+class MetricsSampler:
+    """
+    Samples host and per-process metrics at a fixed interval into ring buffers covering a
+    sliding window, so reports can tell sustained load from a momentary spike.
+
+    Host metrics are CPU and memory utilization, disk I/O and network I/O rates. Per-process
+    CPU usage and RSS come from one bulk read of the process table per tick (see
+    read_process_usage). Buffers are sized once for the window; a process that has not been
+    seen for a whole window is dropped. The sampler's own process is not recorded.
+
+    A sampler runs either in the foreground (run) or on a background thread (start), e.g.
+    continuously inside the daemon.
+    """
+
+    def __init__(self, window, interval=DEFAULT_SAMPLE_INTERVAL, per_process=True):
+        """
+        Args:
+            window (float): Seconds of history kept.
+            interval (float): Seconds between samples.
+            per_process (bool): Also record the CPU usage and RSS of every process.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.window = window
+        self.interval = interval
+        self.per_process = per_process
+        self.capacity = max(int(round(window / interval)), 1)
+        self.ticks = 0
+        self._host = {name: RingBuffer(self.capacity) for name, _, _ in HOST_METRICS}
+        self._processes = {}
+        self._previous = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _read_counters(self):
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        return {
+            "time": time.monotonic(),
+            "disk": (disk.read_bytes, disk.write_bytes) if disk else None,
+            "net": (net.bytes_sent, net.bytes_recv) if net else None,
+            "processes": read_process_usage() if self.per_process else None,
+        }
+
+    def sample(self):
+        """
+        Takes one sample. Rates and CPU usage are computed against the previous call, so the
+        first call only establishes the starting counters.
+
+        Returns:
+            bool: True if a sample was recorded.
+        """
+        cpu_percent = psutil.cpu_percent(interval=None)
+        current = self._read_counters()
+        previous, self._previous = self._previous, current
+        if previous is None:
+            return False
+        elapsed = current["time"] - previous["time"]
+        if elapsed <= 0:
+            return False
+
+        def rate(kind, index):
+            if current[kind] is None or previous[kind] is None:
+                return 0.0
+            return max(current[kind][index] - previous[kind][index], 0) / elapsed
+
+        with self._lock:
+            self.ticks += 1
+            self._host["cpu_percent"].append(cpu_percent)
+            self._host["memory_percent"].append(psutil.virtual_memory().percent)
+            self._host["disk_read_bytes_s"].append(rate("disk", 0))
+            self._host["disk_write_bytes_s"].append(rate("disk", 1))
+            self._host["net_sent_bytes_s"].append(rate("net", 0))
+            self._host["net_recv_bytes_s"].append(rate("net", 1))
+            if self.per_process:
+                self._record_processes(previous["processes"], current["processes"], elapsed)
+        return True
+
+    def _record_processes(self, previous, current, elapsed):
+        (before, _), (after, ticks_per_second) = previous, current
+        scale = 100.0 / (elapsed * ticks_per_second)
+        own_pid = os.getpid()
+        for pid, (name, cpu_ticks, rss) in after.items():
+            if pid == own_pid or pid not in before:
+                continue
+            series = self._processes.get(pid)
+            if series is None or series.name != name:
+                series = self._processes[pid] = _ProcessSeries(name, self.capacity)
+            series.cpu.append(max(cpu_ticks - before[pid][1], 0) * scale)
+            series.rss.append(rss)
+            series.last_tick = self.ticks
+        expired = [pid for pid, series in self._processes.items() if self.ticks - series.last_tick >= self.capacity]
+        for pid in expired:
+            del self._processes[pid]
+
+    def run(self, duration=None):
+        """
+        Samples on a fixed schedule until duration seconds have passed (by default, one
+        window) or stop() is called. Ticks that fall behind schedule are skipped rather
+        than bunched together.
+        """
+        duration = self.window if duration is None else duration
+        self.sample()
+        started = time.monotonic()
+        tick = 0
+        while not self._stop.is_set():
+            tick += 1
+            due = started + tick * self.interval
+            if due - started > duration + 1e-9:
+                return
+            if self._stop.wait(max(due - time.monotonic(), 0)):
+                return
+            self.sample()
+            if time.monotonic() > due + self.interval:
+                tick = int((time.monotonic() - started) // self.interval)
+
+    def start(self, duration=math.inf):
+        """
+        Starts sampling on a background thread, by default until stop() is called.
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, args=(duration,), name="hip-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        """
+        Waits for a sampling run started with start() to finish.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def summary(self, top=DEFAULT_TOP_PROCESSES):
+        """
+        Summarizes the samples in the window.
+
+        Args:
+            top (int): How many processes to report: the top entries by mean CPU usage
+                (among processes that used any CPU) together with the top entries by peak RSS.
+
+        Returns:
+            dict: "interval", "window" and "samples"; "host", mapping each metric of
+            HOST_METRICS to its summary (see summarize) and unit; and "processes", a list of
+            {"pid", "name", "cpu_percent", "rss_bytes"} summaries ordered by mean CPU usage.
+        """
+        with self._lock:
+            host = {}
+            for name, unit, significant in HOST_METRICS:
+                stats = summarize(self._host[name].values(), significant)
+                if stats is not None:
+                    host[name] = dict(stats, unit=unit)
+            series = [(pid, entry.name, entry.cpu.values(), entry.rss.values())
+                      for pid, entry in self._processes.items() if len(entry.cpu)]
+            samples = len(self._host["cpu_percent"])
+
+        processes = [
+            {"pid": pid, "name": name, "cpu_percent": summarize(cpu, PROCESS_CPU_SIGNIFICANT),
+             "rss_bytes": summarize(rss, PROCESS_RSS_SIGNIFICANT)}
+            for pid, name, cpu, rss in series
+        ]
+        busy = [p for p in processes if p["cpu_percent"]["max"] > 0]
+        by_cpu = sorted(busy, key=lambda p: p["cpu_percent"]["mean"], reverse=True)[:top]
+        by_rss = sorted(processes, key=lambda p: p["rss_bytes"]["max"], reverse=True)[:top]
+        selected = {p["pid"]: p for p in by_cpu + by_rss}
+        return {
+            "interval": self.interval,
+            "window": self.window,
+            "samples": samples,
+            "host": host,
+            "processes": sorted(selected.values(), key=lambda p: p["cpu_percent"]["mean"], reverse=True),
+        }
+
+def collect_trends(window, interval=DEFAULT_SAMPLE_INTERVAL, top=DEFAULT_TOP_PROCESSES, per_process=True):
+    """
+    Samples host and per-process metrics over a window and summarizes them.
+
+    Args:
+        window (float): Seconds to sample for.
+        interval (float): Seconds between samples.
+        top (int): How many processes to report (see MetricsSampler.summary).
+        per_process (bool): Also sample per-process CPU usage and RSS.
+
+    Returns:
+        dict: The summary, as returned by MetricsSampler.summary.
+    """
+    sampler = MetricsSampler(window, interval=interval, per_process=per_process)
+    sampler.run()
+    return sampler.summary(top=top)
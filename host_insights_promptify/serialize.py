@@ -0,0 +1,220 @@
+import collections.abc
+import itertools
+import json
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .records import to_builtin
+
+SCHEMA_VERSION = 1
+FORMATS = ("json", "ndjson", "msgpack", "compact")
+SECTIONS = ("system", "network", "docker", "services", "units", "trends", "timings")
+BATCH_SIZE = 1000  # List items encoded per encoder call when streaming
+
+# Record types of the list-valued fields, for the record-oriented formats (ndjson, msgpack)
+RECORD_TYPES = {
+    ("system", "Disk Partitions"): "partition",
+    ("network", "interfaces"): "interface",
+    ("network", "routing_table"): "route",
+    ("network", "active_connections"): "connection",
+    ("docker", "containers"): "container",
+    ("docker", "networks"): "docker_network",
+    ("docker", "volumes"): "volume",
+    ("units", "units"): "unit",
+    ("trends", "processes"): "process_trend",
+}
+
+def _json_encoder():
+    """
+    Returns a function encoding a value as compact JSON bytes, using orjson when it is installed.
+    Records are encoded as objects; other values JSON cannot represent are encoded as their str().
+    """
+    if orjson is not None:
+        return lambda value: orjson.dumps(value, default=to_builtin, option=orjson.OPT_NON_STR_KEYS)
+    encoder = json.JSONEncoder(separators=(",", ":"), default=to_builtin)
+    return lambda value: encoder.encode(value).encode("utf-8")
+
+def _msgpack_encoder():
+    """
+    Returns a function encoding a value as MessagePack bytes.
+
+    Raises:
+        RuntimeError: If the msgpack package is not installed.
+    """
+    try:
+        import msgpack
+    except ImportError:
+        raise RuntimeError("msgpack output requires the 'msgpack' package (pip install msgpack)")
+    packer = msgpack.Packer(default=to_builtin)
+    return packer.pack
+
+def _batches(items, size=BATCH_SIZE):
+    """
+    Splits an iterable into lists of at most size items, without materializing it.
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _columns(items):
+    """
+    Returns the field names of a list of records, in first-seen order.
+    """
+    columns = {}
+    for item in items:
+        if isinstance(item, collections.abc.Mapping):
+            columns.update(dict.fromkeys(item))
+    return list(columns)
+
+def _to_columnar(value):
+    """
+    Converts the lists of records inside a section into {"columns": [...], "rows": [[...], ...]}.
+    """
+    if isinstance(value, list) and value and all(isinstance(item, collections.abc.Mapping) for item in value):
+        columns = _columns(value)
+        return {"columns": columns, "rows": [[item.get(column) for column in columns] for item in value]}
+    if isinstance(value, dict):
+        return {key: _to_columnar(item) for key, item in value.items()}
+    return value
+
+def _iter_json_list(items, encode, columnar):
+    """
+    Streams a list of records as a JSON array (or, in columnar form, as columns and rows),
+    encoding BATCH_SIZE items per encoder call.
+    """
+    batches = _batches(items)
+    if columnar:
+        first = next(batches, [])
+        columns = _columns(first)
+        batches = itertools.chain([first] if first else [], batches)
+        yield b'{"columns":' + encode(columns) + b',"rows":['
+    else:
+        yield b"["
+
+    separator = b""
+    for batch in batches:
+        if columnar:
+            # Records with fields not seen in the first batch lose them; collectors emit uniform records
+            batch = [[item.get(column) for column in columns] if isinstance(item, collections.abc.Mapping) else item for item in batch]
+        yield separator + encode(batch)[1:-1]
+        separator = b","
+    yield b"]}" if columnar else b"]"
+
+def _iter_json(insights, encode, columnar=False):
+    """
+    Streams insights as a single JSON document. Active connections and services are written
+    item by item, so lazily collected lists are never held in memory at once.
+    """
+    yield b'{"schema":' + encode(SCHEMA_VERSION) + b',"generated_at":' + encode(round(time.time(), 3))
+    for section in SECTIONS:
+        if section not in insights:
+            continue
+        value = insights[section]
+        yield b',"' + section.encode("utf-8") + b'":'
+        if section == "services":
+            yield from _iter_json_list(value, encode, columnar)
+        elif section == "network" and isinstance(value, dict) and "active_connections" in value:
+            rest = {key: item for key, item in value.items() if key != "active_connections"}
+            head = encode(_to_columnar(rest) if columnar else rest)[:-1]
+            yield head + (b"," if rest else b"") + b'"active_connections":'
+            yield from _iter_json_list(value["active_connections"], encode, columnar)
+            yield b"}"
+        else:
+            yield encode(_to_columnar(value) if columnar and section != "timings" else value)
+    yield b"}\n"
+
+def iter_records(insights):
+    """
+    Flattens insights into typed records, one per entity: a "meta" record first, then a
+    record per section with its scalar fields, and one record per list entry (partition,
+    interface, route, connection, container, docker_network, volume, service, process_trend,
+    timing).
+
+    Every record carries a "record" key naming its type. Routes that are raw routing tool
+    lines (on platforms without a structured reader) are given as {"line": ...}.
+
+    Yields:
+        dict: The records, in a stable order.
+    """
+    sections = [section for section in SECTIONS if section in insights]
+    yield {"record": "meta", "schema": SCHEMA_VERSION, "generated_at": round(time.time(), 3), "sections": sections}
+
+    for section in sections:
+        value = insights[section]
+        if section == "services":
+            for service in value:
+                yield {"record": "service", **service}
+        elif section == "timings":
+            for name, measurement in value.items():
+                yield {"record": "timing", "step": name, **measurement}
+        elif isinstance(value, dict):
+            lists = {key: item for key, item in value.items() if (section, key) in RECORD_TYPES}
+            yield {"record": section, **{key: item for key, item in value.items() if key not in lists}}
+            for key, items in lists.items():
+                record_type = RECORD_TYPES[(section, key)]
+                for item in items:
+                    item = item if isinstance(item, collections.abc.Mapping) else {"line": item}
+                    yield {"record": record_type, **item}
+
+def iter_serialized(insights, output_format="json"):
+    """
+    Serializes insights in one of FORMATS, as a stream of byte chunks.
+
+    All formats share one schema: the sections of collect_all_insights ("system",
+    "network", "docker", "services", "units" and, if sampled or measured, "trends" and "timings"), with the same field names
+    and raw values. "json" is a single document; "compact" is the same document with every
+    list of records stored as columns and rows, which is much smaller for large lists;
+    "ndjson" and "msgpack" are streams of typed records (see iter_records).
+
+    Args:
+        insights (dict): Collector results keyed by section name. Only the sections present
+            are serialized, so a single collector's output can be passed as {"network": ...}.
+        output_format (str): One of FORMATS.
+
+    Yields:
+        bytes: Chunks of the serialized output.
+
+    Raises:
+        ValueError: If the format is unknown.
+        RuntimeError: If the format needs a package that is not installed.
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown format '{output_format}', expected one of {', '.join(FORMATS)}")
+
+    if output_format == "msgpack":
+        encode = _msgpack_encoder()
+        for batch in _batches(iter_records(insights)):
+            yield b"".join(encode(record) for record in batch)
+        return
+
+    encode = _json_encoder()
+    if output_format == "ndjson":
+        for batch in _batches(iter_records(insights)):
+            yield b"".join(encode(record) + b"\n" for record in batch)
+    else:
+        yield from _iter_json(insights, encode, columnar=output_format == "compact")
+
+def write_insights(stream, insights, output_format="json"):
+    """
+    Writes serialized insights to a binary stream as they are encoded.
+
+    Args:
+        stream (io.BufferedIOBase): A writable binary stream, such as sys.stdout.buffer.
+        insights (dict): Collector results keyed by section name.
+        output_format (str): One of FORMATS.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    written = 0
+    for chunk in iter_serialized(insights, output_format):
+        stream.write(chunk)
+        written += len(chunk)
+    return written
@@ -1,32 +1,47 @@
-import psutil
-from datetime import datetime
+from .processes import DEFAULT_CPU_INTERVAL, take_process_snapshot
+from .records import ServiceRecord
 
-def collect_services_info():
+def iter_services_info(snapshot=None, cpu_interval=DEFAULT_CPU_INTERVAL):
     """
-    Collects information about running services on the system.
+    Lazily yields information about running services on the system, one service at a time.
 
-    Returns:
-        list: A list of dictionaries, each containing details about a running service.
-    """
-    services_info = []
+    Args:
+        snapshot (ProcessSnapshot): A process table snapshot shared with other collectors.
+            If None, a new snapshot is taken.
+        cpu_interval (float): CPU sampling window in seconds used when a new snapshot is taken.
+            None or 0 skips CPU sampling.
 
+    Yields:
+        ServiceRecord: Details about a running service; start_time is the raw creation time.
+    """
     try:
-        for process in psutil.process_iter(['pid', 'name', 'status', 'create_time', 'memory_info', 'cpu_percent']):
-            try:
-                service_info = {
-                    'name': process.info['name'],
-                    'status': process.info['status'],
-                    'start_time': datetime.fromtimestamp(process.info['create_time']).strftime("%Y-%m-%d %H:%M:%S"),
-                    'memory_usage': process.info['memory_info'].rss if process.info['memory_info'] else 'N/A',  # Resident Set Size
-                    'cpu_usage': process.info['cpu_percent'] if process.info['cpu_percent'] else 'N/A'
-                }
-                services_info.append(service_info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
-                # Log or handle the error, but don't append it to the services info
-                print(f"Error processing service: {e}")
-
+        if snapshot is None:
+            snapshot = take_process_snapshot(cpu_interval=cpu_interval)
     except Exception as e:
-        # General error handling if psutil.process_iter fails
+        # General error handling if the process table could not be read
         print(f"Error collecting service information: {str(e)}")
+        return
+
+    for process in snapshot:
+        if process.create_time is None:
+            # Attributes that could not be read are None; skip such processes
+            continue
+        yield ServiceRecord(process)
 
-    return services_info
\ No newline at end of file
+def collect_services_info(snapshot=None, cpu_interval=DEFAULT_CPU_INTERVAL, lazy=False):
+    """
+    Collects information about running services on the system.
+
+    Args:
+        snapshot (ProcessSnapshot): A process table snapshot shared with other collectors.
+            If None, a new snapshot is taken.
+        cpu_interval (float): CPU sampling window in seconds used when a new snapshot is taken.
+            None or 0 skips CPU sampling.
+        lazy (bool): Return a generator that builds each entry on demand, for streaming
+            renderers, instead of a list.
+
+    Returns:
+        list: A list of ServiceRecord mappings, each containing details about a running service.
+    """
+    services_info = iter_services_info(snapshot=snapshot, cpu_interval=cpu_interval)
+    return services_info if lazy else list(services_info)
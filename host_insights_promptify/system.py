@@ -1,22 +1,40 @@
 import platform
 import psutil
+from .cache import cached
+from .instrumentation import step
+from .partitions import DEFAULT_MOUNT_TIMEOUT, scan_partitions
 
-def collect_system_info():
+def _collect_platform_info():
+    """
+    Collects the static platform details, which change at most on reboot or upgrade.
+    """
+    return {
+        "OS": platform.system(),
+        "OS Version": platform.version(),
+        "Architecture": platform.architecture()[0],
+        "Hostname": platform.node(),
+        "CPU": platform.processor(),
+        "Physical Cores": psutil.cpu_count(logical=False),
+        "Logical Cores": psutil.cpu_count(logical=True),
+    }
+
+def collect_system_info(cache=None, instrumentation=None, mount_timeout=DEFAULT_MOUNT_TIMEOUT):
     """
     Collects information about the system's hardware and operating system.
 
+    Args:
+        cache (TTLCache): Optional cache for the static platform details.
+        instrumentation (Instrumentation): Optional recorder for the time and work of each sub-step.
+        mount_timeout (float): Seconds each partition's usage query may take before the mount
+            is reported as unresponsive.
+
     Returns:
         dict: A dictionary containing system-related information such as OS, CPU, memory, and disk usage.
     """
     try:
-        system_info = {
-            "OS": platform.system(),
-            "OS Version": platform.version(),
-            "Architecture": platform.architecture()[0],
-            "Hostname": platform.node(),
-            "CPU": platform.processor(),
-            "Physical Cores": psutil.cpu_count(logical=False),
-            "Logical Cores": psutil.cpu_count(logical=True),
+        with step(instrumentation, "system.platform"):
+            system_info = dict(cached(cache, "system.platform", _collect_platform_info))
+        system_info.update({
             "CPU Frequency": "N/A",  # Default to "N/A" if the frequency can't be retrieved
             "Total Memory": "N/A",  # Default to "N/A" if memory info can't be retrieved
             "Available Memory": "N/A",  # Default to "N/A" if memory info can't be retrieved
@@ -24,7 +42,7 @@ def collect_system_info():
             "Disk Available": "N/A",  # Default to "N/A" if disk info can't be retrieved
             "Disk Usage": "N/A",  # Default to "N/A" if disk usage can't be retrieved
             "Disk Partitions": []  # Initialize as empty list
-        }
+        })
 
         # Attempt to get the CPU frequency, but handle the case where it fails
         try:
@@ -43,39 +61,28 @@ def collect_system_info():
             system_info["Total Memory"] = "N/A"
             system_info["Available Memory"] = "N/A"
 
-        # Attempt to get disk information
-        try:
-            disk_usage = psutil.disk_usage('/')
-            system_info["Disk"] = f"{disk_usage.total / (1024 ** 3):.2f} GB"
-            system_info["Disk Available"] = f"{disk_usage.free / (1024 ** 3):.2f} GB"
-            system_info["Disk Usage"] = f"{disk_usage.percent}%"
-        except Exception as e:
-            system_info["Disk"] = "N/A"
-            system_info["Disk Available"] = "N/A"
-            system_info["Disk Usage"] = "N/A"
+        # Collect disk partition information; stale mounts are reported instead of blocking
+        with step(instrumentation, "system.partitions") as record:
+            partitions_info = scan_partitions(timeout=mount_timeout, record=record)
+            record.items = len(partitions_info)
 
-        # Collect disk partition information
-        partitions_info = []
-        partitions = psutil.disk_partitions()
-        for partition in partitions:
+        # Attempt to get disk information for the root filesystem, from the scan when possible
+        root = next((p for p in partitions_info if p["Mountpoint"] == "/"), None)
+        if root is not None:
+            system_info["Disk"] = root["Total Size"]
+            system_info["Disk Available"] = root["Free"]
+            system_info["Disk Usage"] = root["Usage"]
+        else:
             try:
-                partition_usage = psutil.disk_usage(partition.mountpoint)
-                partitions_info.append({
-                    "Device": partition.device,
-                    "Mountpoint": partition.mountpoint,
-                    "File System": partition.fstype,
-                    "Total Size": f"{partition_usage.total / (1024 ** 3):.2f} GB",
-                    "Used": f"{partition_usage.used / (1024 ** 3):.2f} GB",
-                    "Free": f"{partition_usage.free / (1024 ** 3):.2f} GB",
-                    "Usage": f"{partition_usage.percent}%"
-                })
-            except PermissionError:
-                # Skip partitions where permission is denied
-                continue
+                disk_usage = psutil.disk_usage('/')
+                system_info["Disk"] = f"{disk_usage.total / (1024 ** 3):.2f} GB"
+                system_info["Disk Available"] = f"{disk_usage.free / (1024 ** 3):.2f} GB"
+                system_info["Disk Usage"] = f"{disk_usage.percent}%"
             except Exception as e:
-                # Handle other potential exceptions with disk partitions
-                continue
-        
+                system_info["Disk"] = "N/A"
+                system_info["Disk Available"] = "N/A"
+                system_info["Disk Usage"] = "N/A"
+
         system_info["Disk Partitions"] = partitions_info
 
     except Exception as e:
@@ -0,0 +1,148 @@
+import os
+from .cgroups import PROC_ROOT, read_process_cgroups
+from .instrumentation import step
+from .network import _run_command
+from .processes import DEFAULT_CPU_INTERVAL, take_process_snapshot
+
+SYSTEMD_RUNTIME_DIR = "/run/systemd/system"  # Exists only while systemd is the init system
+DEFAULT_UNIT_PATTERN = "*.service"
+
+# Unit properties fetched for every unit, in one "systemctl show" call
+UNIT_PROPERTIES = ("Id", "Description", "LoadState", "ActiveState", "SubState", "Result", "MainPID", "NRestarts",
+                   "ActiveEnterTimestamp", "ControlGroup", "MemoryCurrent", "CPUUsageNSec", "TasksCurrent")
+
+# systemd reports counters that are not tracked (accounting disabled) as UINT64_MAX
+_NOT_SET = ("", "[not set]", str(2 ** 64 - 1))
+
+def systemd_available(runtime_dir=SYSTEMD_RUNTIME_DIR):
+    """
+    Returns True if the host was booted with systemd (the check sd_booted() performs).
+    """
+    return os.path.isdir(runtime_dir)
+
+def parse_show_output(output):
+    """
+    Parses the output of "systemctl show" for several units: blocks of "Key=Value" lines,
+    one block per unit, separated by blank lines.
+
+    Returns:
+        list: One dictionary of raw property values per unit.
+    """
+    units, properties = [], {}
+    for line in output.splitlines():
+        if not line.strip():
+            if properties:
+                units.append(properties)
+                properties = {}
+            continue
+        key, separator, value = line.partition("=")
+        if separator:
+            properties[key] = value
+    if properties:
+        units.append(properties)
+    return units
+
+def _counter(value):
+    """
+    Converts a numeric property to an int, or None if it is not set.
+    """
+    if value is None or value in _NOT_SET:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def _unit_info(properties):
+    main_pid = _counter(properties.get("MainPID"))
+    return {
+        "name": properties.get("Id", "N/A"),
+        "description": properties.get("Description", ""),
+        "load_state": properties.get("LoadState", "N/A"),
+        "active_state": properties.get("ActiveState", "N/A"),
+        "sub_state": properties.get("SubState", "N/A"),
+        "result": properties.get("Result", "N/A"),
+        "main_pid": main_pid or None,
+        "restarts": _counter(properties.get("NRestarts")),
+        "active_since": properties.get("ActiveEnterTimestamp") or None,
+        "control_group": properties.get("ControlGroup") or None,
+        "memory_usage": _counter(properties.get("MemoryCurrent")),
+        "cpu_usage": _counter(properties.get("CPUUsageNSec")),
+        "tasks": _counter(properties.get("TasksCurrent")),
+        "processes": [],
+        "process_rss": 0,
+        "process_cpu_percent": 0.0,
+    }
+
+def _join_processes(units, snapshot, proc_root=PROC_ROOT):
+    """
+    Attaches every process in the snapshot to the unit whose cgroup contains it.
+
+    A process belongs to the unit with the deepest control group that is a prefix of the
+    process's cgroup path, so processes in sub-cgroups (e.g. a container started by a
+    service) are counted towards that service.
+    """
+    by_cgroup = {unit["control_group"]: unit for unit in units if unit["control_group"]}
+    if not by_cgroup:
+        return
+    for pid, path in read_process_cgroups((entry.pid for entry in snapshot), proc_root=proc_root).items():
+        while path and path != "/":
+            unit = by_cgroup.get(path)
+            if unit is not None:
+                entry = snapshot.get(pid)
+                unit["processes"].append(pid)
+                unit["process_rss"] += entry.rss or 0
+                unit["process_cpu_percent"] += entry.cpu_percent or 0.0
+                break
+            path = path.rpartition("/")[0]
+
+def collect_units_info(snapshot=None, cpu_interval=DEFAULT_CPU_INTERVAL, pattern=DEFAULT_UNIT_PATTERN, runner=None,
+                       proc_root=PROC_ROOT, instrumentation=None):
+    """
+    Collects the state, restart count and resource usage of the systemd units on the host.
+
+    Every matching unit and its properties are fetched with a single "systemctl show" call,
+    rather than one query per unit. Units are then joined to the processes of the shared
+    process snapshot through their cgroup paths, so each unit lists its processes and their
+    combined RSS and CPU usage, even when systemd's own accounting is disabled.
+
+    Args:
+        snapshot (ProcessSnapshot): A process table snapshot shared with other collectors.
+            If None, a new snapshot is taken.
+        cpu_interval (float): CPU sampling window in seconds used when a new snapshot is taken.
+        pattern (str): Unit name pattern passed to systemctl, e.g. "*.service".
+        runner (callable): Runs a command given as an argument list and returns its standard
+            output. Defaults to running it locally, if the host was booted with systemd.
+        proc_root (str): Mountpoint of procfs, where process cgroups are read.
+        instrumentation (Instrumentation): Optional recorder for the time and subprocesses of each sub-step.
+
+    Returns:
+        dict: A dictionary with the "units" list, ordered by name. Memory and CPU usage are
+        systemd's raw counters (bytes and nanoseconds), or None if accounting is disabled.
+    """
+    units_info = {"units": []}
+    if runner is None:
+        if not systemd_available():
+            units_info["error"] = "systemd is not running on this host"
+            return units_info
+        runner = _run_command
+
+    try:
+        with step(instrumentation, "units.systemctl") as record:
+            record.count("subprocesses")
+            output = runner(["systemctl", "show", "--no-pager", f"--property={','.join(UNIT_PROPERTIES)}",
+                             "--", pattern])
+            units = sorted((_unit_info(properties) for properties in parse_show_output(output)),
+                           key=lambda unit: unit["name"])
+            record.items = len(units)
+        units_info["units"] = units
+
+        with step(instrumentation, "units.processes") as record:
+            if snapshot is None:
+                snapshot = take_process_snapshot(cpu_interval=cpu_interval)
+            _join_processes(units, snapshot, proc_root=proc_root)
+            record.items = sum(len(unit["processes"]) for unit in units)
+    except Exception as e:
+        units_info["error"] = f"Error collecting systemd units: {str(e)}"
+
+    return units_info
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from host_insights_promptify.baseline import delta_is_empty, diff_insights, load_baseline, save_baseline
+from host_insights_promptify.promptify import format_delta_prompt
+
+def make_insights(processes, connections, memory="8.00 GB", firewall="ACCEPT all"):
+    return {
+        "system": {"OS": "Linux", "Available Memory": memory},
+        "network": {
+            "interfaces": [{"name": "eth0", "status": "up"}],
+            "routing_table": [],
+            "active_connections": iter(connections),
+            "dns": {"primary": "1.1.1.1"},
+            "firewall_rules": firewall,
+        },
+        "docker": {"containers": [], "networks": [], "volumes": []},
+        "services": iter(processes),
+    }
+
+def process(pid, name, rss=1000, cpu=0.0):
+    return {"pid": pid, "name": name, "start_time": "2026-01-01 00:00:00", "memory_usage": rss, "cpu_usage": cpu}
+
+def connection(port):
+    return {"protocol": "TCP", "local_address": f"10.0.0.1:{port}", "remote_address": None,
+            "status": "LISTEN", "process": "app"}
+
+class TestBaseline(unittest.TestCase):
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json.gz")
+            self.assertIsNone(load_baseline(path))
+
+            save_baseline(make_insights([process(1, "init")], [connection(22)]), path)
+            baseline = load_baseline(path)
+
+            self.assertEqual(baseline["insights"]["services"][0]["name"], "init")
+            self.assertEqual(baseline["insights"]["network"]["active_connections"][0]["local_address"], "10.0.0.1:22")
+            self.assertIn("taken_at", baseline)
+
+    def test_identical_state_has_empty_delta(self):
+        delta = diff_insights(make_insights([process(1, "init")], [connection(22)]),
+                              make_insights([process(1, "init", rss=1100)], [connection(22)], memory="7.90 GB"))
+        self.assertTrue(delta_is_empty(delta))
+        self.assertIn("No significant changes", format_delta_prompt(delta))
+
+    def test_changes_are_reported(self):
+        baseline = make_insights([process(1, "init"), process(2, "old")], [connection(22)])
+        current = make_insights([process(1, "init", rss=5000, cpu=50.0), process(3, "new")],
+                                [connection(22), connection(8080)], memory="2.00 GB", firewall="DROP all")
+
+        delta = diff_insights(baseline, current)
+
+        self.assertFalse(delta_is_empty(delta))
+        self.assertEqual([p["name"] for p in delta["processes"]["added"]], ["new"])
+        self.assertEqual([p["name"] for p in delta["processes"]["removed"]], ["old"])
+        self.assertEqual(set(delta["processes"]["changed"][0]["changes"]), {"memory_usage", "cpu_usage"})
+        self.assertEqual(delta["connections"]["added"][0]["local_address"], "10.0.0.1:8080")
+        self.assertEqual(delta["system"], {"Available Memory": ("8.00 GB", "2.00 GB")})
+        self.assertTrue(delta["firewall_changed"])
+
+        prompt = format_delta_prompt(delta)
+        self.assertIn("- Added: new (PID: 3)", prompt)
+        self.assertIn("- Removed: old (PID: 2)", prompt)
+        self.assertIn("- Available Memory: 8.00 GB -> 2.00 GB", prompt)
+        self.assertIn("#### Firewall Rules ####", prompt)
+
+    def test_identity_and_config_changes_are_reported_exactly(self):
+        baseline = make_insights([], [])
+        current = make_insights([], [])
+        baseline["system"]["OS Version"], current["system"]["OS Version"] = "6.1.0-18-amd64", "6.1.0-21-amd64"
+        baseline["network"]["interfaces"] = [{"name": "eth0", "status": "up", "ipv4": "10.0.0.5", "mtu": 1500}]
+        current["network"]["interfaces"] = [{"name": "eth0", "status": "up", "ipv4": "10.0.7.9", "mtu": 1450}]
+
+        delta = diff_insights(baseline, current)
+
+        self.assertEqual(delta["system"], {"OS Version": ("6.1.0-18-amd64", "6.1.0-21-amd64")})
+        self.assertEqual(delta["interfaces"]["changed"], [
+            {"key": "eth0", "changes": {"ipv4": ("10.0.0.5", "10.0.7.9"), "mtu": (1500, 1450)}}])
+
+    def test_unit_state_and_restart_changes_are_reported(self):
+        def unit(name, state="active", sub_state="running", result="success", restarts=10):
+            return {"name": name, "active_state": state, "sub_state": sub_state, "result": result, "restarts": restarts}
+        baseline = dict(make_insights([], []), units={"units": [unit("db.service"), unit("web.service")]})
+        current = dict(make_insights([], []), units={"units": [unit("db.service", "failed", "failed", "exit-code"),
+                                                               unit("web.service", restarts=11)]})
+
+        delta = diff_insights(baseline, current)
+
+        changes = {item["key"]: item["changes"] for item in delta["units"]["changed"]}
+        self.assertEqual(changes, {
+            "db.service": {"active_state": ("active", "failed"), "sub_state": ("running", "failed"),
+                           "result": ("success", "exit-code")},
+            "web.service": {"restarts": (10, 11)},
+        })
+        prompt = format_delta_prompt(delta)
+        self.assertIn("#### Systemd Units ####", prompt)
+        self.assertIn("- Changed: web.service: restarts: 10 -> 11", prompt)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import sys
+import unittest
+from benchmarks.run import compare_results, run_benchmark
+from benchmarks.startup import CLI, HEAVY_MODULES, loaded_modules
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_small_synthetic_host(self):
+        report = run_benchmark(scale=0.01, cpu_interval=0)
+
+        self.assertEqual(report["sizes"]["connections"], 1000)
+        results = {row["stage"]: row for row in report["results"]}
+        self.assertEqual(results["process_snapshot"]["items"], 50)
+        self.assertEqual(results["network"]["items"], 1000)
+        self.assertEqual(results["procnet_parse"]["items"], 1000)
+        self.assertEqual(results["docker"]["items"], 5)
+        self.assertEqual(results["format_prompt"]["prompt_chars"] + 1, results["write_prompt"]["prompt_chars"])
+        self.assertLess(results["compact_8000"]["prompt_tokens"], 8000)
+
+    def test_regressions_are_reported(self):
+        previous = {"results": [{"stage": "network", "wall_s": 1.0}, {"stage": "docker", "wall_s": 1.0}]}
+        report = {"results": [{"stage": "network", "wall_s": 1.5}, {"stage": "docker", "wall_s": 1.1}]}
+
+        self.assertEqual(compare_results(report, previous, tolerance=0.25), ["network: 1.0000s -> 1.5000s"])
+
+    def test_startup_skips_docker_sdk(self):
+        for command in ([sys.executable, "-c", "import host_insights_promptify"], CLI + ["--help"]):
+            modules = loaded_modules(command)
+            self.assertIn("host_insights_promptify", modules)
+            self.assertFalse(modules & set(HEAVY_MODULES), command)
+
+if __name__ == "__main__":
+    unittest.main()
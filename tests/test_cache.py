@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from host_insights_promptify.cache import FileBackend, TTLCache, cached
+from host_insights_promptify.system import collect_system_info
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = TTLCache()
+        compute = mock.Mock(return_value=["default via 10.0.0.1"])
+
+        self.assertEqual(cache.get_or_compute("network.routing_table", compute), ["default via 10.0.0.1"])
+        self.assertEqual(cache.get_or_compute("network.routing_table", compute), ["default via 10.0.0.1"])
+
+        compute.assert_called_once()
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["fields"]["network.routing_table"], {"hits": 1, "misses": 1})
+
+    def test_expired_entries_are_recomputed(self):
+        cache = TTLCache(ttls={"network.dns": 10})
+        compute = mock.Mock(side_effect=[{"primary": "1.1.1.1"}, {"primary": "8.8.8.8"}])
+
+        with mock.patch("time.time", return_value=1000.0):
+            cache.get_or_compute("network.dns", compute)
+        with mock.patch("time.time", return_value=1005.0):
+            self.assertEqual(cache.get_or_compute("network.dns", compute), {"primary": "1.1.1.1"})
+        with mock.patch("time.time", return_value=1011.0):
+            self.assertEqual(cache.get_or_compute("network.dns", compute), {"primary": "8.8.8.8"})
+
+    def test_invalidate_by_prefix(self):
+        cache = TTLCache()
+        for key in ("docker.networks", "docker.volumes", "network.dns"):
+            cache.get_or_compute(key, lambda: [])
+
+        cache.invalidate("docker")
+
+        self.assertEqual(cache.backend.keys(), ["network.dns"])
+        cache.invalidate()
+        self.assertEqual(cache.backend.keys(), [])
+
+    def test_file_backend_persists_between_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache.json")
+            TTLCache(FileBackend(path)).get_or_compute("network.firewall_rules", lambda: "ACCEPT all")
+
+            cache = TTLCache(FileBackend(path))
+            self.assertEqual(cache.get_or_compute("network.firewall_rules", mock.Mock()), "ACCEPT all")
+            self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_cached_without_cache(self):
+        self.assertEqual(cached(None, "system.platform", lambda: 42), 42)
+
+    def test_system_platform_details_are_cached(self):
+        cache = TTLCache()
+        collect_system_info(cache=cache)
+        with mock.patch("platform.system") as system:
+            system_info = collect_system_info(cache=cache)
+
+        system.assert_not_called()
+        self.assertIn("OS", system_info)
+        self.assertEqual(cache.stats()["fields"]["system.platform"], {"hits": 1, "misses": 1})
+
+if __name__ == "__main__":
+    unittest.main()
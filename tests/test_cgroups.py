@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from host_insights_promptify.cgroups import CgroupReader, cgroup_version, container_cpu_percent
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+class TestCgroupReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_unified_hierarchy(self):
+        write(os.path.join(self.root, "cgroup.controllers"), "cpu io memory\n")
+        container = os.path.join(self.root, "system.slice", "docker-abc.scope")
+        write(os.path.join(container, "cpu.stat"), "usage_usec 1500\nuser_usec 1000\nsystem_usec 500\n")
+        write(os.path.join(container, "memory.current"), "4096\n")
+        write(os.path.join(container, "io.stat"), "8:0 rbytes=100 wbytes=20 rios=1 wios=1\n8:16 rbytes=5 wbytes=0\n")
+
+        reader = CgroupReader(self.root)
+        usage = reader.read(["abc", "missing"])
+
+        self.assertEqual(reader.version, 2)
+        self.assertEqual(list(usage), ["abc"])
+        self.assertEqual(usage["abc"]["cpu_usage"], 1500000)
+        self.assertEqual(usage["abc"]["memory_usage"], 4096)
+        self.assertEqual(usage["abc"]["block_io"], {"read_bytes": 105, "write_bytes": 20})
+
+    def test_per_controller_hierarchies(self):
+        for controller in ("cpu,cpuacct", "memory", "blkio"):
+            os.makedirs(os.path.join(self.root, controller, "docker", "abc"))
+        write(os.path.join(self.root, "cpu,cpuacct", "docker", "abc", "cpuacct.usage"), "2000000\n")
+        write(os.path.join(self.root, "memory", "docker", "abc", "memory.usage_in_bytes"), "8192\n")
+        write(os.path.join(self.root, "blkio", "docker", "abc", "blkio.throttle.io_service_bytes"),
+              "8:0 Read 300\n8:0 Write 40\n8:0 Total 340\nTotal 340\n")
+
+        usage = CgroupReader(self.root).read(["abc"])["abc"]
+
+        self.assertEqual(cgroup_version(self.root), 1)
+        self.assertEqual((usage["cpu_usage"], usage["memory_usage"]), (2000000, 8192))
+        self.assertEqual(usage["block_io"], {"read_bytes": 300, "write_bytes": 40})
+
+    def test_unavailable(self):
+        self.assertIsNone(cgroup_version(self.root))
+        self.assertFalse(CgroupReader(os.path.join(self.root, "missing")).available())
+
+    def test_cpu_percent(self):
+        before = {"time": 10.0, "cpu_usage": 0}
+        after = {"time": 10.5, "cpu_usage": 250000000}
+
+        self.assertEqual(container_cpu_percent(before, after), 50.0)
+        self.assertIsNone(container_cpu_percent(after, before))
+
+if __name__ == "__main__":
+    unittest.main()
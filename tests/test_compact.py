@@ -0,0 +1,142 @@
+import unittest
+from host_insights_promptify.compact import (
+    aggregate_connections, collapse_containers, compact_insights, compact_units, estimate_prompt_tokens,
+    estimate_tokens, top_services, truncate_lines,
+)
+from host_insights_promptify.promptify import format_prompt
+
+def make_network_info(connection_count):
+    return {
+        "interfaces": [{"name": f"veth{i}", "status": "up"} for i in range(200)],
+        "routing_table": [],
+        "active_connections": [
+            {"protocol": "TCP", "local_address": f"10.0.0.1:{40000 + i}", "remote_address": "10.0.0.2:5432",
+             "status": "ESTABLISHED", "pid": 100, "process": "app"}
+            for i in range(connection_count)
+        ],
+        "dns": {},
+        "firewall_rules": "\n".join(f"ACCEPT tcp -- port {i}" for i in range(500)),
+    }
+
+def make_services(count):
+    return [{"name": f"svc{i}", "status": "running", "memory_usage": i * 1024, "cpu_usage": float(count - i)}
+            for i in range(count)]
+
+class TestCompaction(unittest.TestCase):
+
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("abcd"), 1)
+        self.assertEqual(estimate_tokens("abcde"), 2)
+
+    def test_aggregate_connections(self):
+        connections = [
+            {"protocol": "TCP", "local_address": "10.0.0.1:1", "remote_address": "10.0.0.2:443", "status": "ESTABLISHED", "process": "curl"},
+            {"protocol": "TCP", "local_address": "10.0.0.1:2", "remote_address": "10.0.0.3:443", "status": "ESTABLISHED", "process": "curl"},
+            {"protocol": "TCP", "local_address": "0.0.0.0:22", "remote_address": None, "status": "LISTEN", "process": "sshd"},
+        ]
+        groups = aggregate_connections(connections)
+
+        self.assertEqual(groups[0]["count"], 2)
+        self.assertEqual(groups[0]["remote_port"], "443")
+        self.assertEqual(groups[1]["local_port"], "22")
+
+    def test_top_services_keeps_cpu_and_memory_leaders(self):
+        services = make_services(100)
+        kept = top_services(services, 3)
+
+        names = {s["name"] for s in kept if "name" in s}
+        # svc0..2 lead on CPU, svc97..99 lead on memory
+        self.assertEqual(names, {"svc0", "svc1", "svc2", "svc97", "svc98", "svc99"})
+        self.assertEqual(kept[-1], {"omitted": 94})
+
+    def test_collapse_identical_containers(self):
+        containers = [{"name": f"web-{i}", "image": ["web:1"], "status": "running"} for i in range(3)]
+        containers.append({"name": "db", "image": ["postgres:16"], "status": "running"})
+
+        collapsed = collapse_containers(containers)
+
+        self.assertEqual(len(collapsed), 2)
+        self.assertEqual(collapsed[0]["count"], 3)
+        self.assertEqual(collapsed[0]["name"], "web-0, web-1, web-2")
+
+    def test_truncate_lines(self):
+        self.assertEqual(truncate_lines("a\nb\nc", 2), "a\nb\n... 1 more lines truncated")
+        self.assertEqual(truncate_lines("a\nb", 2), "a\nb")
+        self.assertIsNone(truncate_lines(None, 2))
+
+    def test_small_report_is_unchanged(self):
+        network_info = make_network_info(1)
+        services = make_services(1)
+        budget = estimate_prompt_tokens({}, network_info, {}, services) + 10
+
+        compacted = compact_insights({}, network_info, {}, services, token_budget=budget)
+
+        self.assertEqual(compacted[1]["active_connections"], network_info["active_connections"])
+        self.assertEqual(compacted[3], services)
+
+    def test_large_report_fits_budget(self):
+        network_info = make_network_info(5000)
+        services = make_services(3000)
+        docker_info = {"containers": [], "networks": [], "volumes": []}
+        self.assertGreater(estimate_prompt_tokens({}, network_info, docker_info, services), 100000)
+
+        compacted = compact_insights({}, network_info, docker_info, services, token_budget=4000)
+        prompt = format_prompt(*compacted)
+
+        self.assertLessEqual(estimate_tokens(prompt), 4000)
+        self.assertIn("- 5000 x TCP ESTABLISHED on remote port 5432", prompt)
+        self.assertIn("more services omitted", prompt)
+        self.assertIn("more lines truncated", prompt)
+
+    def test_trends_count_towards_budget(self):
+        stats = {"min": 1.0, "mean": 2.0, "p95": 3.0, "max": 4.0, "trend": "steady"}
+        trends = {"interval": 1.0, "window": 60.0, "samples": 60,
+                  "host": {"cpu_percent": dict(stats, unit="%")},
+                  "processes": [{"pid": i, "name": f"worker-{i}", "cpu_percent": stats, "rss_bytes": stats}
+                                for i in range(20)]}
+        services = make_services(10)
+        budget = estimate_prompt_tokens({}, make_network_info(0), {}, services) + 150
+        self.assertGreater(estimate_prompt_tokens({}, make_network_info(0), {}, services, trends=trends), budget)
+
+        compacted = compact_insights({}, make_network_info(0), {}, services, trends=trends, token_budget=budget)
+        prompt = format_prompt(*compacted)
+
+        self.assertLessEqual(estimate_tokens(prompt), budget)
+        self.assertIn("### Section 5: Metric Trends ###", prompt)
+        self.assertIn("- worker-0 (PID: 0)", prompt)
+        self.assertIn("more processes omitted", prompt)
+
+    def test_units_count_towards_budget(self):
+        units = [{"name": f"app-{i:03}.service", "description": f"Application {i}", "active_state": "active",
+                  "sub_state": "running", "result": "success", "restarts": 0, "memory_usage": 1 << 20,
+                  "cpu_usage": 10 ** 9, "tasks": 4, "processes": [i], "process_rss": 1 << 20,
+                  "process_cpu_percent": 1.0} for i in range(200)]
+        units += [{"name": f"idle-{i:03}.service", "active_state": "inactive"} for i in range(100)]
+        units[42] = dict(units[42], active_state="failed", sub_state="failed", result="exit-code")
+        units_info = {"units": units}
+        self.assertGreater(estimate_prompt_tokens({}, make_network_info(0), {}, [], units=units_info), 20000)
+
+        compacted = compact_insights({}, make_network_info(0), {}, [], units=units_info, token_budget=2000)
+        prompt = format_prompt(*compacted)
+
+        self.assertLessEqual(estimate_tokens(prompt), 2000)
+        self.assertIn("(199 active, 1 failed, 100 inactive)", prompt)
+        self.assertIn("- app-042.service: failed (failed), result: exit-code", prompt)
+        self.assertIn("more units omitted", prompt)
+        self.assertNotIn("idle-000.service", prompt)
+
+    def test_compact_units_lists_failed_and_restarting_units_first(self):
+        units = [{"name": "a.service", "active_state": "active", "restarts": 0},
+                 {"name": "b.service", "active_state": "active", "restarts": 7},
+                 {"name": "c.service", "active_state": "failed", "restarts": 0},
+                 {"name": "d.service", "active_state": "inactive"}]
+
+        compacted = compact_units({"units": units}, 2)
+
+        self.assertEqual([unit.get("name") for unit in compacted["units"]], ["b.service", "c.service", None])
+        self.assertEqual(compacted["units"][-1], {"omitted": 1})
+        self.assertEqual(compacted["counts"], {"active": 2, "failed": 1, "inactive": 1})
+
+if __name__ == "__main__":
+    unittest.main()
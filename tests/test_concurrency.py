@@ -0,0 +1,48 @@
+import threading
+import time
+import unittest
+from host_insights_promptify.concurrency import run_concurrently
+
+class TestRunConcurrently(unittest.TestCase):
+
+    def test_collects_results_and_errors(self):
+        def fail():
+            raise ValueError("boom")
+
+        results, errors = run_concurrently({"ok": lambda: 42, "bad": fail})
+
+        self.assertEqual(results, {"ok": 42})
+        self.assertEqual(errors, {"bad": "boom"})
+
+    def test_runs_tasks_in_parallel(self):
+        tasks = {f"task{i}": (lambda: time.sleep(0.2)) for i in range(5)}
+
+        start = time.monotonic()
+        results, errors = run_concurrently(tasks)
+
+        self.assertEqual(len(results), 5)
+        self.assertFalse(errors)
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_stalled_task_times_out_without_blocking_others(self):
+        release = threading.Event()
+        tasks = {
+            "stalled": release.wait,
+            "fast": lambda: "done",
+            "queued": lambda: "also done",
+        }
+
+        start = time.monotonic()
+        results, errors = run_concurrently(tasks, timeout=0.2, max_workers=1)
+        release.set()
+
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertIn("stalled", errors)
+        self.assertIn("timed out", errors["stalled"])
+        self.assertEqual(results, {"fast": "done", "queued": "also done"})
+
+    def test_empty_task_set(self):
+        self.assertEqual(run_concurrently({}), ({}, {}))
+
+if __name__ == "__main__":
+    unittest.main()
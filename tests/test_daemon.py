@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from host_insights_promptify.daemon import InsightsDaemon, query_daemon
+
+INSIGHTS = {
+    "system": {"OS": "Linux", "Hostname": "web-01"},
+    "network": {"interfaces": [], "routing_table": [], "active_connections": [], "dns": {}, "firewall_rules": None},
+    "docker": {"containers": [], "networks": [], "volumes": []},
+    "services": [{"pid": 1, "name": "init", "status": "sleeping", "memory_usage": 1024, "cpu_usage": 0.0}],
+}
+
+class TestInsightsDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.directory.name, "insights.sock")
+        patchers = [
+            mock.patch("host_insights_promptify.daemon.collect_all_insights", return_value=INSIGHTS),
+            mock.patch("docker.from_env", side_effect=Exception("no docker")),
+        ]
+        self.collect = patchers[0].start()
+        patchers[1].start()
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+        self.daemon = InsightsDaemon(self.socket_path, refresh_interval=3600)
+        self.daemon.start()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(self.daemon.stop)
+
+    def test_ping(self):
+        self.assertEqual(query_daemon(self.socket_path, "PING"), "PONG")
+
+    def test_prompt_and_json_are_served_from_the_last_refresh(self):
+        prompt = query_daemon(self.socket_path, "PROMPT")
+        document = json.loads(query_daemon(self.socket_path, "JSON"))
+
+        self.assertIn("- Hostname: web-01", prompt)
+        self.assertEqual(document["system"]["OS"], "Linux")
+        self.assertEqual(self.collect.call_count, 1)
+
+    def test_refresh_and_status(self):
+        self.assertEqual(query_daemon(self.socket_path, "REFRESH"), "refreshed")
+        status = json.loads(query_daemon(self.socket_path, "STATUS"))
+
+        self.assertGreaterEqual(status["refresh_count"], 2)
+        self.assertIsNotNone(status["updated_at"])
+
+    def test_metrics(self):
+        self.collect.return_value = dict(INSIGHTS, timings={"docker": {"wall_s": 0.5, "cpu_s": 0.1, "items": None, "counts": {}}})
+        query_daemon(self.socket_path, "REFRESH")
+
+        metrics = query_daemon(self.socket_path, "METRICS")
+
+        self.assertIn('host_insights_step_wall_seconds{step="docker"} 0.5', metrics)
+        self.assertIsNotNone(self.collect.call_args.kwargs["instrumentation"])
+
+    def test_unknown_command(self):
+        with self.assertRaises(RuntimeError):
+            query_daemon(self.socket_path, "DESTROY")
+
+    def test_socket_removed_on_stop(self):
+        self.daemon.stop()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import collections
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from host_insights_promptify.docker import collect_docker_info, _cpu_percent
+from host_insights_promptify.instrumentation import Instrumentation
+
+def make_stats(total, precpu_total, system, presystem, online=2):
+    return {
+        "cpu_stats": {"cpu_usage": {"total_usage": total}, "system_cpu_usage": system, "online_cpus": online},
+        "precpu_stats": {"cpu_usage": {"total_usage": precpu_total}, "system_cpu_usage": presystem},
+        "memory_stats": {"usage": 1024},
+    }
+
+class FakeAPI:
+    """
+    A minimal stand-in for docker.APIClient that records how often each endpoint is called.
+    """
+
+    def __init__(self, container_count, stats_delay=0.0):
+        self.calls = collections.Counter()
+        self.stats_delay = stats_delay
+        self.stalled = set()
+        self.release = threading.Event()
+        self._containers = [
+            {
+                "Id": f"id{i}",
+                "Names": [f"/c{i}"],
+                "ImageID": "sha256:img",
+                "State": "running",
+                "NetworkSettings": {"Networks": {"bridge": {"NetworkID": "net-bridge"}}},
+            }
+            for i in range(container_count)
+        ]
+
+    def containers(self):
+        self.calls["containers"] += 1
+        return self._containers
+
+    def images(self):
+        self.calls["images"] += 1
+        return [{"Id": "sha256:img", "RepoTags": ["web:latest"]}]
+
+    def networks(self):
+        self.calls["networks"] += 1
+        return [
+            {"Name": "bridge", "Id": "net-bridge", "Driver": "bridge",
+             "IPAM": {"Config": [{"Subnet": "172.17.0.0/16", "Gateway": "172.17.0.1"}]}},
+            {"Name": "host", "Id": "net-host", "Driver": "host", "IPAM": {"Config": []}},
+        ]
+
+    def volumes(self):
+        self.calls["volumes"] += 1
+        return {"Volumes": [{"Name": "data", "Mountpoint": "/var/lib/docker/volumes/data", "Driver": "local"}]}
+
+    def inspect_container(self, container_id):
+        self.calls["inspect_container"] += 1
+        return {
+            "State": {"Status": "running"},
+            "Config": {"Env": []},
+            "HostConfig": {"RestartPolicy": {"Name": "no"}},
+            "Mounts": [],
+            "NetworkSettings": {"Networks": {}, "Ports": {}},
+        }
+
+    def stats(self, container_id, **kwargs):
+        self.calls["stats"] += 1
+        if container_id in self.stalled:
+            self.release.wait()
+        time.sleep(self.stats_delay)
+        return make_stats(200, 100, 2000, 1000)
+
+def make_client(api):
+    client = mock.MagicMock()
+    client.api = api
+    return client
+
+class TestDockerInfo(unittest.TestCase):
+
+    def test_cpu_percent(self):
+        self.assertEqual(_cpu_percent(make_stats(200, 100, 2000, 1000, online=2)), 20.0)
+        self.assertIsNone(_cpu_percent({"cpu_stats": {}, "precpu_stats": {}}))
+
+    def test_stats_are_collected_in_parallel(self):
+        api = FakeAPI(8, stats_delay=0.2)
+
+        start = time.monotonic()
+        docker_info = collect_docker_info(client=make_client(api), max_workers=8)
+
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual([c["name"] for c in docker_info["containers"]], [f"c{i}" for i in range(8)])
+        self.assertEqual(docker_info["containers"][0]["cpu_percent"], 20.0)
+
+    def test_fast_stats_uses_one_shot(self):
+        api = FakeAPI(1)
+        with mock.patch.object(api, "stats", wraps=api.stats) as stats:
+            collect_docker_info(client=make_client(api), fast_stats=True)
+        stats.assert_called_once_with("id0", stream=False, one_shot=True)
+
+    def test_stalled_container_is_reported(self):
+        api = FakeAPI(2)
+        api.stalled.add("id0")
+
+        docker_info = collect_docker_info(client=make_client(api), timeout=0.2)
+        api.release.set()
+
+        self.assertIn("timed out", docker_info["containers"][0]["error"])
+        self.assertEqual(docker_info["containers"][1]["name"], "c1")
+
+    def make_cgroups(self, root, container_ids):
+        with open(os.path.join(root, "cgroup.controllers"), "w") as f:
+            f.write("cpu memory\n")
+        for container_id in container_ids:
+            path = os.path.join(root, "system.slice", f"docker-{container_id}.scope")
+            os.makedirs(path)
+            with open(os.path.join(path, "cpu.stat"), "w") as f:
+                f.write("usage_usec 1000\n")
+            with open(os.path.join(path, "memory.current"), "w") as f:
+                f.write("2048\n")
+
+    def test_usage_is_read_from_cgroupfs(self):
+        api = FakeAPI(3)
+        with tempfile.TemporaryDirectory() as root:
+            # id2's cgroup is not found, so it falls back to the stats API
+            self.make_cgroups(root, ("id0", "id1"))
+
+            instrumentation = Instrumentation()
+            docker_info = collect_docker_info(client=make_client(api), cgroup_root=root, cpu_interval=0.05,
+                                              instrumentation=instrumentation)
+
+        self.assertEqual(api.calls["stats"], 1)
+        first, _, fallback = docker_info["containers"]
+        self.assertEqual((first["cpu_usage"], first["memory_usage"], first["cpu_percent"]), (1000000, 2048, 0.0))
+        self.assertEqual(fallback["cpu_percent"], 20.0)
+        timings = instrumentation.timings()
+        self.assertEqual(timings["docker.cgroups"]["counts"], {"cgroup_reads": 4})
+        self.assertEqual(timings["docker.containers"]["counts"], {"api_calls": 4})
+
+    def test_cgroups_are_read_once_without_cpu_interval(self):
+        api = FakeAPI(2)
+        with tempfile.TemporaryDirectory() as root:
+            self.make_cgroups(root, ("id0", "id1"))
+            instrumentation = Instrumentation()
+            docker_info = collect_docker_info(client=make_client(api), cgroup_root=root, cpu_interval=0,
+                                              instrumentation=instrumentation)
+
+        self.assertEqual(api.calls["stats"], 0)
+        self.assertEqual([c["cpu_percent"] for c in docker_info["containers"]], [None, None])
+        self.assertEqual(docker_info["containers"][0]["memory_usage"], 2048)
+        self.assertEqual(instrumentation.timings()["docker.cgroups"]["counts"], {"cgroup_reads": 2})
+
+    def test_bulk_lists_are_joined_in_memory(self):
+        api = FakeAPI(20)
+
+        docker_info = collect_docker_info(client=make_client(api))
+
+        # Each object type is listed exactly once regardless of the number of containers
+        for endpoint in ("containers", "images", "networks", "volumes"):
+            self.assertEqual(api.calls[endpoint], 1)
+        self.assertEqual(docker_info["containers"][0]["image"], ["web:latest"])
+        bridge, host = docker_info["networks"]
+        self.assertEqual(bridge["containers"], [f"c{i}" for i in range(20)])
+        self.assertEqual(host["containers"], [])
+        self.assertIsNone(host["subnet"])
+        self.assertEqual(docker_info["volumes"][0]["name"], "data")
+
+if __name__ == "__main__":
+    unittest.main()
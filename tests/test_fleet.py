@@ -0,0 +1,94 @@
+import json
+import sys
+import unittest
+from host_insights_promptify.fleet import _run_collection, collect_fleet, merge_fleet, parse_target
+from host_insights_promptify.promptify import format_fleet_prompt
+
+def make_insights(hostname, os_version="6.1", images=("web:1.0",), dns="10.0.0.2"):
+    return {
+        "schema": 1,
+        "system": {"OS": "Linux", "OS Version": os_version, "Hostname": hostname, "Available Memory": "3.00 GB"},
+        "network": {"dns": {"primary": dns}, "firewall_rules": "Chain INPUT (policy DROP)",
+                    "routing_table": [{"destination": "default", "gateway": "10.0.0.1"}],
+                    "active_connections": [{"protocol": "TCP"}]},
+        "docker": {"containers": [{"name": f"c{i}", "image": [image]} for i, image in enumerate(images)]},
+        "services": [{"name": "nginx"}, {"name": "sshd"}],
+    }
+
+def fake_fetcher(insights):
+    return lambda timeout: insights
+
+def failing_fetcher(message):
+    def fetch(timeout):
+        raise RuntimeError(message)
+    return fetch
+
+class TestFleet(unittest.TestCase):
+
+    def test_collects_in_parallel_and_reports_failures(self):
+        targets = {f"web-{i}": fake_fetcher(make_insights(f"web-{i}")) for i in range(10)}
+        targets["db-1"] = failing_fetcher("timed out after 5s")
+
+        results, errors = collect_fleet(targets, max_workers=4, timeout=5)
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(errors, {"db-1": "timed out after 5s"})
+
+    def test_identical_facts_are_merged(self):
+        results = {f"web-{i}": make_insights(f"web-{i}") for i in range(3)}
+        results["web-3"] = make_insights("web-3", os_version="6.5", images=("web:1.0", "cache:7"))
+
+        fleet = merge_fleet(results, {"db-1": "unreachable"})
+
+        self.assertEqual(fleet["facts"]["OS"], [{"value": "Linux", "hosts": ["web-0", "web-1", "web-2", "web-3"]}])
+        self.assertEqual([group["hosts"] for group in fleet["facts"]["OS Version"]],
+                         [["web-0", "web-1", "web-2"], ["web-3"]])
+        self.assertEqual(fleet["images"][0], {"image": "web:1.0", "containers": 4,
+                                              "hosts": ["web-0", "web-1", "web-2", "web-3"]})
+        self.assertEqual(fleet["services"][0]["instances"], 4)
+
+        prompt = format_fleet_prompt(fleet)
+        self.assertIn("- OS: Linux (all 4 hosts)", prompt)
+        self.assertIn("- DNS: 10.0.0.2 (all 4 hosts)", prompt)
+        self.assertIn("  - 6.5: web-3", prompt)
+        self.assertIn("- db-1: unreachable (unreachable)", prompt)
+        # Shared facts are stated once, not per host
+        self.assertEqual(prompt.count("Linux"), 1)
+
+    def test_failed_collectors_are_reported_per_host(self):
+        insights = make_insights("web-0")
+        insights["services"] = [{"error": "Error collecting services information: timed out"}]
+        insights["units"] = {"units": [], "error": "systemd is not running on this host"}
+
+        fleet = merge_fleet({"web-0": insights})
+
+        self.assertEqual(fleet["services"], [])
+        summary = fleet["host_summaries"][0]
+        self.assertEqual(summary["services"], 0)
+        self.assertEqual(summary["errors"], ["systemd is not running on this host",
+                                             "Error collecting services information: timed out"])
+
+    def test_host_without_system_data(self):
+        insights = make_insights("web-0")
+        del insights["system"]
+
+        prompt = format_fleet_prompt(merge_fleet({"web-0": insights}))
+
+        self.assertIn("- web-0: N/A memory available, disk N/A used", prompt)
+
+    def test_parse_target(self):
+        self.assertEqual(parse_target("admin@db-01")[0], "admin@db-01")
+        self.assertEqual(parse_target("ssh://web-01")[0], "web-01")
+        self.assertEqual(parse_target("unix:/run/hip.sock")[0], "/run/hip.sock")
+        self.assertEqual(parse_target("local:node-1")[0], "node-1")
+
+    def test_collection_command_timeout_and_output(self):
+        document = json.dumps(make_insights("local"))
+        insights = _run_collection([sys.executable, "-c", f"print({document!r})"], "local", timeout=10)
+        self.assertEqual(insights["system"]["Hostname"], "local")
+
+        with self.assertRaisesRegex(RuntimeError, "timed out"):
+            _run_collection([sys.executable, "-c", "import time; time.sleep(10)"], "slow", timeout=0.5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+import host_insights_promptify
+from host_insights_promptify import collect_all_insights
+from host_insights_promptify.docker import collect_docker_info
+from host_insights_promptify.instrumentation import Instrumentation, format_prometheus, step
+from test_docker import FakeAPI, make_client
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_repeated_steps_accumulate(self):
+        instrumentation = Instrumentation()
+        for _ in range(3):
+            with instrumentation.step("network.firewall_rules") as record:
+                record.count("subprocesses")
+                record.items = 1
+
+        timings = instrumentation.timings()["network.firewall_rules"]
+        self.assertEqual(timings["counts"], {"subprocesses": 3})
+        self.assertEqual(timings["items"], 1)
+        self.assertGreaterEqual(timings["wall_s"], 0)
+
+    def test_uninstrumented_step_is_a_no_op(self):
+        with step(None, "system") as record:
+            record.count("statvfs")
+            record.items = 5
+
+    def test_prometheus_format(self):
+        timings = {"docker.containers": {"wall_s": 1.5, "cpu_s": 0.25, "items": 10, "counts": {"api_calls": 20}},
+                   "render": {"wall_s": 0.1, "cpu_s": 0.1, "items": None, "counts": {}}}
+
+        text = format_prometheus(timings)
+
+        self.assertIn('host_insights_step_wall_seconds{step="docker.containers"} 1.5\n', text)
+        self.assertIn('host_insights_step_items{step="docker.containers"} 10\n', text)
+        self.assertNotIn('host_insights_step_items{step="render"}', text)
+        self.assertIn('host_insights_step_operations{step="docker.containers",kind="api_calls"} 20\n', text)
+        self.assertIn("# TYPE host_insights_step_cpu_seconds gauge\n", text)
+
+    def test_docker_api_calls_are_counted(self):
+        instrumentation = Instrumentation()
+        collect_docker_info(client=make_client(FakeAPI(5)), instrumentation=instrumentation)
+
+        timings = instrumentation.timings()
+        self.assertEqual(timings["docker.list"]["counts"], {"api_calls": 2})
+        self.assertEqual(timings["docker.containers"]["items"], 5)
+        self.assertEqual(timings["docker.containers"]["counts"], {"api_calls": 10})
+        self.assertEqual(timings["docker.volumes"]["items"], 1)
+
+    def test_collect_all_insights_reports_timings(self):
+        collectors = {
+            "system": lambda cache=None, instrumentation=None: {},
+            "network": lambda snapshot=None, cache=None, instrumentation=None: {},
+            "docker": lambda cache=None, instrumentation=None: {},
+            "services": lambda snapshot=None: [{"pid": 1}, {"pid": 2}],
+            "units": lambda snapshot=None, instrumentation=None: {"units": []},
+        }
+        with mock.patch.dict(host_insights_promptify.COLLECTORS, collectors):
+            insights = collect_all_insights(cpu_interval=0, instrumentation=Instrumentation())
+
+        self.assertEqual(set(insights["timings"]), {"processes.snapshot", "system", "network", "docker", "services", "units"})
+        self.assertEqual(insights["timings"]["services"]["items"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+import collections
+import os
+import queue
+import tempfile
+import time
+import unittest
+from unittest import mock
+from host_insights_promptify.inventory import DockerInventory
+
+def summary(container_id, network="net-bridge"):
+    return {
+        "Id": container_id,
+        "Names": [f"/{container_id}"],
+        "ImageID": "sha256:img",
+        "State": "running",
+        "NetworkSettings": {"Networks": {"bridge": {"NetworkID": network}}},
+    }
+
+class EventStream:
+    """
+    A stand-in for the Docker event stream, fed from a queue until closed.
+    """
+
+    def __init__(self):
+        self.events = queue.Queue()
+
+    def __iter__(self):
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            yield event
+
+    def close(self):
+        self.events.put(None)
+
+class FakeAPI:
+    """
+    A Docker API stand-in with a mutable object model and an event stream.
+    """
+
+    def __init__(self, container_count):
+        self.calls = collections.Counter()
+        self.stream = EventStream()
+        self.running = {f"c{i}": summary(f"c{i}") for i in range(container_count)}
+        self.networks_by_id = {"net-bridge": {"Name": "bridge", "Id": "net-bridge", "Driver": "bridge", "IPAM": {}}}
+        self.volumes_by_name = {"data": {"Name": "data", "Mountpoint": "/var/lib/docker/volumes/data", "Driver": "local"}}
+
+    def containers(self, filters=None):
+        self.calls["containers"] += 1
+        ids = (filters or {}).get("id")
+        return [s for container_id, s in self.running.items() if ids is None or container_id in ids]
+
+    def images(self):
+        self.calls["images"] += 1
+        return [{"Id": "sha256:img", "RepoTags": ["web:latest"]}]
+
+    def networks(self):
+        self.calls["networks"] += 1
+        return list(self.networks_by_id.values())
+
+    def volumes(self):
+        self.calls["volumes"] += 1
+        return {"Volumes": list(self.volumes_by_name.values())}
+
+    def inspect_container(self, container_id):
+        self.calls["inspect_container"] += 1
+        return {
+            "State": {"Status": "running"},
+            "Config": {"Env": []},
+            "HostConfig": {"RestartPolicy": {"Name": "no"}},
+            "Mounts": [],
+            "NetworkSettings": {"Networks": {}, "Ports": {}},
+        }
+
+    def stats(self, container_id, **kwargs):
+        self.calls["stats"] += 1
+        return {"cpu_stats": {"cpu_usage": {"total_usage": 100}}, "precpu_stats": {}, "memory_stats": {"usage": 1024}}
+
+    def inspect_network(self, network_id):
+        self.calls["inspect_network"] += 1
+        return self.networks_by_id[network_id]
+
+    def inspect_volume(self, name):
+        self.calls["inspect_volume"] += 1
+        return self.volumes_by_name[name]
+
+    def events(self, since=None, decode=False):
+        self.calls["events"] += 1
+        return self.stream
+
+def event(kind, action, actor_id, **attributes):
+    return {"Type": kind, "Action": action, "Actor": {"ID": actor_id, "Attributes": attributes}}
+
+class TestDockerInventory(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FakeAPI(3)
+        client = mock.MagicMock()
+        client.api = self.api
+        self.inventory = DockerInventory(client, cgroup_root=None)
+        self.inventory.start()
+        self.addCleanup(self.inventory.stop)
+        self.first = self.inventory.report()
+        self.api.calls.clear()
+
+    def send(self, *events):
+        applied = self.inventory.events_applied + len(events)
+        for item in events:
+            self.api.stream.events.put(item)
+        deadline = time.monotonic() + 5
+        while self.inventory.events_applied < applied and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_full_sync(self):
+        self.assertEqual([c["name"] for c in self.first["containers"]], ["c0", "c1", "c2"])
+        self.assertEqual(self.first["networks"][0]["containers"], ["c0", "c1", "c2"])
+        self.assertEqual(self.first["volumes"][0]["name"], "data")
+
+    def test_quiet_report_makes_no_api_calls(self):
+        report = self.inventory.report()
+
+        self.assertEqual(sum(self.api.calls.values()), 0)
+        self.assertEqual(len(report["containers"]), 3)
+
+    def test_events_are_applied_incrementally(self):
+        self.api.running["c3"] = summary("c3")
+        del self.api.running["c0"]
+        self.api.networks_by_id["net-db"] = {"Name": "db", "Id": "net-db", "Driver": "bridge", "IPAM": {}}
+        self.send(
+            event("container", "create", "c3"),
+            event("container", "start", "c3"),
+            event("container", "exec_start: sh", "c1"),
+            event("container", "die", "c0"),
+            event("network", "create", "net-db"),
+            event("volume", "destroy", "data"),
+        )
+
+        report = self.inventory.report()
+
+        self.assertEqual([c["name"] for c in report["containers"]], ["c1", "c2", "c3"])
+        self.assertEqual([n["name"] for n in report["networks"]], ["bridge", "db"])
+        self.assertEqual(report["volumes"], [])
+        # One filtered list and one inspect for the new container, one network inspect
+        self.assertEqual(self.api.calls, {"containers": 1, "inspect_container": 1, "stats": 1, "inspect_network": 1})
+
+    def test_broken_stream_triggers_a_full_sync(self):
+        self.inventory.retry_interval = 3600
+        self.api.stream.close()
+        deadline = time.monotonic() + 5
+        while not self.inventory._stale and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.inventory.report()
+
+        for endpoint in ("containers", "images", "networks", "volumes"):
+            self.assertEqual(self.api.calls[endpoint], 1)
+
+class TestDockerInventoryCgroups(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        with open(os.path.join(self.root, "cgroup.controllers"), "w") as f:
+            f.write("cpu memory\n")
+        for container_id in ("c0", "c1"):
+            os.makedirs(os.path.join(self.root, "system.slice", f"docker-{container_id}.scope"))
+            self.write_usage(container_id, 0)
+        self.api = FakeAPI(2)
+
+    def write_usage(self, container_id, usage_usec):
+        path = os.path.join(self.root, "system.slice", f"docker-{container_id}.scope")
+        with open(os.path.join(path, "cpu.stat"), "w") as f:
+            f.write(f"usage_usec {usage_usec}\n")
+        with open(os.path.join(path, "memory.current"), "w") as f:
+            f.write(f"{usage_usec + 2048}\n")
+
+    def make_inventory(self, cpu_interval):
+        client = mock.MagicMock()
+        client.api = self.api
+        inventory = DockerInventory(client, cgroup_root=self.root, cpu_interval=cpu_interval)
+        inventory.start()
+        self.addCleanup(inventory.stop)
+        return inventory
+
+    def test_cpu_percent_needs_a_full_interval(self):
+        inventory = self.make_inventory(cpu_interval=0.1)
+
+        first = inventory.report()
+        # Sampled right after inspection: the window is far too short for a percentage
+        self.assertEqual([c["cpu_percent"] for c in first["containers"]], [None, None])
+        self.assertEqual(self.api.calls["stats"], 0)
+
+        self.write_usage("c0", 50000)
+        self.assertEqual(inventory.report()["containers"][0]["cpu_percent"], None)
+        self.assertEqual(inventory.report()["containers"][0]["memory_usage"], 52048)
+
+        time.sleep(0.15)
+        self.write_usage("c0", 100000)
+        cpu_percent = inventory.report()["containers"][0]["cpu_percent"]
+        self.assertGreater(cpu_percent, 0)
+        # 100 ms of CPU time over at least the 0.15 s sleep
+        self.assertLessEqual(cpu_percent, 100000 / 0.15 / 1e6 * 100)
+
+        # A quick follow-up report keeps the last percentage instead of sampling a tiny window
+        self.assertEqual(inventory.report()["containers"][0]["cpu_percent"], cpu_percent)
+
+    def test_no_cpu_percent_without_interval(self):
+        inventory = self.make_inventory(cpu_interval=0)
+        inventory.report()
+        time.sleep(0.02)
+        self.write_usage("c0", 100000)
+
+        report = inventory.report()
+
+        self.assertEqual(report["containers"][0]["cpu_percent"], None)
+        self.assertEqual(report["containers"][0]["cpu_usage"], 100000000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import socket
+import subprocess
+import unittest
+from unittest import mock
+from host_insights_promptify import network
+from host_insights_promptify.network import collect_network_info
+from host_insights_promptify.processes import ProcessEntry, ProcessSnapshot
+
+def make_connection(pid, port):
+    addr = mock.Mock(ip="10.0.0.1", port=port)
+    return mock.Mock(type=socket.SOCK_STREAM, laddr=addr, raddr=None, status="LISTEN", pid=pid)
+
+class TestNetworkInfo(unittest.TestCase):
+
+    def test_connection_owners_resolved_from_snapshot(self):
+        snapshot = ProcessSnapshot({
+            80: ProcessEntry(80, "nginx", "sleeping", 1700000000.0, 1024, None),
+        })
+        connections = [make_connection(80, 80), make_connection(999, 8080)]
+
+        with mock.patch("psutil.net_connections", return_value=connections), \
+                mock.patch("psutil.Process") as process:
+            network_info = collect_network_info(snapshot=snapshot, connection_mode="psutil")
+
+        process.assert_not_called()
+        self.assertNotIn("error", network_info)
+        owners = [conn["process"] for conn in network_info["active_connections"]]
+        # A PID that exited after the snapshot was taken resolves to None instead of raising
+        self.assertEqual(owners, ["nginx", None])
+
+def make_interface_snapshots(names):
+    addresses = {name: [mock.Mock(family=socket.AF_INET, address=f"10.0.{i}.1", netmask="255.255.255.0",
+                                  broadcast=None)] for i, name in enumerate(names)}
+    stats = {name: mock.Mock(isup=not name.startswith("down"), mtu=1500, speed=1000) for name in names}
+    io = {name: mock.Mock(bytes_sent=10, bytes_recv=20, packets_sent=1, packets_recv=2,
+                          errin=0, errout=0, dropin=0, dropout=3) for name in names}
+    return addresses, stats, io
+
+class TestInterfaces(unittest.TestCase):
+
+    def collect(self, names, **options):
+        addresses, stats, io = make_interface_snapshots(names)
+        with mock.patch("psutil.net_if_addrs", return_value=addresses), \
+                mock.patch("psutil.net_if_stats", return_value=stats) as net_if_stats, \
+                mock.patch("psutil.net_io_counters", return_value=io) as net_io_counters:
+            interfaces = network._collect_interfaces(**options)
+        net_if_stats.assert_called_once_with()
+        net_io_counters.assert_called_once_with(pernic=True)
+        return interfaces
+
+    def test_single_snapshot_with_mtu_and_counters(self):
+        interfaces = self.collect([f"veth{i}" for i in range(50)] + ["eth0"])
+
+        self.assertEqual(len(interfaces), 51)
+        eth0 = interfaces[-1]
+        self.assertEqual(eth0["mtu"], 1500)
+        self.assertEqual(eth0["status"], "up")
+        self.assertEqual(eth0["io"]["bytes_recv"], 20)
+        self.assertEqual(eth0["io"]["dropout"], 3)
+
+    def test_filters(self):
+        names = ["eth0", "veth1", "cali2", "down0"]
+        self.assertEqual([i["name"] for i in self.collect(names, exclude=["veth*", "cali*"])], ["eth0", "down0"])
+        self.assertEqual([i["name"] for i in self.collect(names, include=["eth*", "down*"], up_only=True)], ["eth0"])
+
+class TestFirewallRules(unittest.TestCase):
+
+    def collect(self, outputs):
+        """
+        Collects firewall rules with each tool's output (or exception) stubbed.
+        """
+        calls = []
+
+        def run_command(args, timeout=network.COMMAND_TIMEOUT, record=None):
+            calls.append(args)
+            outcome = outputs.get(args[0], FileNotFoundError(args[0]))
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with mock.patch("platform.system", return_value="Linux"), \
+                mock.patch.object(network, "_run_command", side_effect=run_command):
+            return network._collect_firewall_rules(), calls
+
+    def test_active_ufw_wins_with_a_single_call(self):
+        rules, calls = self.collect({"ufw": "Status: active\n[ 1] 22/tcp ALLOW IN Anywhere\n",
+                                     "iptables": "Chain INPUT (policy ACCEPT)\n"})
+        self.assertIn("22/tcp", rules)
+        self.assertEqual(sorted(args[0] for args in calls), ["iptables", "nft", "ufw"])
+
+    def test_iptables_is_queried_numerically(self):
+        rules, calls = self.collect({"ufw": "Status: inactive\n", "iptables": "Chain INPUT (policy DROP)\n"})
+        self.assertEqual(rules, "Chain INPUT (policy DROP)\n")
+        self.assertIn(["iptables", "-L", "-n"], calls)
+
+    def test_nftables_used_when_iptables_missing(self):
+        rules, _ = self.collect({"nft": "table inet filter {}\n"})
+        self.assertEqual(rules, "table inet filter {}\n")
+
+    def test_timed_out_tools_are_reported(self):
+        rules, _ = self.collect({"iptables": subprocess.TimeoutExpired("iptables", network.COMMAND_TIMEOUT)})
+        self.assertIn("did not respond", rules)
+
+    def test_no_firewall_tools(self):
+        rules, _ = self.collect({})
+        self.assertEqual(rules, "Neither UFW, iptables, nor nftables found")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import collections
+import threading
+import time
+import unittest
+from unittest import mock
+from host_insights_promptify.instrumentation import Instrumentation
+from host_insights_promptify.promptify import format_prompt
+from host_insights_promptify.partitions import scan_partitions, select_partitions
+
+Partition = collections.namedtuple("Partition", ["device", "mountpoint", "fstype", "opts"])
+DiskUsage = collections.namedtuple("DiskUsage", ["total", "used", "free", "percent"])
+
+USAGE = DiskUsage(100 * 1024 ** 3, 40 * 1024 ** 3, 60 * 1024 ** 3, 40.0)
+
+class StaleMount:
+    """
+    A disk_usage() stand-in whose calls for one mountpoint block until released.
+    """
+
+    def __init__(self, stale):
+        self.stale = stale
+        self.released = threading.Event()
+        self.calls = collections.Counter()
+
+    def __call__(self, mountpoint):
+        self.calls[mountpoint] += 1
+        if mountpoint == self.stale:
+            self.released.wait()
+        if mountpoint == "/secret":
+            raise PermissionError(mountpoint)
+        return USAGE
+
+class TestSelectPartitions(unittest.TestCase):
+
+    def test_pseudo_and_duplicate_mounts_are_dropped(self):
+        partitions = [
+            Partition("overlay", "/", "overlay", "rw"),
+            Partition("/dev/sda1", "/data", "ext4", "rw"),
+            Partition("/dev/sda1", "/data/bind", "ext4", "rw"),
+            Partition("/dev/loop3", "/snap/core/123", "squashfs", "ro"),
+            Partition("overlay", "/var/lib/docker/overlay2/abc/merged", "overlay", "rw"),
+            Partition("tmpfs", "/run", "tmpfs", "rw"),
+            Partition("nas:/export", "/mnt/nas", "nfs4", "rw"),
+        ]
+
+        selected = [p.mountpoint for p in select_partitions(partitions)]
+        self.assertEqual(selected, ["/", "/data", "/mnt/nas"])
+
+class TestScanPartitions(unittest.TestCase):
+
+    def test_stale_mount_is_reported_unresponsive(self):
+        partitions = [
+            Partition("/dev/sda1", "/", "ext4", "rw"),
+            Partition("nas:/export", "/mnt/nas", "nfs4", "rw"),
+            Partition("/dev/sdb1", "/secret", "ext4", "rw"),
+        ]
+        disk_usage = StaleMount("/mnt/nas")
+        instrumentation = Instrumentation()
+        try:
+            with mock.patch("psutil.disk_usage", side_effect=disk_usage):
+                started = time.monotonic()
+                with instrumentation.step("scan") as record:
+                    first = scan_partitions(partitions, timeout=0.2, record=record)
+                self.assertLess(time.monotonic() - started, 2)
+
+                # The blocked call is still outstanding, so the mount is not probed again
+                second = scan_partitions(partitions, timeout=0.2)
+        finally:
+            disk_usage.released.set()
+
+        for scan in (first, second):
+            self.assertEqual([p["Mountpoint"] for p in scan], ["/", "/mnt/nas"])
+            self.assertEqual(scan[0]["Status"], "ok")
+            self.assertEqual(scan[0]["Usage"], "40.0%")
+            self.assertEqual(scan[1]["Status"], "unresponsive")
+            self.assertEqual(scan[1]["Usage"], "N/A")
+        self.assertEqual(disk_usage.calls["/mnt/nas"], 1)
+        self.assertEqual(instrumentation.timings()["scan"]["counts"], {"statvfs": 3, "unresponsive": 1})
+        self.assertIn(": /mnt/nas (nfs4)", format_prompt({"Disk Partitions": first}, {}, {}, []))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from host_insights_promptify.processes import (
+    ProcessEntry, ProcessSnapshot, _read_proc_cpu_times, cpu_percent_between, take_process_snapshot,
+)
+from host_insights_promptify.services import collect_services_info
+
+class FakeProcess:
+    def __init__(self, pid, name, memory_info=None):
+        self.info = {
+            'pid': pid,
+            'name': name,
+            'status': 'running',
+            'create_time': 1700000000.0,
+            'memory_info': memory_info,
+        }
+
+class TestProcessSnapshot(unittest.TestCase):
+
+    def test_snapshot_is_pid_indexed(self):
+        rss = mock.Mock(rss=4096)
+        processes = [FakeProcess(1, "init", rss), FakeProcess(42, "nginx")]
+        with mock.patch("psutil.process_iter", return_value=processes) as process_iter:
+            snapshot = take_process_snapshot()
+
+        process_iter.assert_called_once()
+        self.assertEqual(len(snapshot), 2)
+        self.assertIn(42, snapshot)
+        self.assertEqual(snapshot.name(42), "nginx")
+        self.assertIsNone(snapshot.name(7))
+        self.assertEqual(snapshot.get(1).rss, 4096)
+        self.assertIsNone(snapshot.get(42).rss)
+
+    def test_services_use_shared_snapshot(self):
+        snapshot = ProcessSnapshot({
+            10: ProcessEntry(10, "sshd", "sleeping", 1700000000.0, 2048, None),
+        })
+        with mock.patch("psutil.process_iter") as process_iter:
+            services = collect_services_info(snapshot=snapshot)
+
+        process_iter.assert_not_called()
+        self.assertEqual(len(services), 1)
+        self.assertEqual(services[0]["name"], "sshd")
+        self.assertEqual(services[0]["memory_usage"], 2048)
+        self.assertEqual(services[0]["cpu_usage"], "N/A")
+
+class TestCpuSampling(unittest.TestCase):
+
+    def test_read_proc_cpu_times(self):
+        with tempfile.TemporaryDirectory() as proc_root:
+            # utime and stime are the 14th and 15th fields; the name may contain spaces and parens
+            stats = {
+                "1": b"1 (init) S 0 1 1 0 -1 4194560 100 0 0 0 250 50 0 0 20 0 1 0 5",
+                "42": b"42 (my (odd) proc) R 1 42 42 0 -1 0 0 0 0 0 7 3 0 0 20 0 1 0 9",
+            }
+            for pid, stat in stats.items():
+                os.mkdir(os.path.join(proc_root, pid))
+                with open(os.path.join(proc_root, pid, "stat"), "wb") as f:
+                    f.write(stat)
+            os.mkdir(os.path.join(proc_root, "net"))
+
+            self.assertEqual(_read_proc_cpu_times(proc_root), {1: 300, 42: 10})
+
+    def test_cpu_percent_between(self):
+        before = ({1: 100, 2: 500, 3: 0}, 100)
+        after = ({1: 150, 2: 500, 4: 10}, 100)
+
+        # 50 ticks at 100 ticks/s over 1 second is 50%; PIDs missing from either reading are skipped
+        self.assertEqual(cpu_percent_between(before, after, 1.0), {1: 50.0, 2: 0.0})
+
+    def test_snapshot_samples_cpu_in_one_window(self):
+        readings = iter([({7: 0}, 100), ({7: 25}, 100)])
+        processes = [FakeProcess(7, "worker")]
+        with mock.patch("host_insights_promptify.processes.read_cpu_times", side_effect=lambda: next(readings)), \
+                mock.patch("psutil.process_iter", return_value=processes), \
+                mock.patch("time.sleep") as sleep:
+            snapshot = take_process_snapshot(cpu_interval=0.5)
+
+        sleep.assert_called_once()
+        self.assertGreater(snapshot.get(7).cpu_percent, 0)
+
+if __name__ == "__main__":
+    unittest.main()
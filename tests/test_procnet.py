@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from host_insights_promptify import procnet
+from host_insights_promptify.processes import ProcessEntry, ProcessSnapshot
+from host_insights_promptify.procnet import build_inode_pid_map, iter_proc_connections, read_routing_table
+
+HEADER = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+TABLES = {
+    # 127.0.0.1:80 listening, and 10.0.0.5:51000 -> 93.184.216.34:443 established
+    "tcp": [
+        "   0: 0100007F:0050 00000000:0000 0A 00000000:00000000 00:00000000 00000000     0        0 1001 1 0 100 0 0 10 0\n",
+        "   1: 0500000A:C738 22D8B85D:01BB 01 00000000:00000000 00:00000000 00000000  1000        0 1002 1 0 20 4 30 10 -1\n",
+    ],
+    # [::1]:8080 listening
+    "tcp6": [
+        "   0: 00000000000000000000000001000000:1F90 00000000000000000000000000000000:0000 0A 00000000:00000000 00:00000000 00000000  1000        0 1003 1 0 100 0 0 10 0\n",
+    ],
+    # 0.0.0.0:53 unconnected
+    "udp": [
+        "  10: 00000000:0035 00000000:0000 07 00000000:00000000 00:00000000 00000000   101        0 1004 2 0 0\n",
+    ],
+    "udp6": [],
+}
+
+ROUTE = (
+    "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"
+    "eth0\t00000000\t010200C0\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+    "eth0\t000200C0\t00000000\t0001\t0\t0\t0\t00FFFFFF\t0\t0\t0\n"
+)
+IPV6_ROUTE = (
+    "fd000000000000000000000000000000 40 00000000000000000000000000000000 00 00000000000000000000000000000000 00000100 00000001 00000000 00000001     eth0\n"
+    "00000000000000000000000000000000 00 00000000000000000000000000000000 00 fd000000000000000000000000000001 00000400 00000001 00000000 00000003     eth0\n"
+    # Local and multicast table entries, and the loopback unreachable route, are skipped
+    "fd000000000000000000000000000002 80 00000000000000000000000000000000 00 00000000000000000000000000000000 00000000 00000002 00000000 80200001     eth0\n"
+    "ff000000000000000000000000000000 08 00000000000000000000000000000000 00 00000000000000000000000000000000 00000100 00000004 00000000 00000001     eth0\n"
+    "00000000000000000000000000000000 00 00000000000000000000000000000000 00 00000000000000000000000000000000 ffffffff 00000001 00000000 00200200       lo\n"
+)
+
+class TestProcNet(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.proc_root = self.directory.name
+        os.mkdir(os.path.join(self.proc_root, "net"))
+        for table, lines in TABLES.items():
+            with open(os.path.join(self.proc_root, "net", table), "w") as f:
+                f.write(HEADER + "".join(lines))
+        for table, content in (("route", ROUTE), ("ipv6_route", IPV6_ROUTE)):
+            with open(os.path.join(self.proc_root, "net", table), "w") as f:
+                f.write(content)
+        fd_dir = os.path.join(self.proc_root, "200", "fd")
+        os.makedirs(fd_dir)
+        os.symlink("socket:[1001]", os.path.join(fd_dir, "3"))
+        os.symlink("socket:[1002]", os.path.join(fd_dir, "4"))
+        os.symlink("/dev/null", os.path.join(fd_dir, "0"))
+
+    def test_inode_pid_map(self):
+        self.assertEqual(build_inode_pid_map(self.proc_root), {1001: 200, 1002: 200})
+
+    def test_connections_are_decoded_and_attributed(self):
+        snapshot = ProcessSnapshot({200: ProcessEntry(200, "nginx", "sleeping", 0.0, 0, None)})
+        connections = list(iter_proc_connections(snapshot=snapshot, proc_root=self.proc_root))
+
+        self.assertEqual(connections[0], {
+            "protocol": "TCP", "local_address": "127.0.0.1:80", "remote_address": None,
+            "status": "LISTEN", "pid": 200, "process": "nginx",
+        })
+        self.assertEqual(connections[1]["local_address"], "10.0.0.5:51000")
+        self.assertEqual(connections[1]["remote_address"], "93.184.216.34:443")
+        self.assertEqual(connections[1]["status"], "ESTABLISHED")
+        self.assertEqual(connections[2]["local_address"], "::1:8080")
+        self.assertIsNone(connections[2]["pid"])
+        self.assertEqual(connections[3], {
+            "protocol": "UDP", "local_address": "0.0.0.0:53", "remote_address": None,
+            "status": "NONE", "pid": None, "process": None,
+        })
+
+    def test_unattributed_mode_skips_pid_join(self):
+        connections = list(iter_proc_connections(attribute=False, proc_root=self.proc_root))
+
+        self.assertEqual(len(connections), 4)
+        self.assertTrue(all(conn["pid"] is None for conn in connections))
+
+    def test_routing_table_is_structured(self):
+        routes = read_routing_table(self.proc_root)
+
+        self.assertEqual(routes, [
+            {"destination": "default", "gateway": "192.0.2.1", "interface": "eth0",
+             "netmask": "0.0.0.0", "flags": "UG", "metric": 100},
+            {"destination": "192.0.2.0", "gateway": None, "interface": "eth0",
+             "netmask": "255.255.255.0", "flags": "U", "metric": 0},
+            {"destination": "fd00::/64", "gateway": None, "interface": "eth0",
+             "netmask": "/64", "flags": "U", "metric": 256},
+            {"destination": "default", "gateway": "fd00::1", "interface": "eth0",
+             "netmask": "/0", "flags": "UG", "metric": 1024},
+        ])
+
+    def test_addresses_are_decoded_in_host_byte_order(self):
+        procnet._decode_ip.cache_clear()
+        try:
+            with mock.patch.object(procnet, "HOST_LITTLE_ENDIAN", False):
+                self.assertEqual(procnet._decode_ip("7F000001"), "127.0.0.1")
+                self.assertEqual(procnet._decode_ip("00000000000000000000000000000001"), "::1")
+        finally:
+            procnet._decode_ip.cache_clear()
+        with mock.patch.object(procnet, "HOST_LITTLE_ENDIAN", True):
+            self.assertEqual(procnet._decode_ip("0100007F"), "127.0.0.1")
+            self.assertEqual(procnet._decode_ip("00000000000000000000000001000000"), "::1")
+
+if __name__ == "__main__":
+    unittest.main()
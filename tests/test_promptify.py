@@ -0,0 +1,105 @@
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from host_insights_promptify.processes import ProcessEntry
+from host_insights_promptify.promptify import (PromptRenderer, format_prompt, iter_prompt, raw_output, write_prompt,
+                                               save_prompt_to_file)
+from host_insights_promptify.records import ContainerRecord, ServiceRecord
+
+SYSTEM_INFO = {"OS": "Linux", "Hostname": "web-01"}
+NETWORK_INFO = {
+    "interfaces": [{"name": "eth0", "status": "up"}],
+    "routing_table": [{"destination": "default", "gateway": "10.0.0.1", "metric": 100}],
+    "active_connections": [],
+    "dns": {"primary": "1.1.1.1"},
+    "firewall_rules": None,
+}
+DOCKER_INFO = {"containers": [], "networks": [], "volumes": []}
+
+def make_connections(count):
+    for i in range(count):
+        yield {"protocol": "TCP", "local_address": f"10.0.0.1:{i}", "status": "LISTEN", "pid": i, "process": "app"}
+
+def make_services(count):
+    for i in range(count):
+        yield {"name": f"svc{i}", "status": "running", "memory_usage": 1024, "cpu_usage": 1.5}
+
+class TestPromptify(unittest.TestCase):
+
+    def test_format_prompt_matches_streamed_lines(self):
+        services = [{"name": "sshd", "status": "sleeping", "cpu_usage": "N/A"}]
+        prompt = format_prompt(SYSTEM_INFO, NETWORK_INFO, DOCKER_INFO, services)
+
+        self.assertEqual(prompt, "\n".join(iter_prompt(SYSTEM_INFO, NETWORK_INFO, DOCKER_INFO, services)))
+        self.assertIn("- Hostname: web-01", prompt)
+        self.assertIn("- Service Name: sshd", prompt)
+        self.assertNotIn("### Section 3: Docker Information ###", prompt)
+
+    def test_write_prompt_consumes_generators(self):
+        network_info = dict(NETWORK_INFO, active_connections=make_connections(3))
+        stream = io.StringIO()
+
+        written = write_prompt(stream, SYSTEM_INFO, network_info, DOCKER_INFO, make_services(2))
+
+        output = stream.getvalue()
+        self.assertEqual(written, len(output))
+        self.assertEqual(output.count("- Protocol: TCP"), 3)
+        self.assertIn("- Service Name: svc1", output)
+        self.assertIn("  - CPU Usage: 1.5%", output)
+
+    def test_empty_service_generator_omits_section(self):
+        prompt = format_prompt(SYSTEM_INFO, NETWORK_INFO, DOCKER_INFO, make_services(0))
+        self.assertNotIn("### Section 4: Running Services ###", prompt)
+
+    def test_failed_services_collector_is_reported(self):
+        from host_insights_promptify import _fallback_result
+        services = _fallback_result("services", "Error collecting services information: timed out")
+        prompt = format_prompt(SYSTEM_INFO, NETWORK_INFO, DOCKER_INFO, services)
+
+        self.assertIn("### Section 4: Running Services ###", prompt)
+        self.assertIn("Error: Error collecting services information: timed out", prompt)
+        self.assertNotIn("- Service Name:", prompt)
+
+    def test_save_prompt_to_file_accepts_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "prompt.txt")
+            save_prompt_to_file(iter(["line one", "line two"]), path)
+            with open(path) as f:
+                self.assertEqual(f.read(), "line one\nline two\n")
+
+    def test_raw_collector_output_is_saved_as_plain_data(self):
+        services = [ServiceRecord(ProcessEntry(7, "worker", "running", 1700000000.0, 2048, 1.0))]
+        start_time = datetime.fromtimestamp(1700000000.0).strftime("%Y-%m-%d %H:%M:%S")
+        expected = [{"pid": 7, "name": "worker", "status": "running", "start_time": start_time,
+                     "memory_usage": 2048, "cpu_usage": 1.0}]
+        self.assertEqual(raw_output({"services": services}), {"services": expected})
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "services.txt")
+            save_prompt_to_file(services, path)
+            with open(path) as f:
+                self.assertEqual(f.read(), str(expected))
+
+class TestPromptRenderer(unittest.TestCase):
+
+    def test_unchanged_sections_are_reused(self):
+        renderer = PromptRenderer()
+        docker_info = {"containers": [ContainerRecord(name="web", image=["web:1"], cpu_percent=1.0)], "networks": [], "volumes": []}
+
+        first = renderer.render(SYSTEM_INFO, NETWORK_INFO, docker_info, make_services(2))
+        self.assertEqual(first, format_prompt(SYSTEM_INFO, NETWORK_INFO, docker_info, list(make_services(2))))
+        self.assertEqual(renderer.stats()["hits"], 0)
+
+        docker_info["containers"][0].cpu_percent = 1
+        second = format_prompt(SYSTEM_INFO, NETWORK_INFO, docker_info, make_services(2), renderer=renderer)
+
+        self.assertIn("  - CPU Percent: 1%", second)
+        stats = renderer.stats()
+        self.assertEqual(stats["sections"]["docker.containers"], {"hits": 0, "misses": 2, "hit_rate": 0.0})
+        self.assertEqual(stats["sections"]["services"]["hit_rate"], 0.5)
+        self.assertEqual(stats["misses"], stats["hits"] + 2)
+
+if __name__ == "__main__":
+    unittest.main()
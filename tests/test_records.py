@@ -0,0 +1,73 @@
+import collections
+import json
+import unittest
+from host_insights_promptify.processes import ProcessEntry
+from host_insights_promptify.promptify import format_prompt
+from host_insights_promptify.records import ConnectionRecord, ContainerRecord, InterfaceRecord, ServiceRecord, to_builtin
+from host_insights_promptify.serialize import iter_serialized
+
+IOCounters = collections.namedtuple("IOCounters", InterfaceRecord.IO_FIELDS)
+
+class FakeSnapshot:
+    def name(self, pid):
+        return {42: "nginx"}.get(pid)
+
+class TestRecords(unittest.TestCase):
+
+    def test_records_have_no_instance_dict(self):
+        records = [
+            ServiceRecord(ProcessEntry(1, "init", "sleeping", 0.0, 1024, 0.0)),
+            ConnectionRecord("TCP", ("10.0.0.1", 80), None, "LISTEN"),
+            InterfaceRecord("eth0"),
+            ContainerRecord(name="web"),
+        ]
+        for record in records:
+            self.assertFalse(hasattr(record, "__dict__"), type(record).__name__)
+
+    def test_service_keeps_raw_values(self):
+        service = ServiceRecord(ProcessEntry(7, "worker", "running", 1700000000.5, None, 2.5))
+
+        self.assertEqual(service["start_time"], 1700000000.5)
+        self.assertEqual(service["memory_usage"], "N/A")
+        self.assertEqual(service.get("cpu_usage"), 2.5)
+        self.assertIsNone(service.get("omitted"))
+        self.assertNotIn("omitted", service)
+        with self.assertRaises(KeyError):
+            service["missing"]
+
+    def test_connection_formats_lazily(self):
+        connection = ConnectionRecord("TCP", ("10.0.0.1", 443), ("10.0.0.9", 51000), "ESTABLISHED", 42, FakeSnapshot())
+
+        self.assertEqual(connection["local_address"], "10.0.0.1:443")
+        self.assertEqual(connection["remote_address"], "10.0.0.9:51000")
+        self.assertEqual(connection["process"], "nginx")
+        self.assertEqual(dict(connection), {
+            "protocol": "TCP", "local_address": "10.0.0.1:443", "remote_address": "10.0.0.9:51000",
+            "status": "ESTABLISHED", "pid": 42, "process": "nginx",
+        })
+
+    def test_interface_io(self):
+        interface = InterfaceRecord("eth0", mtu=1500, status="up", io=IOCounters(1, 2, 3, 4, 0, 0, 0, 0))
+
+        self.assertEqual(interface["io"]["bytes_recv"], 2)
+        self.assertIsNone(InterfaceRecord("lo")["io"])
+
+    def test_records_compare_equal_to_dicts(self):
+        container = ContainerRecord(name="web", status="running")
+
+        self.assertEqual(container, dict.fromkeys(ContainerRecord.FIELDS) | {"name": "web", "status": "running"})
+        self.assertEqual(to_builtin(container), container.as_dict())
+
+    def test_serialized_and_rendered(self):
+        services = [ServiceRecord(ProcessEntry(7, "worker", "running", 1700000000.0, 2048, 1.0))]
+
+        document = json.loads(b"".join(iter_serialized({"services": services}, "json")))
+        self.assertEqual(document["services"][0]["start_time"], 1700000000.0)
+        self.assertEqual(json.loads(json.dumps(services[0], default=to_builtin))["name"], "worker")
+
+        prompt = format_prompt({}, {}, {}, services)
+        self.assertIn("- Service Name: worker", prompt)
+        self.assertNotIn("1700000000", prompt)
+
+if __name__ == '__main__':
+    unittest.main()
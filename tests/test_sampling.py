@@ -0,0 +1,127 @@
+import collections
+import unittest
+from unittest import mock
+from host_insights_promptify.promptify import format_prompt
+from host_insights_promptify.sampling import MetricsSampler, RingBuffer, summarize
+
+DiskCounters = collections.namedtuple("DiskCounters", ["read_bytes", "write_bytes"])
+NetCounters = collections.namedtuple("NetCounters", ["bytes_sent", "bytes_recv"])
+
+class FakeHost:
+    """
+    Counters that advance by a fixed amount per sample; process 42's RSS grows steadily.
+    """
+
+    def __init__(self):
+        self.tick = 0
+        self.clock = 0.0
+
+    def advance(self):
+        self.tick += 1
+        self.clock += 1.0
+
+    def usage(self):
+        usage = {
+            42: ("leaky", self.tick * 50, (100 + 10 * self.tick) * 1024 * 1024),
+            7: ("idle", 0, 4096),
+        }
+        return usage, 100
+
+    def patched(self):
+        return [
+            mock.patch("psutil.cpu_percent", side_effect=lambda interval=None: 90.0 if self.tick == 5 else 10.0),
+            mock.patch("psutil.virtual_memory", return_value=mock.Mock(percent=40.0)),
+            mock.patch("psutil.disk_io_counters", side_effect=lambda: DiskCounters(self.tick * 2048, 0)),
+            mock.patch("psutil.net_io_counters", side_effect=lambda: NetCounters(0, self.tick * 4096)),
+            mock.patch("host_insights_promptify.sampling.read_process_usage", side_effect=self.usage),
+            mock.patch("time.monotonic", side_effect=lambda: self.clock),
+        ]
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_keeps_latest_samples_in_order(self):
+        buffer = RingBuffer(3)
+        for value in range(5):
+            buffer.append(value)
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(list(buffer.values()), [2.0, 3.0, 4.0])
+
+    def test_partial_buffer(self):
+        buffer = RingBuffer(4)
+        buffer.append(1.5)
+
+        self.assertEqual(list(buffer.values()), [1.5])
+
+class TestSummarize(unittest.TestCase):
+
+    def test_statistics(self):
+        stats = summarize([float(value) for value in range(1, 21)])
+
+        self.assertEqual(stats["min"], 1.0)
+        self.assertEqual(stats["max"], 20.0)
+        self.assertEqual(stats["mean"], 10.5)
+        self.assertEqual(stats["p95"], 19.05)
+        self.assertEqual(stats["change"], 14.0)
+        self.assertEqual(stats["trend"], "rising")
+
+    def test_spike_is_not_a_trend(self):
+        stats = summarize([10.0] * 9 + [90.0] + [10.0] * 10, significant=1.0)
+
+        self.assertEqual(stats["max"], 90.0)
+        self.assertEqual(stats["trend"], "steady")
+
+    def test_empty(self):
+        self.assertIsNone(summarize([]))
+
+class TestMetricsSampler(unittest.TestCase):
+
+    def sample(self, sampler, host, count):
+        patches = host.patched()
+        for patch in patches:
+            patch.start()
+        try:
+            sampler.sample()
+            for _ in range(count):
+                host.advance()
+                sampler.sample()
+        finally:
+            for patch in patches:
+                patch.stop()
+
+    def test_summary(self):
+        host = FakeHost()
+        sampler = MetricsSampler(window=10, interval=1.0)
+        self.sample(sampler, host, 10)
+
+        summary = sampler.summary()
+        self.assertEqual(summary["samples"], 10)
+        cpu = summary["host"]["cpu_percent"]
+        self.assertEqual((cpu["max"], cpu["trend"]), (90.0, "steady"))
+        self.assertEqual(summary["host"]["disk_read_bytes_s"]["mean"], 2048.0)
+        self.assertEqual(summary["host"]["net_recv_bytes_s"]["unit"], "B/s")
+
+        leaky = next(process for process in summary["processes"] if process["pid"] == 42)
+        self.assertEqual(leaky["cpu_percent"]["mean"], 50.0)
+        self.assertEqual(leaky["rss_bytes"]["trend"], "rising")
+
+    def test_window_is_bounded(self):
+        host = FakeHost()
+        sampler = MetricsSampler(window=4, interval=1.0)
+        self.sample(sampler, host, 10)
+
+        self.assertEqual(sampler.summary()["samples"], 4)
+
+    def test_trends_in_prompt(self):
+        host = FakeHost()
+        sampler = MetricsSampler(window=10, interval=1.0)
+        self.sample(sampler, host, 10)
+
+        prompt = format_prompt({}, {}, {}, [], trends=sampler.summary())
+        self.assertIn("### Section 5: Metric Trends ###", prompt)
+        self.assertIn("- CPU Usage: min 10.0%, mean 18.0%, p95 54.0%, max 90.0% (steady)", prompt)
+        self.assertIn("- leaky (PID: 42)", prompt)
+        self.assertNotIn("### Section 5", format_prompt({}, {}, {}, []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import json
+import unittest
+from host_insights_promptify.serialize import FORMATS, iter_records, iter_serialized, write_insights
+
+def make_insights():
+    return {
+        "system": {"OS": "Linux", "Disk Partitions": [{"Mountpoint": "/", "Usage": "40.0%"}]},
+        "network": {
+            "interfaces": [{"name": "eth0", "mtu": 1500}],
+            "routing_table": [{"destination": "default", "gateway": "10.0.0.1"}, "raw route line"],
+            # Connections and services are generators when collected lazily
+            "active_connections": ({"protocol": "TCP", "local_address": f"10.0.0.1:{port}", "status": "LISTEN"}
+                                   for port in range(2500)),
+            "dns": {"primary": "10.0.0.2"},
+            "firewall_rules": None,
+        },
+        "docker": {"containers": [{"name": "web", "status": "running"}], "networks": [], "volumes": []},
+        "services": ({"pid": pid, "name": "worker", "cpu_usage": 0.5} for pid in range(3)),
+    }
+
+class TestSerialize(unittest.TestCase):
+
+    def test_json_document(self):
+        document = json.loads(b"".join(iter_serialized(make_insights(), "json")))
+
+        self.assertEqual(document["schema"], 1)
+        self.assertEqual(len(document["network"]["active_connections"]), 2500)
+        self.assertEqual(document["network"]["active_connections"][2499]["local_address"], "10.0.0.1:2499")
+        self.assertEqual(document["network"]["dns"], {"primary": "10.0.0.2"})
+        self.assertEqual([s["pid"] for s in document["services"]], [0, 1, 2])
+        self.assertEqual(document["system"]["Disk Partitions"][0]["Mountpoint"], "/")
+
+    def test_compact_stores_records_as_columns(self):
+        document = json.loads(b"".join(iter_serialized(make_insights(), "compact")))
+
+        connections = document["network"]["active_connections"]
+        self.assertEqual(connections["columns"], ["protocol", "local_address", "status"])
+        self.assertEqual(connections["rows"][1], ["TCP", "10.0.0.1:1", "LISTEN"])
+        self.assertEqual(len(connections["rows"]), 2500)
+        self.assertEqual(document["docker"]["containers"], {"columns": ["name", "status"], "rows": [["web", "running"]]})
+        self.assertEqual(document["services"]["rows"][2], [2, "worker", 0.5])
+
+    def test_ndjson_records(self):
+        stream = io.BytesIO()
+        write_insights(stream, make_insights(), "ndjson")
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+        self.assertEqual(records[0]["record"], "meta")
+        types = [record["record"] for record in records]
+        self.assertEqual(types.count("connection"), 2500)
+        self.assertEqual(types.count("service"), 3)
+        self.assertIn({"record": "route", "line": "raw route line"}, records)
+        self.assertIn({"record": "network", "dns": {"primary": "10.0.0.2"}, "firewall_rules": None}, records)
+
+    def test_single_section(self):
+        records = list(iter_records({"docker": {"containers": [], "networks": [], "volumes": [], "error": "down"}}))
+
+        self.assertEqual(records[0]["sections"], ["docker"])
+        self.assertEqual(records[1], {"record": "docker", "error": "down"})
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            list(iter_serialized({}, "xml"))
+        self.assertIn("msgpack", FORMATS)
+
+if __name__ == "__main__":
+    unittest.main()
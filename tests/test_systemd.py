@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+from host_insights_promptify.instrumentation import Instrumentation
+from host_insights_promptify.processes import ProcessEntry, ProcessSnapshot
+from host_insights_promptify.promptify import format_prompt
+from host_insights_promptify.systemd import collect_units_info, parse_show_output
+
+SHOW_OUTPUT = """Id=nginx.service
+Description=A high performance web server
+LoadState=loaded
+ActiveState=active
+SubState=running
+Result=success
+MainPID=100
+NRestarts=3
+ActiveEnterTimestamp=Mon 2026-10-12 08:00:00 UTC
+ControlGroup=/system.slice/nginx.service
+MemoryCurrent=52428800
+CPUUsageNSec=12500000000
+TasksCurrent=3
+
+Id=backup.service
+Description=Nightly backup
+LoadState=loaded
+ActiveState=failed
+SubState=failed
+Result=exit-code
+MainPID=0
+NRestarts=0
+ActiveEnterTimestamp=
+ControlGroup=
+MemoryCurrent=[not set]
+CPUUsageNSec=18446744073709551615
+TasksCurrent=18446744073709551615
+
+Id=apt-daily.service
+Description=Daily apt download activities
+LoadState=loaded
+ActiveState=inactive
+SubState=dead
+Result=success
+MainPID=0
+NRestarts=0
+ControlGroup=
+"""
+
+CGROUPS = {
+    100: "0::/system.slice/nginx.service\n",
+    101: "0::/system.slice/nginx.service\n",
+    # A v1 host: the name=systemd hierarchy is used
+    102: "12:memory:/system.slice\n1:name=systemd:/system.slice/nginx.service/worker\n",
+    200: "0::/user.slice/user-1000.slice/session-1.scope\n",
+}
+
+class FakeSystemctl:
+    """
+    A stand-in for running systemctl, recording each command.
+    """
+
+    def __init__(self, output):
+        self.output = output
+        self.commands = []
+
+    def __call__(self, args):
+        self.commands.append(args)
+        return self.output
+
+class TestSystemdUnits(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        for pid, content in CGROUPS.items():
+            os.makedirs(os.path.join(self.directory.name, str(pid)))
+            with open(os.path.join(self.directory.name, str(pid), "cgroup"), "w") as f:
+                f.write(content)
+        self.snapshot = ProcessSnapshot({
+            pid: ProcessEntry(pid, "nginx" if pid < 200 else "bash", "sleeping", 0.0, 10 * 1024 * 1024, 1.5)
+            for pid in list(CGROUPS) + [300]
+        })
+
+    def test_parse_show_output(self):
+        units = parse_show_output(SHOW_OUTPUT)
+
+        self.assertEqual([unit["Id"] for unit in units], ["nginx.service", "backup.service", "apt-daily.service"])
+        self.assertEqual(units[1]["ControlGroup"], "")
+
+    def test_units_are_collected_in_one_call_and_joined_to_processes(self):
+        systemctl = FakeSystemctl(SHOW_OUTPUT)
+        instrumentation = Instrumentation()
+
+        units_info = collect_units_info(snapshot=self.snapshot, runner=systemctl, proc_root=self.directory.name,
+                                        instrumentation=instrumentation)
+
+        self.assertEqual(len(systemctl.commands), 1)
+        self.assertEqual(systemctl.commands[0][:2], ["systemctl", "show"])
+        self.assertEqual(instrumentation.timings()["units.systemctl"]["counts"], {"subprocesses": 1})
+        apt, backup, nginx = units_info["units"]
+        self.assertEqual(nginx["restarts"], 3)
+        self.assertEqual(nginx["memory_usage"], 52428800)
+        self.assertEqual(sorted(nginx["processes"]), [100, 101, 102])
+        self.assertEqual(nginx["process_rss"], 30 * 1024 * 1024)
+        self.assertEqual(backup["main_pid"], None)
+        self.assertEqual((backup["memory_usage"], backup["cpu_usage"], backup["tasks"]), (None, None, None))
+        self.assertEqual(apt["processes"], [])
+        self.assertNotIn("error", units_info)
+
+    def test_units_in_prompt(self):
+        units_info = collect_units_info(snapshot=self.snapshot, runner=FakeSystemctl(SHOW_OUTPUT),
+                                        proc_root=self.directory.name)
+
+        prompt = format_prompt({}, {}, {}, [], units=units_info)
+
+        self.assertIn("(1 active, 1 failed, 1 inactive)", prompt)
+        self.assertIn("- nginx.service: active (running), result: success, restarts: 3", prompt)
+        self.assertIn("  - Main PID: 100; Memory: 50.0 MiB; CPU Time: 12.5s; Tasks: 3", prompt)
+        self.assertIn("  - Processes: 3 (RSS 30.0 MiB, CPU 4.5%)", prompt)
+        self.assertIn("- Inactive Units: apt-daily.service", prompt)
+        self.assertNotIn("Systemd Units", format_prompt({}, {}, {}, [], units={"units": [], "error": "no systemd"}))
+
+    def test_systemctl_failure_is_reported(self):
+        def failing(args):
+            raise FileNotFoundError("systemctl")
+
+        units_info = collect_units_info(snapshot=self.snapshot, runner=failing)
+
+        self.assertEqual(units_info["units"], [])
+        self.assertIn("systemctl", units_info["error"])
+
+if __name__ == "__main__":
+    unittest.main()